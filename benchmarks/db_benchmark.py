@@ -0,0 +1,117 @@
+"""
+Insert and query cost of PaystackTransaction against the configured database.
+
+Inserts ``--rows`` transactions with random UUID4 primary keys and the same number with time-ordered UUIDv7
+keys, then times the status, customer email and created_at range queries the composite indexes serve and
+prints their query plans. ``--without-indexes`` drops the composite indexes for the run (and recreates them
+afterwards) to show the cost without them. Run against a copy of production-sized data on PostgreSQL for
+meaningful numbers::
+
+    python -m benchmarks.db_benchmark --rows 200000
+    python -m benchmarks.db_benchmark --rows 200000 --without-indexes
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+BATCH_SIZE = 5000
+
+
+def timed_runs(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+def insert_rows(count, make_id, prefix):
+    from django.utils import timezone
+
+    from gateways.paystack.models import PaystackTransaction
+
+    now = timezone.now()
+    started = time.perf_counter()
+    for offset in range(0, count, BATCH_SIZE):
+        PaystackTransaction.objects.bulk_create(
+            [
+                PaystackTransaction(
+                    id=make_id(),
+                    reference=f"{prefix}-{offset + i}",
+                    amount_minor=random.randint(10000, 10000000),
+                    customer_name="Benchmark Customer",
+                    customer_email=f"customer{random.randint(1, 5000)}@example.com",
+                    status=random.choice(["success", "pending", "failed", "abandoned"]),
+                    created_at=now - timedelta(minutes=offset + i),
+                )
+                for i in range(min(BATCH_SIZE, count - offset))
+            ]
+        )
+    return (time.perf_counter() - started) * 1000
+
+
+@contextmanager
+def composite_indexes_dropped(enabled):
+    from django.db import connection
+
+    from gateways.paystack.models import PaystackTransaction
+
+    indexes = PaystackTransaction._meta.indexes if enabled else []
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(PaystackTransaction, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(PaystackTransaction, index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000, help="Rows inserted per ID scheme.")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query; the median is reported.")
+    parser.add_argument("--without-indexes", action="store_true", help="Drop the composite indexes for the run.")
+    parser.add_argument("--keep", action="store_true", help="Keep the inserted rows.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
+    from django.utils import timezone
+
+    from gateways.common.utils import uuid7
+    from gateways.paystack.models import PaystackTransaction
+
+    run = uuid.uuid4().hex[:8]
+    with composite_indexes_dropped(args.without_indexes):
+        print(f"insert uuid4: {insert_rows(args.rows, uuid.uuid4, f'bench-{run}-v4'):.0f} ms for {args.rows} rows")
+        print(f"insert uuid7: {insert_rows(args.rows, uuid7, f'bench-{run}-v7'):.0f} ms for {args.rows} rows")
+
+        since = timezone.now() - timedelta(days=1)
+        queries = {
+            "pending, newest first": PaystackTransaction.objects.filter(status="pending").order_by("-created_at")[:50],
+            "by customer, newest first": PaystackTransaction.objects.filter(
+                customer_email="customer42@example.com"
+            ).order_by("-created_at")[:50],
+            "failed in the last day": PaystackTransaction.objects.filter(status="failed", created_at__gte=since),
+        }
+        for name, queryset in queries.items():
+            print(f"\n{name}: {timed_runs(lambda: list(queryset.all()), args.repeat):.2f} ms (median)")
+            print(queryset.explain())
+
+    if not args.keep:
+        PaystackTransaction.objects.filter(reference__startswith=f"bench-{run}-").delete()
+
+
+if __name__ == "__main__":
+    main()
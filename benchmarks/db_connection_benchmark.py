@@ -0,0 +1,87 @@
+"""
+Per-request database cost with and without persistent connections, and on the primary vs. replicas.
+
+Simulates ``--requests`` requests (Django's ``request_started``/``request_finished`` signals around one
+transaction retrieve query) with:
+
+* ``CONN_MAX_AGE=0``: a new connection per request, as before;
+* ``CONN_MAX_AGE=60``: connections reused across requests;
+* ``CONN_MAX_AGE=60`` with ``CONN_HEALTH_CHECKS``: reused, checked once per request before first use;
+
+then times the retrieve query alone on the primary and on each alias in ``DATABASE_REPLICAS``. Run it against
+a local PostgreSQL (set ``DB_HOST`` etc., and ``DB_REPLICA_HOSTS`` to include replicas)::
+
+    python -m benchmarks.db_connection_benchmark --requests 500
+"""
+
+import argparse
+import os
+import statistics
+import time
+import uuid
+
+
+def summarize(durations):
+    durations = sorted(durations)
+    return statistics.median(durations), durations[max(0, int(len(durations) * 0.95) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Simulated requests per mode.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.core.signals import request_finished, request_started
+    from django.db import DEFAULT_DB_ALIAS, connections
+
+    from gateways.paystack.models import PaystackTransaction
+
+    reference = f"bench-{uuid.uuid4().hex[:8]}"
+    PaystackTransaction.objects.create(
+        reference=reference, amount_minor=10000, customer_name="Benchmark Customer", customer_email="bench@example.com"
+    )
+    primary = connections[DEFAULT_DB_ALIAS]
+    original = {name: primary.settings_dict.get(name) for name in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")}
+
+    def request(alias):
+        started = time.perf_counter()
+        request_started.send(sender=None)
+        PaystackTransaction.objects.using(alias).filter(reference=reference).first()
+        request_finished.send(sender=None)
+        return (time.perf_counter() - started) * 1_000_000
+
+    try:
+        print(f"{'mode':<36}{'median (us)':>14}{'p95 (us)':>12}")
+        for name, max_age, health_checks in [
+            ("new connection per request", 0, False),
+            ("persistent connection", 60, False),
+            ("persistent + health checks", 60, True),
+        ]:
+            primary.close()
+            primary.settings_dict.update(CONN_MAX_AGE=max_age, CONN_HEALTH_CHECKS=health_checks)
+            median, p95 = summarize([request(DEFAULT_DB_ALIAS) for _ in range(args.requests)])
+            print(f"{name:<36}{median:>14.1f}{p95:>12.1f}")
+
+        print(f"\n{'retrieve query on':<36}{'median (us)':>14}{'p95 (us)':>12}")
+        for alias in [DEFAULT_DB_ALIAS] + list(settings.DATABASE_REPLICAS):
+            queryset = PaystackTransaction.objects.using(alias).filter(reference=reference)
+            queryset.first()
+            durations = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                queryset.first()
+                durations.append((time.perf_counter() - started) * 1_000_000)
+            median, p95 = summarize(durations)
+            print(f"{alias:<36}{median:>14.1f}{p95:>12.1f}")
+    finally:
+        primary.settings_dict.update(original)
+        PaystackTransaction.objects.filter(reference=reference).delete()
+
+
+if __name__ == "__main__":
+    main()
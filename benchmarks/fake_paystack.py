@@ -0,0 +1,167 @@
+"""
+Local stand-in for the Paystack API used by the benchmarks.
+
+Serves ``POST /transaction/initialize`` and ``GET /transaction/verify/<reference>`` with configurable latency,
+error rate and 429 rate. Run it on its own with::
+
+    python -m benchmarks.fake_paystack --port 8765 --latency-ms 80 --error-rate 0.01 --throttle-rate 0.02
+
+and point the app at it with ``PAYSTACK_BASE_URL=http://127.0.0.1:8765``.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class FakePaystackConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    verify_status: str = "success"
+    reference_prefix: str = ""
+
+
+class FakePaystackHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status_code, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def simulate(self):
+        """
+        Sleeps for the configured latency and returns an error response to send instead, if any.
+        """
+        self.server.record_request()
+        delay = max(0.0, random.gauss(self.config.latency_ms, self.config.jitter_ms)) / 1000
+        time.sleep(delay)
+        roll = random.random()
+        if roll < self.config.throttle_rate:
+            return 429, {"status": False, "message": "Rate limit exceeded"}, {"Retry-After": "1"}
+        if roll < self.config.throttle_rate + self.config.error_rate:
+            return 500, {"status": False, "message": "Internal server error"}, None
+        return None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.rstrip("/") != "/transaction/initialize":
+            return self.send_json(404, {"status": False, "message": "Not found"})
+        error = self.simulate()
+        if error:
+            return self.send_json(*error)
+        reference = f"{self.config.reference_prefix}{uuid.uuid4().hex}"
+        self.send_json(
+            200,
+            {
+                "status": True,
+                "message": "Authorization URL created",
+                "data": {
+                    "authorization_url": f"https://checkout.paystack.com/{reference}",
+                    "access_code": reference[:16],
+                    "reference": reference,
+                    "amount": body.get("amount"),
+                },
+            },
+        )
+
+    def do_GET(self):
+        prefix = "/transaction/verify/"
+        if not self.path.startswith(prefix):
+            return self.send_json(404, {"status": False, "message": "Not found"})
+        error = self.simulate()
+        if error:
+            return self.send_json(*error)
+        reference = self.path.removeprefix(prefix).rstrip("/")
+        self.send_json(
+            200,
+            {
+                "status": True,
+                "message": "Verification successful",
+                "data": {
+                    "reference": reference,
+                    "status": self.config.verify_status,
+                    "amount": 500000,
+                    "currency": "NGN",
+                    "gateway_response": "Successful",
+                    "customer": {"email": "customer@example.com"},
+                    "metadata": {"name": "Benchmark Customer"},
+                },
+            },
+        )
+
+
+class FakePaystackServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, config=None):
+        super().__init__(address, FakePaystackHandler)
+        self.config = config or FakePaystackConfig()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="fake-paystack", daemon=True)
+        thread.start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--verify-status", default="success")
+    args = parser.parse_args()
+
+    config = FakePaystackConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        verify_status=args.verify_status,
+    )
+    server = FakePaystackServer((args.host, args.port), config)
+    print(f"Fake Paystack listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
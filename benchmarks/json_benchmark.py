@@ -0,0 +1,193 @@
+"""
+Per-request JSON cost of the Paystack endpoints, before and after the fast path.
+
+Times, with ``timeit``, the three JSON steps a verify request goes through:
+
+* decoding a full Paystack verify response body (``response.json()`` on text vs ``orjson`` on the raw bytes),
+* extracting the fields the API exposes (the previous dict building vs ``VerificationData``),
+* rendering the API response (DRF's ``JSONRenderer`` vs ``FastJSONRenderer``), for a verify result and a
+  50-row transaction list page.
+
+Run it with::
+
+    python -m benchmarks.json_benchmark --number 20000
+
+Without ``orjson`` installed the fast path falls back to the standard library and both columns match.
+"""
+
+import argparse
+import json
+import os
+import timeit
+import uuid
+from datetime import timedelta
+
+
+def verify_response(reference="bench-ref"):
+    """
+    A verify response shaped like Paystack's, including the nested objects the API never reads.
+    """
+    return {
+        "status": True,
+        "message": "Verification successful",
+        "data": {
+            "id": 4099260516,
+            "domain": "test",
+            "status": "success",
+            "reference": reference,
+            "receipt_number": None,
+            "amount": 4000000,
+            "message": None,
+            "gateway_response": "Successful",
+            "paid_at": "2024-08-22T09:15:02.000Z",
+            "created_at": "2024-08-22T09:14:24.000Z",
+            "channel": "card",
+            "currency": "NGN",
+            "ip_address": "197.210.54.33",
+            "metadata": {"name": "Ada Lovelace", "referrer": "https://example.com/checkout"},
+            "log": {
+                "start_time": 1724318066,
+                "time_spent": 4,
+                "attempts": 1,
+                "errors": 0,
+                "success": True,
+                "mobile": False,
+                "input": [],
+                "history": [
+                    {"type": "action", "message": "Attempted to pay with card", "time": 3},
+                    {"type": "success", "message": "Successfully paid with card", "time": 4},
+                ],
+            },
+            "fees": 10283,
+            "fees_split": None,
+            "authorization": {
+                "authorization_code": "AUTH_uh8bcl3zbn",
+                "bin": "408408",
+                "last4": "4081",
+                "exp_month": "12",
+                "exp_year": "2030",
+                "channel": "card",
+                "card_type": "visa ",
+                "bank": "TEST BANK",
+                "country_code": "NG",
+                "brand": "visa",
+                "reusable": True,
+                "signature": "SIG_yEXu7dLBeqG0kU7g95Ke",
+                "account_name": None,
+            },
+            "customer": {
+                "id": 181873746,
+                "first_name": None,
+                "last_name": None,
+                "email": "ada@example.com",
+                "customer_code": "CUS_1rkzaqsv4rrhqo6",
+                "phone": None,
+                "metadata": None,
+                "risk_action": "default",
+                "international_format_phone": None,
+            },
+            "plan": None,
+            "split": {},
+            "order_id": None,
+            "requested_amount": 4000000,
+            "pos_transaction_data": None,
+            "source": None,
+            "fees_breakdown": None,
+            "transaction_date": "2024-08-22T09:14:24.000Z",
+            "plan_object": {},
+            "subaccount": {},
+        },
+    }
+
+
+def legacy_verification_data(res):
+    """
+    The dict-building extraction ``build_verification_data`` used before ``VerificationData``.
+    """
+    response_data = res.get("data", {})
+    return {
+        "status": response_data.get("status"),
+        "email": response_data.get("customer", {}).get("email"),
+        "name": response_data.get("metadata", {}).get("name"),
+        "amount": response_data.get("amount") / 100,
+        "currency": response_data.get("currency"),
+        "message": response_data.get("gateway_response"),
+    }
+
+
+def list_page(rows=50):
+    """
+    A transaction list page as ``PaystackTransactionSerializer`` produces it.
+    """
+    from django.utils import timezone
+
+    now = timezone.now()
+    return {
+        "results": [
+            {
+                "id": str(uuid.uuid4()),
+                "amount": "400.00",
+                "amount_minor": 40000,
+                "status": "success",
+                "customer_name": "Ada Lovelace",
+                "customer_email": f"customer{i}@example.com",
+                "reference": f"ref-{i}",
+                "currency": "NGN",
+                "created_at": (now - timedelta(minutes=i)).isoformat(),
+                "updated_at": (now - timedelta(minutes=i)).isoformat(),
+            }
+            for i in range(rows)
+        ],
+        "next_cursor": "eyJjIjoiMjAyNC0wOC0yMiIsImkiOiJhYmMifQ",
+    }
+
+
+def per_call_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=10000, help="Calls per timing run.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
+    from rest_framework.renderers import JSONRenderer
+
+    from core.fastjson import loads, orjson
+    from core.renderers import FastJSONRenderer
+    from gateways.paystack.payloads import VerificationData
+
+    body = json.dumps(verify_response()).encode()
+    decoded = json.loads(body)
+    verified = VerificationData.from_response(decoded).as_dict()
+    page = list_page()
+    drf, fast = JSONRenderer(), FastJSONRenderer()
+
+    cases = [
+        ("decode verify body", lambda: json.loads(body.decode()), lambda: loads(body)),
+        (
+            "extract verify fields",
+            lambda: legacy_verification_data(decoded),
+            lambda: VerificationData.from_response(decoded).as_dict(),
+        ),
+        ("render verify result", lambda: drf.render(verified), lambda: fast.render(verified)),
+        ("render 50-row page", lambda: drf.render(page), lambda: fast.render(page)),
+    ]
+
+    print(f"orjson: {'installed' if orjson is not None else 'not installed'}")
+    print(f"{'step':<24}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    total_before = total_after = 0.0
+    for name, before, after in cases:
+        before_us, after_us = per_call_us(before, args.number), per_call_us(after, args.number)
+        total_before += before_us
+        total_after += after_us
+        print(f"{name:<24}{before_us:>14.2f}{after_us:>14.2f}{before_us / after_us:>9.1f}x")
+    print(f"{'total':<24}{total_before:>14.2f}{total_after:>14.2f}{total_before / total_after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Load test for the payment API against a local fake Paystack.
+
+Starts the fake Paystack server, seeds transactions, serves the app in-process under WSGI or ASGI and drives the
+create, retrieve and callback endpoints at each concurrency level for a fixed duration. Latency percentiles,
+requests per second, error counts and DB queries per request (scraped from ``/metrics``) are written to a JSON
+file; pass ``--compare`` with an earlier result file to flag regressions.
+
+Runs use ``benchmarks.settings``, which points at a separate benchmark database, unless
+``DJANGO_SETTINGS_MODULE`` is set. Every transaction a run creates has a reference starting with the run's
+prefix, and they are deleted, with their outbox events and webhook events, when the run ends.
+
+Examples::
+
+    python -m benchmarks.load_test --server wsgi --concurrency 1,10,50 --duration 10
+    python -m benchmarks.load_test --server asgi --async-views --compare benchmarks/results/baseline.json
+
+ASGI runs need ``uvicorn`` installed. To benchmark an externally started server (e.g. gunicorn), start
+``benchmarks.fake_paystack`` yourself, point the server's ``PAYSTACK_BASE_URL`` at it, run it with
+``DJANGO_SETTINGS_MODULE=benchmarks.settings`` and pass ``--target``.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import socket
+import socketserver
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_paystack import FakePaystackConfig, FakePaystackServer
+
+ENDPOINTS = {
+    "create": ("paystack-payment-list", "paystack-async-payment"),
+    "retrieve": ("paystack-payment-detail", "paystack-payment-detail"),
+    "callback": ("paystack-verification-verify-payment", "paystack-async-verification"),
+}
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+def round_ms(value):
+    return None if value is None else round(value, 3)
+
+
+def setup_django(paystack_url):
+    os.environ["PAYSTACK_BASE_URL"] = paystack_url
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    django.setup()
+    settings.ALLOWED_HOSTS.append("127.0.0.1")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    call_command("migrate", verbosity=0)
+
+
+def seed_transactions(prefix, count):
+    from gateways.paystack.models import PaystackTransaction
+
+    references = [f"{prefix}{uuid.uuid4().hex}" for _ in range(count)]
+    PaystackTransaction.objects.bulk_create(
+        [
+            PaystackTransaction(
+                reference=reference,
+                amount_minor=500000,
+                customer_name="Benchmark Customer",
+                customer_email="customer@example.com",
+                status=random.choice(["success", "pending", "failed"]),
+            )
+            for reference in references
+        ],
+        batch_size=1000,
+    )
+    return references
+
+
+def cleanup(prefix):
+    """
+    Deletes the transactions, outbox events and webhook events whose reference starts with ``prefix`` and
+    rebuilds the rollups without them.
+    """
+    from gateways.paystack.models import OutboxEvent, PaystackTransaction, PaystackWebhookEvent
+    from gateways.paystack.rollups import rebuild_rollups
+
+    for model in (OutboxEvent, PaystackWebhookEvent, PaystackTransaction):
+        deleted, _ = model.objects.filter(reference__startswith=prefix).delete()
+        if deleted:
+            print(f"Deleted {deleted} benchmark {model._meta.verbose_name_plural}")
+    rebuild_rollups()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_wsgi_server():
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    from django.core.wsgi import get_wsgi_application
+
+    class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = make_server(
+        "127.0.0.1", 0, get_wsgi_application(), server_class=ThreadingWSGIServer, handler_class=QuietHandler
+    )
+    threading.Thread(target=server.serve_forever, name="wsgi-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def start_asgi_server():
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("ASGI benchmarks need uvicorn: pip install uvicorn")
+    from django.core.asgi import get_asgi_application
+
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(get_asgi_application(), host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+    )
+    threading.Thread(target=server.run, name="asgi-server", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def scrape_db_queries(client, base_url, view):
+    """
+    Returns the (sum, count) of the ``http_request_db_queries`` histogram for ``view`` from ``/metrics``.
+    """
+    try:
+        text = client.get(f"{base_url}/metrics").text
+    except httpx.HTTPError:
+        return None
+    values = {}
+    for suffix in ("sum", "count"):
+        match = re.search(rf'^http_request_db_queries_{suffix}{{view="{re.escape(view)}"}} (\S+)$', text, re.M)
+        values[suffix] = float(match.group(1)) if match else 0.0
+    return values["sum"], values["count"]
+
+
+def build_request(endpoint, prefix, references, async_views):
+    if endpoint == "create":
+        path = "/api/v1/paystack/async/payment/" if async_views else "/api/v1/paystack/payment/"
+        payload = {"name": "Benchmark Customer", "email": "customer@example.com", "amount": 5000}
+        return "POST", path, {"json": payload}
+    if endpoint == "retrieve":
+        return "GET", f"/api/v1/paystack/payment/{random.choice(references)}/", {}
+    reference = f"{prefix}cb-{uuid.uuid4().hex}"
+    path = (
+        f"/api/v1/paystack/async/callback/{reference}/" if async_views else f"/api/v1/paystack/callback/{reference}/"
+    )
+    return "GET", path, {}
+
+
+def run_scenario(client, base_url, endpoint, concurrency, duration, prefix, references, async_views):
+    view = ENDPOINTS[endpoint][1 if async_views else 0]
+    before = scrape_db_queries(client, base_url, view)
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        samples = []
+        while time.perf_counter() < deadline:
+            method, path, kwargs = build_request(endpoint, prefix, references, async_views)
+            started = time.perf_counter()
+            try:
+                status_code = client.request(method, f"{base_url}{path}", **kwargs).status_code
+            except httpx.HTTPError:
+                status_code = None
+            samples.append((time.perf_counter() - started, status_code))
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(worker) for _ in range(concurrency)]
+        samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - started
+
+    after = scrape_db_queries(client, base_url, view)
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    errors = sum(1 for _, status_code in samples if status_code is None or status_code >= 400)
+    db_queries = None
+    if before and after and after[1] > before[1]:
+        db_queries = round((after[0] - before[0]) / (after[1] - before[1]), 2)
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 2),
+        "mean_ms": round_ms(statistics.fmean(latencies) if latencies else None),
+        "p50_ms": round_ms(percentile(latencies, 0.50)),
+        "p95_ms": round_ms(percentile(latencies, 0.95)),
+        "p99_ms": round_ms(percentile(latencies, 0.99)),
+        "db_queries_per_request": db_queries,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """
+    Prints p95 and throughput changes against a baseline result file.
+
+    Returns:
+        bool: True if any scenario's p95 latency regressed by more than ``threshold`` percent.
+    """
+    baseline = json.loads(Path(baseline_path).read_text())
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline["results"]}
+    regressed = False
+    for result in results["results"]:
+        old = previous.get((result["endpoint"], result["concurrency"]))
+        if not old or not old["p95_ms"] or not result["p95_ms"]:
+            continue
+        p95_change = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        rps_change = (result["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+        flag = ""
+        if p95_change > threshold:
+            regressed = True
+            flag = "  REGRESSION"
+        scenario = f"{result['endpoint']:>9} c={result['concurrency']:<4}"
+        p95 = f"p95 {old['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms ({p95_change:+.1f}%)"
+        rps = f"rps {old['rps']:.1f} -> {result['rps']:.1f} ({rps_change:+.1f}%)"
+        print(f"{scenario} {p95}, {rps}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["wsgi", "asgi"], default="wsgi")
+    parser.add_argument("--async-views", action="store_true", help="Use the async create/callback endpoints.")
+    parser.add_argument("--target", help="Benchmark an already running server at this base URL.")
+    parser.add_argument("--endpoints", default="create,retrieve,callback")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario.")
+    parser.add_argument("--seed", type=int, default=2000, help="Transactions to seed for retrieve.")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake Paystack latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake Paystack 500 rate.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fake Paystack 429 rate.")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>.json).")
+    parser.add_argument("--compare", help="Earlier result file to compare against.")
+    parser.add_argument("--fail-threshold", type=float, default=10.0, help="p95 regression %% that fails the run.")
+    args = parser.parse_args()
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}-"
+    config = FakePaystackConfig(
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        reference_prefix=f"{prefix}create-",
+    )
+    fake_paystack = FakePaystackServer(("127.0.0.1", 0), config).start()
+    setup_django(fake_paystack.url)
+    concurrencies = [int(level) for level in args.concurrency.split(",")]
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "server": "external" if args.target else args.server,
+        "async_views": args.async_views,
+        "config": {
+            "duration": args.duration,
+            "latency_ms": args.latency_ms,
+            "error_rate": args.error_rate,
+            "throttle_rate": args.throttle_rate,
+        },
+        "results": [],
+    }
+    try:
+        references = seed_transactions(prefix, args.seed)
+        base_url = args.target or (start_asgi_server() if args.server == "asgi" else start_wsgi_server())
+        client = httpx.Client(timeout=30, limits=httpx.Limits(max_connections=max(concurrencies) * 2))
+        for endpoint in args.endpoints.split(","):
+            for concurrency in concurrencies:
+                result = run_scenario(
+                    client, base_url, endpoint, concurrency, args.duration, prefix, references, args.async_views
+                )
+                results["results"].append(result)
+                print(json.dumps(result))
+    finally:
+        cleanup(prefix)
+
+    output = Path(args.output or f"benchmarks/results/{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare and compare(results, args.compare, args.fail_threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Bulk aggregation cost of amounts kept as integer minor units versus decimal display units.
+
+Inserts ``--rows`` transactions, then times the totals per status and currency two ways:
+
+* in the database: ``SUM`` over the ``amount_minor`` bigint column, and over the same values cast to
+  ``numeric``, the type the old decimal column was summed as (the cast adds a little cost of its own);
+* in Python, as the rollup rebuild and deltas accumulate rows: adding ints versus adding ``Decimal`` amounts.
+
+Both ways must agree to the minor unit. Run it against a local PostgreSQL (set ``DB_HOST`` etc.) with::
+
+    python -m benchmarks.money_benchmark --rows 200000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+BATCH_SIZE = 5000
+
+
+def timed_runs(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="Transactions to insert.")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per case; the median is reported.")
+    parser.add_argument("--keep", action="store_true", help="Keep the inserted rows.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
+    from django.db import models
+    from django.db.models.functions import Cast
+
+    from gateways.common.money import Money
+    from gateways.paystack.models import PaystackTransaction
+
+    run = uuid.uuid4().hex[:8]
+    for offset in range(0, args.rows, BATCH_SIZE):
+        PaystackTransaction.objects.bulk_create(
+            [
+                PaystackTransaction(
+                    reference=f"bench-{run}-{offset + i}",
+                    amount_minor=random.randint(100, 10_000_000),
+                    currency=random.choice(["NGN", "GHS", "USD"]),
+                    customer_name="Benchmark Customer",
+                    customer_email="customer@example.com",
+                    status=random.choice(["success", "pending", "failed", "abandoned"]),
+                )
+                for i in range(min(BATCH_SIZE, args.rows - offset))
+            ]
+        )
+    transactions = PaystackTransaction.objects.filter(reference__startswith=f"bench-{run}-")
+    grouped = transactions.order_by().values("status", "currency")
+
+    def sum_minor():
+        return {
+            (row["status"], row["currency"]): row["total"]
+            for row in grouped.annotate(total=models.Sum("amount_minor"))
+        }
+
+    def sum_decimal():
+        amount = Cast("amount_minor", models.DecimalField(max_digits=20, decimal_places=0))
+        return {(row["status"], row["currency"]): row["total"] for row in grouped.annotate(total=models.Sum(amount))}
+
+    rows = list(transactions.values_list("status", "currency", "amount_minor"))
+    decimal_rows = [(status, currency, Money(minor, currency).major) for status, currency, minor in rows]
+
+    def accumulate(values):
+        totals = {}
+        for status, currency, amount in values:
+            totals[status, currency] = totals.get((status, currency), 0) + amount
+        return totals
+
+    try:
+        minor_totals, decimal_totals = sum_minor(), sum_decimal()
+        if any(Decimal(minor) != Decimal(decimal_totals[key]) for key, minor in minor_totals.items()):
+            raise SystemExit("database totals differ")
+        decimal_sums = accumulate(decimal_rows)
+        if any(Money(minor, key[1]).major != decimal_sums[key] for key, minor in accumulate(rows).items()):
+            raise SystemExit("Python totals differ")
+
+        print(f"{'case':<32}{'bigint (ms)':>14}{'decimal (ms)':>14}{'speedup':>10}")
+        for name, minor, decimal in [
+            ("SUM in the database", sum_minor, sum_decimal),
+            (f"accumulate {len(rows)} rows", lambda: accumulate(rows), lambda: accumulate(decimal_rows)),
+        ]:
+            minor_ms, decimal_ms = timed_runs(minor, args.repeat), timed_runs(decimal, args.repeat)
+            print(f"{name:<32}{minor_ms:>14.2f}{decimal_ms:>14.2f}{decimal_ms / minor_ms:>9.1f}x")
+    finally:
+        if not args.keep:
+            transactions.delete()
+
+
+if __name__ == "__main__":
+    main()
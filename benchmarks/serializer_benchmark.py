@@ -0,0 +1,92 @@
+"""
+Read cost of PaystackTransaction through ``PaystackTransactionSerializer`` and the compiled read serializer.
+
+Inserts ``--rows`` transactions, then times a single-transaction retrieve and a list page of ``--page-size``
+rows both ways, including the query, serialization and JSON rendering, and checks that both produce the same
+bytes. Run it with::
+
+    python -m benchmarks.serializer_benchmark --rows 500 --page-size 50
+"""
+
+import argparse
+import os
+import statistics
+import time
+import uuid
+
+
+def timed_runs(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="Transactions to insert.")
+    parser.add_argument("--page-size", type=int, default=50, help="Rows per list page.")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per case; the median is reported.")
+    parser.add_argument("--keep", action="store_true", help="Keep the inserted rows.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+
+    django.setup()
+    from core.renderers import FastJSONRenderer
+    from gateways.paystack.models import PaystackTransaction
+    from gateways.paystack.readers import transaction_reader
+    from gateways.paystack.serializers import PaystackTransactionSerializer
+
+    run = uuid.uuid4().hex[:8]
+    PaystackTransaction.objects.bulk_create(
+        [
+            PaystackTransaction(
+                reference=f"bench-{run}-{i}",
+                amount_minor=(i % 1000) * 100 + 50,
+                customer_name="Benchmark Customer",
+                customer_email=f"customer{i}@example.com",
+                status="success",
+            )
+            for i in range(args.rows)
+        ]
+    )
+    renderer = FastJSONRenderer()
+    transactions = PaystackTransaction.objects.filter(reference__startswith=f"bench-{run}-")
+    reference = f"bench-{run}-{args.rows // 2}"
+
+    def retrieve_default():
+        return renderer.render(PaystackTransactionSerializer(transactions.filter(reference=reference).first()).data)
+
+    def retrieve_compiled():
+        row = transaction_reader.values(transactions.filter(reference=reference)).first()
+        return renderer.render(transaction_reader.to_representation(row))
+
+    def list_default():
+        rows = transactions.order_by("-created_at", "-id")[: args.page_size]
+        return renderer.render(PaystackTransactionSerializer(rows, many=True).data)
+
+    def list_compiled():
+        rows = transaction_reader.values(transactions.order_by("-created_at", "-id")[: args.page_size])
+        return renderer.render(transaction_reader.many(rows))
+
+    try:
+        print(f"{'case':<24}{'serializer (us)':>18}{'compiled (us)':>16}{'speedup':>10}")
+        for name, default, compiled in [
+            ("retrieve", retrieve_default, retrieve_compiled),
+            (f"list ({args.page_size} rows)", list_default, list_compiled),
+        ]:
+            if default() != compiled():
+                raise SystemExit(f"{name}: outputs differ")
+            default_us, compiled_us = timed_runs(default, args.repeat), timed_runs(compiled, args.repeat)
+            print(f"{name:<24}{default_us:>18.1f}{compiled_us:>16.1f}{default_us / compiled_us:>9.1f}x")
+    finally:
+        if not args.keep:
+            transactions.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Settings for the benchmarks: ``core.settings`` pointed at a separate database, so benchmark runs never write to
+the application's own data.
+
+The database is ``BENCHMARK_DB_NAME`` (``<DB_NAME>_benchmark`` by default) on the same server; create it once
+with ``createdb``. Read replicas are left out, since they replicate the application's database.
+"""
+
+from core.settings import *  # noqa: F401,F403
+from core.settings import DATABASES, env
+
+DATABASES = {
+    "default": {
+        **DATABASES["default"],
+        "NAME": env("BENCHMARK_DB_NAME", default=f"{DATABASES['default']['NAME']}_benchmark"),
+    }
+}
+DATABASE_REPLICAS = []
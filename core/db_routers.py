@@ -0,0 +1,66 @@
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Per-request routing state, bound by ``core.middleware.DatabaseRoutingMiddleware``. Replicas are only used
+# while it is bound, so management commands and background workers always read from the primary.
+routing_state = contextvars.ContextVar("routing_state", default=None)
+
+PIN_KEY_PREFIX = "db:pinned:"
+
+
+def pin_reads(*keys):
+    """
+    Sends reads of ``keys`` (e.g. transaction references) to the primary for ``DB_REPLICA_PIN_SECONDS``, the
+    time replicas may take to catch up with a write to them. Does nothing without replicas.
+    """
+    if settings.DATABASE_REPLICAS and keys:
+        cache.set_many({f"{PIN_KEY_PREFIX}{key}": 1 for key in keys}, settings.DB_REPLICA_PIN_SECONDS)
+
+
+def reads_pinned(key):
+    return bool(settings.DATABASE_REPLICAS) and cache.get(f"{PIN_KEY_PREFIX}{key}") is not None
+
+
+def read_alias(key):
+    """
+    Returns the alias to read ``key`` from when the caller needs it to reflect recent writes to it: the primary
+    while ``key`` is pinned, otherwise None to let the router decide.
+    """
+    return DEFAULT_DB_ALIAS if reads_pinned(key) else None
+
+
+class ReplicaRouter:
+    """
+    Sends reads of the models in ``DATABASE_REPLICA_MODELS`` to a random replica in ``DATABASE_REPLICAS`` and
+    everything else to the primary.
+
+    Reads stay on the primary inside a transaction, for the rest of a request once it has written anything
+    (read-your-writes within a request), and outside requests. Writes that other requests must see at once
+    are pinned by key with ``pin_reads`` and read through ``read_alias``. Migrations only run on the primary;
+    the replicas are expected to be streaming copies of it.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or model._meta.label_lower not in settings.DATABASE_REPLICA_MODELS:
+            return None
+        state = routing_state.get()
+        if state is None or state["wrote"] or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,30 @@
+"""
+JSON encoding and decoding through ``orjson`` when it is installed, with the standard library as fallback.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without the optional dependency
+    orjson = None
+
+
+def loads(data):
+    """
+    Decodes a JSON document from ``bytes`` or ``str``.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def response_json(response):
+    """
+    Decodes the JSON body of a ``requests`` or ``httpx`` response straight from its bytes, skipping the
+    text decoding step ``response.json()`` goes through.
+    """
+    content = getattr(response, "content", None)
+    if orjson is not None and isinstance(content, (bytes, bytearray)):
+        return orjson.loads(content)
+    return response.json()
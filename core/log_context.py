@@ -0,0 +1,36 @@
+import contextvars
+from contextlib import contextmanager
+
+log_context = contextvars.ContextVar("log_context", default=None)
+
+
+def get_log_context():
+    """
+    Returns the correlation fields (request ID, payment reference, ...) bound to the current context.
+    """
+    return log_context.get() or {}
+
+
+@contextmanager
+def bind_log_context(**fields):
+    """
+    Binds ``fields`` to every record logged inside the block, on top of any fields already bound.
+
+    Yields:
+        dict: The bound fields. ``add_log_context`` updates this dict in place.
+    """
+    token = log_context.set({**get_log_context(), **fields})
+    try:
+        yield log_context.get()
+    finally:
+        log_context.reset(token)
+
+
+def add_log_context(**fields):
+    """
+    Adds ``fields`` to the fields bound by the enclosing ``bind_log_context`` block (for example the request's),
+    so records logged later in the block carry them too. Does nothing outside such a block.
+    """
+    context = log_context.get()
+    if context is not None:
+        context.update(fields)
@@ -1,14 +1,68 @@
-from datetime import datetime
+import time
 
 from pythonjsonlogger import jsonlogger
 
+from core.log_context import get_log_context
+from core.metrics import request_timings
+
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
+    """
+    JSON formatter adding a UTC timestamp, the level, the correlation fields bound with
+    ``core.log_context.bind_log_context`` and the current request's timing fields.
+
+    Records prepared by ``core.logging_handlers.QueueLogHandler`` carry snapshots of the correlation and timing
+    fields taken when they were logged, since they are formatted later on another thread.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timestamp_cache = (None, "")
+
     def add_fields(self, log_record, record, message_dict):
         super().add_fields(log_record, record, message_dict)
         if not log_record.get("timestamp"):
-            log_record["timestamp"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            log_record["timestamp"] = self.format_timestamp(record.created)
         if log_record.get("level"):
             log_record["level"] = log_record["level"].upper()
         else:
             log_record["level"] = record.levelname
+        self.add_context_fields(log_record, record)
+        self.add_timing_fields(log_record, record)
+
+    def format_timestamp(self, created):
+        """
+        Formats ``created`` as ``%Y-%m-%dT%H:%M:%S.%fZ`` (UTC), reusing the formatted date and time for records
+        logged within the same second.
+        """
+        second = int(created)
+        cached_second, prefix = self._timestamp_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._timestamp_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}Z"
+
+    def add_context_fields(self, log_record, record):
+        """
+        Adds the correlation fields bound when the record was logged; fields passed in ``extra`` win.
+        """
+        context = getattr(record, "_log_context", None)
+        for name, value in (get_log_context() if context is None else context).items():
+            log_record.setdefault(name, value)
+
+    def add_timing_fields(self, log_record, record):
+        """
+        Adds the current request's timing fields (see ``core.middleware.MetricsMiddleware``), in milliseconds.
+        """
+        timings = (
+            getattr(record, "_timings", None)
+            or request_timings.get()
+            or getattr(getattr(record, "request", None), "timings", None)
+        )
+        if not timings:
+            return
+        for name, value in timings.items():
+            if name.endswith("_seconds"):
+                log_record[f"{name[: -len('_seconds')]}_ms"] = round(value * 1000, 3)
+            else:
+                log_record[name] = value
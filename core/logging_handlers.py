@@ -0,0 +1,192 @@
+import copy
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+
+from core.log_context import get_log_context
+from core.metrics import registry, request_timings
+
+log_records_dropped = registry.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full or busy.", ["level"]
+)
+
+
+class QueueLogHandler(logging.Handler):
+    """
+    Handler that puts records on a bounded in-memory queue and writes them from a background thread.
+
+    Logging call sites only copy the correlation and timing fields onto the record and enqueue it; formatting
+    and writing happen on the writer thread, which drains up to ``batch_size`` records at a time and writes
+    them to ``stream`` with a single write and flush, so a slow stdout never blocks request workers.
+
+    When the queue is more than ``debug_high_water`` full, only ``debug_sample_rate`` of DEBUG records are
+    kept. When it is full, DEBUG and INFO records are dropped; WARNING and above wait up to ``block_timeout``
+    seconds for room before being dropped. Drops are counted in ``log_records_dropped_total`` and reported by
+    the writer in a warning record.
+
+    Args:
+        stream: The stream written to. Defaults to ``sys.stderr``, like ``logging.StreamHandler``.
+        queue_size (int): The maximum number of records waiting to be written.
+        batch_size (int): The maximum number of records written per write.
+        debug_high_water (float): The queue fill ratio above which DEBUG records are sampled.
+        debug_sample_rate (float): The share of DEBUG records kept above ``debug_high_water``.
+        block_timeout (float): How long WARNING and above wait for room in a full queue, in seconds.
+        close_timeout (float): How long ``close`` waits for the writer to finish, in seconds.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        queue_size=10000,
+        batch_size=500,
+        debug_high_water=0.5,
+        debug_sample_rate=0.0,
+        block_timeout=0.1,
+        close_timeout=5,
+    ):
+        super().__init__()
+        self.stream = stream
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.debug_high_water = debug_high_water
+        self.debug_sample_rate = debug_sample_rate
+        self.block_timeout = block_timeout
+        self.close_timeout = close_timeout
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._writer = None
+        self._writer_pid = None
+        self._writer_lock = threading.Lock()
+        self._closing = threading.Event()
+
+    def ensure_writer(self):
+        """
+        Starts the writer thread on first use, and again in a forked worker, where it does not survive the fork.
+        """
+        if self._writer_pid == os.getpid() and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer_pid != os.getpid() or not self._writer.is_alive():
+                if self._writer_pid not in (None, os.getpid()):
+                    # Records queued in the parent were copied into the child; the parent writes them.
+                    self.queue = queue.Queue(maxsize=self.queue_size)
+                self._closing.clear()
+                self._writer = threading.Thread(target=self.write_loop, name="log-writer", daemon=True)
+                self._writer_pid = os.getpid()
+                self._writer.start()
+
+    def accepts(self, record):
+        """
+        Applies the DEBUG sampling policy.
+        """
+        if record.levelno > logging.DEBUG or self.queue.qsize() < self.queue_size * self.debug_high_water:
+            return True
+        return random.random() < self.debug_sample_rate
+
+    def prepare(self, record):
+        """
+        Returns a copy of ``record`` with what has to be read on the logging thread resolved: the message, the
+        exception text and snapshots of the correlation and request timing fields. Like
+        ``logging.handlers.QueueHandler.prepare``, it copies rather than modifies the record, which other
+        handlers may still format.
+        """
+        prepared = copy.copy(record)
+        if not isinstance(record.msg, dict):
+            prepared.msg, prepared.args = record.getMessage(), None
+        if record.exc_info:
+            prepared.exc_text = record.exc_text or (self.formatter or logging.Formatter()).formatException(
+                record.exc_info
+            )
+            prepared.exc_info = None
+        prepared._log_context = dict(get_log_context())
+        timings = request_timings.get()
+        if timings:
+            prepared._timings = dict(timings)
+        return prepared
+
+    def emit(self, record):
+        try:
+            self.ensure_writer()
+            if not self.accepts(record):
+                self.drop(record)
+                return
+            record = self.prepare(record)
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.drop(record)
+        except Exception:
+            self.handleError(record)
+
+    def drop(self, record):
+        with self._dropped_lock:
+            self.dropped += 1
+        log_records_dropped.inc(level=record.levelname)
+
+    def write_loop(self):
+        while True:
+            records = [self.queue.get()]
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in records
+            try:
+                self.write([record for record in records if record is not None])
+            finally:
+                for _ in records:
+                    self.queue.task_done()
+            if stop or (self._closing.is_set() and self.queue.empty()):
+                return
+
+    def write(self, records):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            records.append(
+                logging.LogRecord(__name__, logging.WARNING, __file__, 0, "Dropped %d log records", (dropped,), None)
+            )
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        stream = self.stream or sys.stderr
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except Exception:
+            self.handleError(records[0])
+
+    def flush(self):
+        """
+        Waits until the records queued so far have been written.
+        """
+        if self._writer_pid == os.getpid() and self._writer.is_alive():
+            self.queue.join()
+
+    def close(self):
+        """
+        Writes the remaining records and stops the writer thread, waiting at most ``close_timeout`` seconds.
+
+        The writer stops on the ``None`` sentinel, or once it has drained the queue when the queue is too full to
+        take the sentinel; a writer stuck on a blocked stream is left behind as a daemon thread.
+        """
+        if self._writer_pid == os.getpid() and self._writer.is_alive():
+            self._closing.set()
+            try:
+                self.queue.put(None, timeout=self.block_timeout)
+            except queue.Full:
+                pass
+            self._writer.join(timeout=self.close_timeout)
+        super().close()
@@ -0,0 +1,290 @@
+import math
+import re
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+
+from core.db_routers import routing_state
+from core.log_context import add_log_context, bind_log_context
+from core.metrics import (
+    http_request_db_duration,
+    http_request_db_queries,
+    http_request_duration,
+    http_requests_in_flight,
+    request_timings,
+)
+from gateways.common.tenants import current_tenant, tenant_request_duration, tenant_requests_rejected, tenant_resolver
+from gateways.paystack.ratelimit import rate_limiter
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """
+    Adds query time and count to the current request's timing fields.
+    """
+    timings = request_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings["db_seconds"] += time.perf_counter() - started
+        timings["db_queries"] += 1
+
+
+def install_db_execute_wrapper(connection, **kwargs):
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+connection_created.connect(install_db_execute_wrapper)
+
+
+class MetricsMiddleware:
+    """
+    Records request latency, in-flight requests and database time/queries per request.
+
+    The timing fields collected while handling a request (database, upstream and serializer time) are kept in
+    ``core.metrics.request_timings`` and on ``request.timings`` so the JSON log formatter can attach them to every
+    record logged for the request. They are also returned in a ``Server-Timing`` header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def start(self, request):
+        install_db_execute_wrapper(connection)
+        timings = {"db_seconds": 0.0, "db_queries": 0}
+        request.timings = timings
+        http_requests_in_flight.inc()
+        return timings, request_timings.set(timings), time.perf_counter()
+
+    def finish(self, request, response, timings, token, started):
+        request_timings.reset(token)
+        http_requests_in_flight.dec()
+        timings["duration_seconds"] = time.perf_counter() - started
+
+        view = getattr(request.resolver_match, "view_name", None) or "unmatched"
+        status_code = getattr(response, "status_code", 500)
+        http_request_duration.observe(
+            timings["duration_seconds"], view=view, method=request.method, status=status_code
+        )
+        http_request_db_duration.observe(timings["db_seconds"], view=view)
+        http_request_db_queries.observe(timings["db_queries"], view=view)
+        if response is not None:
+            response["Server-Timing"] = ", ".join(
+                f"{name[: -len('_seconds')]};dur={value * 1000:.2f}"
+                for name, value in timings.items()
+                if name.endswith("_seconds")
+            )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token, started = self.start(request)
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            self.finish(request, response, timings, token, started)
+
+    async def __acall__(self, request):
+        timings, token, started = self.start(request)
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            self.finish(request, response, timings, token, started)
+
+
+class RequestIDMiddleware:
+    """
+    Binds a request ID, and the payment reference of views that take one, to every record logged while handling
+    the request (see ``core.log_context``).
+
+    The ID is taken from the ``X-Request-ID`` header when it is a plausible ID, so it can be followed across
+    services, and generated otherwise. It is returned in the ``X-Request-ID`` response header.
+    """
+
+    header = "X-Request-ID"
+    valid_id = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def request_id(self, request):
+        request_id = request.headers.get(self.header, "")
+        return request_id if self.valid_id.match(request_id) else uuid.uuid4().hex
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if "reference" in view_kwargs:
+            add_log_context(reference=view_kwargs["reference"])
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.request_id = self.request_id(request)
+        with bind_log_context(request_id=request.request_id):
+            response = self.get_response(request)
+        response[self.header] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        request.request_id = self.request_id(request)
+        with bind_log_context(request_id=request.request_id):
+            response = await self.get_response(request)
+        response[self.header] = request.request_id
+        return response
+
+
+class DatabaseRoutingMiddleware:
+    """
+    Scopes ``core.db_routers.ReplicaRouter``'s read-your-writes state to the request, so reads go back to the
+    primary once the request has written anything.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = routing_state.set({"wrote": False})
+        try:
+            return self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+    async def __acall__(self, request):
+        token = routing_state.set({"wrote": False})
+        try:
+            return await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+
+class TenantMiddleware:
+    """
+    Identifies the tenant calling the API from its ``X-API-Key`` header and enforces the tenant's request quota.
+
+    Keys are resolved through ``gateways.common.tenants.tenant_resolver``'s cache, so a known key costs no
+    database query. The tenant is set on ``request.tenant``, made current for Paystack calls (which then use the
+    tenant's secret key) and bound to the log context; per-tenant latency goes to
+    ``tenant_request_duration_seconds``. Paths outside ``/api/`` and those matching ``TENANT_EXEMPT_PATHS``
+    are passed through untouched. Requests without a key are rejected only when ``TENANT_AUTH_REQUIRED`` is set.
+
+    Quotas are token buckets of ``rate_limit`` requests per second with ``burst`` headroom, kept in the store
+    named by ``PAYSTACK_RATE_LIMIT_STORE`` so they are shared by every worker when that store is Redis.
+    """
+
+    header = "X-API-Key"
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.exempt_paths = [re.compile(pattern) for pattern in settings.TENANT_EXEMPT_PATHS]
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def applies_to(self, request):
+        return request.path.startswith("/api/") and not any(
+            pattern.match(request.path) for pattern in self.exempt_paths
+        )
+
+    def quota(self, tenant):
+        """
+        Returns the ``take`` arguments for ``tenant``'s token bucket, or None when there is no quota to enforce.
+        """
+        if tenant is None or not tenant.rate_limit:
+            return None
+        return f"ratelimit:tenant:{tenant.id}", tenant.rate_limit, max(tenant.burst, 1), 0
+
+    def reject(self, request, tenant, wait=0):
+        """
+        Returns the 401 or 429 response for a request that may not proceed, or None. ``wait`` is what taking
+        a token from the tenant's bucket returned.
+        """
+        if tenant is None:
+            if request.headers.get(self.header) or settings.TENANT_AUTH_REQUIRED:
+                tenant_requests_rejected.inc(tenant="", reason="unauthorized")
+                return JsonResponse({"error": "Invalid or missing API key"}, status=401)
+            return None
+        if wait:
+            tenant_requests_rejected.inc(tenant=tenant.name, reason="rate_limited")
+            response = JsonResponse({"error": "Request quota exceeded"}, status=429)
+            response["Retry-After"] = str(math.ceil(wait))
+            return response
+        return None
+
+    def start(self, request, tenant):
+        request.tenant = tenant
+        log_fields = {"tenant": tenant.name} if tenant else {}
+        return current_tenant.set(tenant), bind_log_context(**log_fields), time.perf_counter()
+
+    def finish(self, tenant, response, token, started):
+        current_tenant.reset(token)
+        if tenant is not None:
+            status_code = getattr(response, "status_code", 500)
+            tenant_request_duration.observe(time.perf_counter() - started, tenant=tenant.name, status=status_code)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.applies_to(request):
+            return self.get_response(request)
+        raw_key = request.headers.get(self.header)
+        tenant = tenant_resolver.by_key(raw_key) if raw_key else None
+        quota = self.quota(tenant)
+        rejection = self.reject(request, tenant, rate_limiter.store.take(*quota) if quota else 0)
+        if rejection is not None:
+            return rejection
+        token, log_context, started = self.start(request, tenant)
+        response = None
+        try:
+            with log_context:
+                response = self.get_response(request)
+            return response
+        finally:
+            self.finish(tenant, response, token, started)
+
+    async def __acall__(self, request):
+        if not self.applies_to(request):
+            return await self.get_response(request)
+        raw_key = request.headers.get(self.header)
+        tenant = await tenant_resolver.aby_key(raw_key) if raw_key else None
+        quota = self.quota(tenant)
+        rejection = self.reject(request, tenant, await rate_limiter.store.atake(*quota) if quota else 0)
+        if rejection is not None:
+            return rejection
+        token, log_context, started = self.start(request, tenant)
+        response = None
+        try:
+            with log_context:
+                response = await self.get_response(request)
+            return response
+        finally:
+            self.finish(tenant, response, token, started)
@@ -0,0 +1,20 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from core.fastjson import orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    ``JSONParser`` that decodes UTF-8 bodies with ``orjson`` when it is installed. Other encodings, and every
+    body when ``orjson`` is not installed, go through the stock parser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
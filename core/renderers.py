@@ -0,0 +1,48 @@
+import math
+
+from rest_framework.renderers import JSONRenderer
+
+from core.fastjson import orjson
+
+
+def has_non_finite_float(data):
+    """
+    Returns True if ``data`` holds NaN or an infinity anywhere in its dicts, lists and tuples.
+    """
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(has_non_finite_float(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(has_non_finite_float(value) for value in data)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that encodes with ``orjson`` when it is installed.
+
+    Output is the same as DRF's compact renderer except for floats in exponent notation, which ``orjson`` writes
+    as ``1e16`` and ``1e-7`` where DRF writes ``1e+16`` and ``1e-07``; both parse to the same value. Datetimes
+    and anything else ``orjson`` does not handle the same way go through DRF's encoder, and U+2028/U+2029 are
+    escaped. ``orjson`` writes NaN and infinities as ``null``, so output containing ``null`` is checked for them
+    and, if any are found, rendered by the stock renderer, which rejects them with ``ValueError`` like DRF does.
+    Indented output (the browsable API, ``; indent=`` in the Accept header) and values ``orjson`` cannot encode,
+    such as integers wider than 64 bits, fall back to the stock renderer too, as does everything when ``orjson``
+    is not installed.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"null" in ret and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
@@ -46,11 +46,15 @@ DJANGO_APPS = [
 
 THIRD_PARTY_APPS = ["rest_framework", "drf_yasg"]
 
-LOCAL_APPS = ["gateways.paystack"]
+LOCAL_APPS = ["gateways.common", "gateways.paystack"]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "core.middleware.RequestIDMiddleware",
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.TenantMiddleware",
+    "core.middleware.DatabaseRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -60,6 +64,18 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
 ROOT_URLCONF = "core.urls"
 
 TEMPLATES = [
@@ -92,9 +108,35 @@ DATABASES = {
         "PASSWORD": env("DB_PASSWORD"),
         "HOST": env("DB_HOST"),
         "PORT": env("DB_PORT"),
+        # Keep connections open across requests (seconds; 0 closes them after each request, None never does)
+        # and check they still work before reusing them. Set DB_CONN_MAX_AGE=0 under ASGI and pool with
+        # PgBouncer instead.
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
     }
 }
 
+# Read replicas ("host" or "host:port"), used for reads of DATABASE_REPLICA_MODELS
+DATABASE_REPLICAS = []
+for index, replica in enumerate(env.list("DB_REPLICA_HOSTS", default=[])):
+    host, _, port = replica.partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+DATABASE_REPLICA_MODELS = env.list("DATABASE_REPLICA_MODELS", default=["paystack.paystacktransaction"])
+DATABASE_ROUTERS = ["core.db_routers.ReplicaRouter"]
+# How long reads of a transaction stay on the primary after it changes (replica lag allowance, seconds)
+DB_REPLICA_PIN_SECONDS = env.int("DB_REPLICA_PIN_SECONDS", default=5)
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -137,6 +179,19 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Metrics: /metrics is off by default; when enabled it answers staff users and requests that send
+# METRICS_TOKEN as a bearer token
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=False)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
+# Logging: LOG_QUEUE_ENABLED formats and writes records in batches on a background thread
+LOG_LEVEL = env("LOG_LEVEL", default="INFO")
+LOG_QUEUE_ENABLED = env.bool("LOG_QUEUE_ENABLED", default=False)
+LOG_QUEUE_SIZE = env.int("LOG_QUEUE_SIZE", default=10000)
+LOG_QUEUE_BATCH_SIZE = env.int("LOG_QUEUE_BATCH_SIZE", default=500)
+LOG_QUEUE_DEBUG_HIGH_WATER = env.float("LOG_QUEUE_DEBUG_HIGH_WATER", default=0.5)
+LOG_QUEUE_DEBUG_SAMPLE_RATE = env.float("LOG_QUEUE_DEBUG_SAMPLE_RATE", default=0.0)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -150,10 +205,121 @@ LOGGING = {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
             "formatter": "json",
-        }
+        },
+        "queue": {
+            "level": "DEBUG",
+            "class": "core.logging_handlers.QueueLogHandler",
+            "formatter": "json",
+            "queue_size": LOG_QUEUE_SIZE,
+            "batch_size": LOG_QUEUE_BATCH_SIZE,
+            "debug_high_water": LOG_QUEUE_DEBUG_HIGH_WATER,
+            "debug_sample_rate": LOG_QUEUE_DEBUG_SAMPLE_RATE,
+        },
     },
-    "root": {"level": "INFO", "handlers": ["console"]},
+    "root": {"level": LOG_LEVEL, "handlers": ["queue" if LOG_QUEUE_ENABLED else "console"]},
 }
 
 PAYSTACK_SECRET_KEY = env("PAYSTACK_SECRET_KEY")
 PAYSTACK_PUBLIC_KEY = env("PAYSTACK_PUBLIC_KEY")
+PAYSTACK_BASE_URL = env("PAYSTACK_BASE_URL", default="https://api.paystack.co")
+
+# Paystack HTTP connection pool and timeouts (seconds)
+PAYSTACK_HTTP_POOL_CONNECTIONS = env.int("PAYSTACK_HTTP_POOL_CONNECTIONS", default=10)
+PAYSTACK_HTTP_POOL_MAXSIZE = env.int("PAYSTACK_HTTP_POOL_MAXSIZE", default=50)
+PAYSTACK_HTTP_POOL_BLOCK = env.bool("PAYSTACK_HTTP_POOL_BLOCK", default=False)
+PAYSTACK_CONNECT_TIMEOUT = env.float("PAYSTACK_CONNECT_TIMEOUT", default=3.05)
+PAYSTACK_READ_TIMEOUT = env.float("PAYSTACK_READ_TIMEOUT", default=10.0)
+PAYSTACK_ASYNC_MAX_CONNECTIONS = env.int("PAYSTACK_ASYNC_MAX_CONNECTIONS", default=1000)
+
+# Paystack webhook queue
+PAYSTACK_WEBHOOK_QUEUE = env("PAYSTACK_WEBHOOK_QUEUE", default="gateways.paystack.queues.DatabaseWebhookQueue")
+PAYSTACK_WEBHOOK_MAX_ATTEMPTS = env.int("PAYSTACK_WEBHOOK_MAX_ATTEMPTS", default=5)
+PAYSTACK_WEBHOOK_VISIBILITY_TIMEOUT = env.int("PAYSTACK_WEBHOOK_VISIBILITY_TIMEOUT", default=300)
+
+# Transaction retrieval cache (TTLs in seconds)
+PAYSTACK_CACHE_ALIAS = env("PAYSTACK_CACHE_ALIAS", default="default")
+PAYSTACK_CACHE_LOCAL_MAXSIZE = env.int("PAYSTACK_CACHE_LOCAL_MAXSIZE", default=10000)
+PAYSTACK_CACHE_LOCAL_TTL = env.float("PAYSTACK_CACHE_LOCAL_TTL", default=1.0)
+PAYSTACK_CACHE_PENDING_TTL = env.int("PAYSTACK_CACHE_PENDING_TTL", default=5)
+PAYSTACK_CACHE_SETTLED_TTL = env.int("PAYSTACK_CACHE_SETTLED_TTL", default=3600)
+PAYSTACK_CACHE_MISSING_TTL = env.int("PAYSTACK_CACHE_MISSING_TTL", default=10)
+
+# Verify call coalescing across workers (seconds)
+PAYSTACK_SINGLEFLIGHT_LOCK_TTL = env.float("PAYSTACK_SINGLEFLIGHT_LOCK_TTL", default=15.0)
+PAYSTACK_SINGLEFLIGHT_RESULT_TTL = env.float("PAYSTACK_SINGLEFLIGHT_RESULT_TTL", default=2.0)
+PAYSTACK_SINGLEFLIGHT_POLL_INTERVAL = env.float("PAYSTACK_SINGLEFLIGHT_POLL_INTERVAL", default=0.05)
+
+# Idempotency-Key records for payment initialization
+PAYSTACK_IDEMPOTENCY_TTL = env.int("PAYSTACK_IDEMPOTENCY_TTL", default=86400)
+PAYSTACK_IDEMPOTENCY_LOCAL_MAXSIZE = env.int("PAYSTACK_IDEMPOTENCY_LOCAL_MAXSIZE", default=10000)
+
+# Paystack circuit breaker, retries and load shedding
+PAYSTACK_CIRCUIT_FAILURE_THRESHOLD = env.int("PAYSTACK_CIRCUIT_FAILURE_THRESHOLD", default=5)
+PAYSTACK_CIRCUIT_FAILURE_WINDOW = env.int("PAYSTACK_CIRCUIT_FAILURE_WINDOW", default=30)
+PAYSTACK_CIRCUIT_RECOVERY_TIMEOUT = env.int("PAYSTACK_CIRCUIT_RECOVERY_TIMEOUT", default=30)
+PAYSTACK_RETRY_ATTEMPTS = env.int("PAYSTACK_RETRY_ATTEMPTS", default=2)
+PAYSTACK_RETRY_BACKOFF = env.float("PAYSTACK_RETRY_BACKOFF", default=0.2)
+PAYSTACK_RETRY_BACKOFF_MAX = env.float("PAYSTACK_RETRY_BACKOFF_MAX", default=2.0)
+PAYSTACK_MAX_IN_FLIGHT = env.int("PAYSTACK_MAX_IN_FLIGHT", default=0)
+
+# Client-side Paystack rate limits: (requests per second, burst); a rate of 0 disables the budget
+PAYSTACK_RATE_LIMITS = {
+    "initialize": (
+        env.float("PAYSTACK_INITIALIZE_RATE_LIMIT", default=0),
+        env.int("PAYSTACK_INITIALIZE_RATE_BURST", default=10),
+    ),
+    "verify": (
+        env.float("PAYSTACK_VERIFY_RATE_LIMIT", default=0),
+        env.int("PAYSTACK_VERIFY_RATE_BURST", default=10),
+    ),
+}
+PAYSTACK_RATE_LIMIT_MODE = env("PAYSTACK_RATE_LIMIT_MODE", default="wait")
+PAYSTACK_RATE_LIMIT_MAX_WAIT = env.float("PAYSTACK_RATE_LIMIT_MAX_WAIT", default=5.0)
+PAYSTACK_RATE_LIMIT_STORE = env(
+    "PAYSTACK_RATE_LIMIT_STORE", default="gateways.paystack.ratelimit.LocalTokenBucketStore"
+)
+# Redis server for gateways.paystack.ratelimit.RedisTokenBucketStore, e.g. redis://localhost:6379/0
+PAYSTACK_RATE_LIMIT_REDIS_URL = env("PAYSTACK_RATE_LIMIT_REDIS_URL", default="")
+
+# Batch payment initialization
+PAYSTACK_BATCH_MAX_SIZE = env.int("PAYSTACK_BATCH_MAX_SIZE", default=1000)
+PAYSTACK_BATCH_CONCURRENCY = env.int("PAYSTACK_BATCH_CONCURRENCY", default=10)
+
+# Transaction rollups
+PAYSTACK_ROLLUP_MAX_DAYS = env.int("PAYSTACK_ROLLUP_MAX_DAYS", default=366)
+
+# Polling of initialized transactions: delays (seconds) before each verify attempt, and how long a claimed
+# batch is held before another worker may take it over
+PAYSTACK_POLL_SCHEDULE = env.list("PAYSTACK_POLL_SCHEDULE", cast=int, default=[30, 120, 600, 3600])
+PAYSTACK_POLL_LEASE = env.int("PAYSTACK_POLL_LEASE", default=300)
+
+# Transactional outbox of payment events for downstream systems, published by the relay_outbox_events command
+PAYSTACK_OUTBOX_ENABLED = env.bool("PAYSTACK_OUTBOX_ENABLED", default=False)
+PAYSTACK_OUTBOX_SINK = env("PAYSTACK_OUTBOX_SINK", default="gateways.paystack.outbox.HttpOutboxSink")
+PAYSTACK_OUTBOX_WEBHOOK_URL = env("PAYSTACK_OUTBOX_WEBHOOK_URL", default="")
+PAYSTACK_OUTBOX_WEBHOOK_SECRET = env("PAYSTACK_OUTBOX_WEBHOOK_SECRET", default="")
+PAYSTACK_OUTBOX_FILE_PATH = env("PAYSTACK_OUTBOX_FILE_PATH", default=str(BASE_DIR / "outbox.ndjson"))
+PAYSTACK_OUTBOX_TIMEOUT = env.float("PAYSTACK_OUTBOX_TIMEOUT", default=5.0)
+PAYSTACK_OUTBOX_CONCURRENCY = env.int("PAYSTACK_OUTBOX_CONCURRENCY", default=8)
+PAYSTACK_OUTBOX_MAX_ATTEMPTS = env.int("PAYSTACK_OUTBOX_MAX_ATTEMPTS", default=10)
+PAYSTACK_OUTBOX_BACKOFF = env.float("PAYSTACK_OUTBOX_BACKOFF", default=5.0)
+PAYSTACK_OUTBOX_BACKOFF_MAX = env.float("PAYSTACK_OUTBOX_BACKOFF_MAX", default=3600.0)
+PAYSTACK_OUTBOX_VISIBILITY_TIMEOUT = env.int("PAYSTACK_OUTBOX_VISIBILITY_TIMEOUT", default=60)
+
+# Transaction endpoints ("retrieve", "list") served through the compiled read serializer
+PAYSTACK_COMPILED_SERIALIZER_ENDPOINTS = env.list("PAYSTACK_COMPILED_SERIALIZER_ENDPOINTS", default=[])
+
+# Payment providers available to the gateway router, in priority order
+PAYMENT_GATEWAYS = env.list("PAYMENT_GATEWAYS", default=["gateways.paystack.utils.PaystackPaymentGateway"])
+PAYMENT_GATEWAY_HEALTH_ALPHA = env.float("PAYMENT_GATEWAY_HEALTH_ALPHA", default=0.2)
+
+# Per-tenant API keys (X-API-Key header) for /api/ paths. Without TENANT_AUTH_REQUIRED, requests with no key are
+# served as before, with the global Paystack key; exempt paths (Paystack's webhooks and customer redirects)
+# never take a key. Resolved keys are cached in-process for TENANT_API_KEY_CACHE_TTL seconds.
+TENANT_AUTH_REQUIRED = env.bool("TENANT_AUTH_REQUIRED", default=False)
+TENANT_EXEMPT_PATHS = env.list(
+    "TENANT_EXEMPT_PATHS", default=[r"^/api/v1/paystack/(webhook|callback|async/callback)/"]
+)
+TENANT_API_KEY_CACHE_TTL = env.float("TENANT_API_KEY_CACHE_TTL", default=60.0)
+TENANT_API_KEY_MISSING_TTL = env.float("TENANT_API_KEY_MISSING_TTL", default=5.0)
+TENANT_API_KEY_CACHE_MAXSIZE = env.int("TENANT_API_KEY_CACHE_MAXSIZE", default=10000)
@@ -21,6 +21,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from core.views import metrics
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Payment Gateway API",
@@ -36,6 +38,8 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
     path("", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
     path("api/v1/paystack/", include("gateways.paystack.urls")),
+    path("api/v1/payments/", include("gateways.common.urls")),
 ]
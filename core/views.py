@@ -0,0 +1,34 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from core.metrics import registry
+
+
+def scrape_authorized(request):
+    """
+    Returns whether ``request`` comes from a staff user or sends ``METRICS_TOKEN`` as a bearer token.
+    """
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return (
+        bool(settings.METRICS_TOKEN)
+        and scheme.lower() == "bearer"
+        and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    )
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint for this worker's metrics. Labels carry tenant names, so it is off unless
+    ``METRICS_ENABLED`` is set and only answers staff users and scrapers that send ``METRICS_TOKEN``.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if not scrape_authorized(request):
+        response = HttpResponse(status=401)
+        response["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "common"
+    name = "gateways.common"
+
+    def ready(self):
+        # Connects the signals that clear cached API key lookups when tenants or keys change.
+        from gateways.common import tenants  # noqa: F401
@@ -0,0 +1,8 @@
+from django.db import models
+
+
+class PaymentStatus(models.TextChoices):
+    SUCCESS = "success", "Success"
+    FAILED = "failed", "Failed"
+    ABANDONED = "abandoned", "Abandoned"
+    PENDING = "pending", "Pending"
@@ -0,0 +1,57 @@
+import httpx
+import requests
+
+
+class PaymentErrorException(Exception):
+    """
+    Raised when there is an error with payment
+    """
+
+    def __init__(self, message, status_code=400, retry_after=None):
+        self.message = message
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+    @classmethod
+    def from_error(cls, error):
+        """
+        Wraps an error raised while calling a payment provider, keeping the upstream status code and
+        ``Retry-After`` hint when the error carries an HTTP response. Transport errors, which have none, become
+        a 504 for timeouts and a 502 otherwise, so callers treat them as provider failures and not rejections.
+        """
+        upstream = getattr(error, "response", None)
+        status_code = getattr(upstream, "status_code", None)
+        if status_code is None:
+            if isinstance(error, (requests.Timeout, httpx.TimeoutException)):
+                status_code = 504
+            elif isinstance(error, (requests.RequestException, httpx.TransportError)):
+                status_code = 502
+            else:
+                status_code = 400
+        retry_after = None
+        if upstream is not None:
+            try:
+                retry_after = float(upstream.headers.get("Retry-After"))
+            except (TypeError, ValueError):
+                pass
+        return cls(str(error), status_code=status_code, retry_after=retry_after)
+
+
+class PaymentServiceUnavailableException(PaymentErrorException):
+    """
+    Raised without calling the provider when its circuit is open or too many calls are already in flight
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message, status_code=503, retry_after=retry_after)
+
+
+class PaymentRateLimitedException(PaymentServiceUnavailableException):
+    """
+    Raised without calling the provider when the client-side rate limit for an endpoint is exhausted
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message, retry_after=retry_after)
+        self.status_code = 429
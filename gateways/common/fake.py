@@ -0,0 +1,57 @@
+import uuid
+
+from gateways.common.exceptions import PaymentErrorException
+from gateways.common.gateways import BasePaymentGateway
+
+
+class FakePaymentGateway(BasePaymentGateway):
+    """
+    In-memory payment provider for tests and local development. Every payment succeeds when verified.
+
+    Args:
+        name (str): Provider name.
+        currencies (set[str]): Accepted currencies, or None for any.
+        error (Exception): Raised by every call instead of succeeding, if set.
+        unavailable (float): Value returned by ``unavailable_for``, to simulate an open circuit.
+    """
+
+    def __init__(self, name="fake", currencies=None, error=None, unavailable=0.0):
+        self.name = name
+        self.currencies = currencies
+        self.error = error
+        self.unavailable = unavailable
+        self.payments = {}
+
+    def unavailable_for(self):
+        return self.unavailable
+
+    def initialize_payment(self, money, email, metadata=None):
+        if self.error:
+            raise self.error
+        reference = f"{self.name}_{uuid.uuid4().hex}"
+        self.payments[reference] = {"money": money, "email": email, "name": (metadata or {}).get("name")}
+        return {
+            "status": True,
+            "message": "Authorization URL created",
+            "data": {
+                "authorization_url": f"https://checkout.example.com/{reference}",
+                "access_code": reference,
+                "reference": reference,
+            },
+        }
+
+    def verify_transaction(self, reference):
+        if self.error:
+            raise self.error
+        payment = self.payments.get(reference)
+        if payment is None:
+            raise PaymentErrorException("Transaction reference not found")
+        return {
+            "status": "success",
+            "email": payment["email"],
+            "name": payment["name"],
+            "amount": payment["money"].display(),
+            "amount_minor": payment["money"].minor,
+            "currency": payment["money"].currency,
+            "message": "Approved",
+        }
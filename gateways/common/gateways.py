@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BasePaymentGateway:
+    """
+    Interface every payment provider implements so it can be registered and routed to.
+
+    Attributes:
+        name (str): Unique provider name used in URLs and routing.
+        currencies (set[str]): ISO currency codes the provider accepts, or None for any.
+        min_amount (int): Smallest amount (in minor units) the provider accepts, or None.
+        max_amount (int): Largest amount (in minor units) the provider accepts, or None.
+    """
+
+    name = None
+    currencies = None
+    min_amount = None
+    max_amount = None
+
+    def supports(self, money):
+        """
+        Returns True if the provider accepts payments of ``money`` (a ``Money``).
+        """
+        if self.currencies is not None and money.currency not in self.currencies:
+            return False
+        if self.min_amount is not None and money.minor < self.min_amount:
+            return False
+        return self.max_amount is None or money.minor <= self.max_amount
+
+    def unavailable_for(self):
+        """
+        Seconds until the provider accepts calls again (e.g. while its circuit is open), 0 if it is available.
+        """
+        return 0.0
+
+    def initialize_payment(self, money, email, metadata=None):
+        """
+        Starts a payment of ``money`` (a ``Money``, which carries the currency) with the provider.
+
+        Returns:
+            dict: The provider response; ``data.reference`` identifies the payment.
+
+        Raises:
+            PaymentErrorException: If the provider rejects the payment or the call fails.
+            PaymentServiceUnavailableException: If calls to the provider are currently being shed.
+        """
+        raise NotImplementedError
+
+    def record_initialization(self, res, validated_data):
+        """
+        Stores a newly initialized payment. Providers without local storage need not override this.
+        """
+
+    def verify_transaction(self, reference):
+        """
+        Verifies a payment with the provider and records the result.
+
+        Returns:
+            dict: The status, customer email and name, amount (in display units), amount_minor, currency and
+            provider message.
+
+        Raises:
+            PaymentErrorException: If the verification fails.
+        """
+        raise NotImplementedError
+
+
+class GatewayRegistry:
+    """
+    Ordered collection of the configured payment providers, keyed by name.
+    """
+
+    def __init__(self, gateways=()):
+        self._gateways = {}
+        for gateway in gateways:
+            self.register(gateway)
+
+    def register(self, gateway):
+        if gateway.name in self._gateways:
+            raise ValueError(f"A payment gateway named {gateway.name!r} is already registered")
+        self._gateways[gateway.name] = gateway
+        return gateway
+
+    def get(self, name):
+        """
+        Raises:
+            KeyError: If no provider with this name is registered.
+        """
+        return self._gateways[name]
+
+    def __iter__(self):
+        return iter(self._gateways.values())
+
+    def __len__(self):
+        return len(self._gateways)
+
+
+_registry = None
+
+
+def get_registry():
+    """
+    Returns the registry of the providers listed in ``PAYMENT_GATEWAYS``, in priority order.
+    """
+    global _registry
+    if _registry is None:
+        _registry = GatewayRegistry(import_string(path)() for path in settings.PAYMENT_GATEWAYS)
+    return _registry
+
+
+def reset_registry():
+    global _registry
+    _registry = None
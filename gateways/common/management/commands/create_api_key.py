@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from gateways.common.models import Tenant
+from gateways.common.tenants import issue_api_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Issue an API key for a tenant, creating the tenant if it does not exist. The key is printed once and "
+        "only its hash is stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tenant", help="Tenant name.")
+        parser.add_argument("--name", default="", help="Label for the key.")
+        parser.add_argument("--rate-limit", type=float, help="Tenant requests per second; 0 is unlimited.")
+        parser.add_argument("--burst", type=int, help="Requests the tenant may make at once above the rate.")
+        parser.add_argument("--paystack-secret-key", help="Paystack secret key for the tenant's payments.")
+
+    def handle(self, *args, **options):
+        tenant, created = Tenant.objects.get_or_create(name=options["tenant"])
+        updates = {
+            field: options[field]
+            for field in ("rate_limit", "burst", "paystack_secret_key")
+            if options[field] is not None
+        }
+        if updates:
+            for field, value in updates.items():
+                setattr(tenant, field, value)
+            tenant.save(update_fields=[*updates, "updated_at"])
+
+        raw_key = issue_api_key(tenant, name=options["name"])
+        if created:
+            self.stdout.write(f"Created tenant {tenant.name}")
+        self.stdout.write(self.style.SUCCESS(f"API key for {tenant.name}: {raw_key}"))
@@ -1,16 +1,82 @@
-import uuid
-
 from django.db import models
 
+from gateways.common.enums import PaymentStatus
+from gateways.common.money import DEFAULT_CURRENCY, Money
+from gateways.common.utils import uuid7
+
 
 class AbstractBaseModel(models.Model):
     """
     Abstract base model that provides common fields for all models.
     """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
+
+
+class AbstractTransaction(AbstractBaseModel):
+    """
+    Abstract base model for a payment made through any provider.
+
+    The amount is stored in integer minor units of ``currency`` (kobo for NGN), so totals are exact integer
+    sums; ``money`` pairs the two. ``tenant`` is the API consumer the payment was made for, if any.
+    """
+
+    amount_minor = models.BigIntegerField()
+    status = models.CharField(max_length=20, choices=PaymentStatus.choices, default=PaymentStatus.PENDING)
+    customer_name = models.CharField(max_length=255)
+    customer_email = models.EmailField()
+    reference = models.CharField(max_length=100, unique=True)
+    currency = models.CharField(max_length=3, default=DEFAULT_CURRENCY)
+    tenant = models.ForeignKey(
+        "common.Tenant", null=True, blank=True, on_delete=models.PROTECT, related_name="+", db_index=False
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def money(self):
+        return Money(self.amount_minor, self.currency)
+
+    def __str__(self):
+        return f"Transaction {self.reference} - {self.status}"
+
+
+class Tenant(AbstractBaseModel):
+    """
+    An API consumer with its own Paystack account and request quota.
+
+    ``paystack_secret_key`` is used for Paystack calls made on the tenant's behalf; when blank, the global
+    ``PAYSTACK_SECRET_KEY`` is used. ``rate_limit`` is in requests per second with ``burst`` extra requests
+    allowed at once; a rate of 0 is unlimited.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    is_active = models.BooleanField(default=True)
+    paystack_secret_key = models.CharField(max_length=255, blank=True)
+    rate_limit = models.FloatField(default=0)
+    burst = models.PositiveIntegerField(default=10)
+
+    def __str__(self):
+        return self.name
+
+
+class ApiKey(AbstractBaseModel):
+    """
+    An API key issued to a tenant. Only the SHA-256 digest of the key is stored; ``prefix`` keeps its first
+    characters so it can be recognised.
+    """
+
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="api_keys")
+    name = models.CharField(max_length=100, blank=True)
+    prefix = models.CharField(max_length=16)
+    key_hash = models.CharField(max_length=64, unique=True)
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"API key {self.prefix}... for {self.tenant}"
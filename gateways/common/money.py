@@ -0,0 +1,74 @@
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple
+
+DEFAULT_CURRENCY = "NGN"
+
+# Decimal places of each currency's minor unit. Currencies not listed use two.
+CURRENCY_EXPONENTS = {
+    "NGN": 2,
+    "GHS": 2,
+    "ZAR": 2,
+    "KES": 2,
+    "USD": 2,
+    "XOF": 0,
+}
+
+
+def currency_exponent(currency):
+    return CURRENCY_EXPONENTS.get(currency, 2)
+
+
+class Money(NamedTuple):
+    """
+    An amount in integer minor units (kobo, pesewas, cents) of a currency.
+
+    Amounts are stored, summed and sent to providers as integers; they are converted to display units only
+    when read from or written to the API, so no arithmetic ever goes through floats.
+
+    Attributes:
+        minor (int): The amount in the currency's minor unit.
+        currency (str): ISO 4217 currency code.
+    """
+
+    minor: int
+    currency: str = DEFAULT_CURRENCY
+
+    @classmethod
+    def from_major(cls, amount, currency=DEFAULT_CURRENCY):
+        """
+        Builds a Money from an amount in display units, e.g. ``Money.from_major("400.50", "NGN")``.
+
+        Raises:
+            ValueError: If ``amount`` is not a number or has more decimal places than the currency's minor unit.
+        """
+        try:
+            scaled = Decimal(str(amount)).scaleb(currency_exponent(currency))
+        except InvalidOperation:
+            raise ValueError(f"{amount!r} is not a valid amount") from None
+        if not scaled.is_finite() or scaled != scaled.to_integral_value():
+            raise ValueError(f"{amount!r} is not a whole number of {currency} minor units")
+        return cls(int(scaled), currency)
+
+    @property
+    def major(self):
+        """
+        The amount in display units as a Decimal with the currency's number of decimal places.
+        """
+        exponent = currency_exponent(self.currency)
+        return Decimal(self.minor).scaleb(-exponent).quantize(Decimal(1).scaleb(-exponent))
+
+    def display(self):
+        """
+        The amount in display units as a string, e.g. ``"400.50"``.
+        """
+        return str(self.major)
+
+    def __add__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        if other.currency != self.currency:
+            raise ValueError(f"Cannot add {other.currency} to {self.currency}")
+        return Money(self.minor + other.minor, self.currency)
+
+    def __str__(self):
+        return f"{self.display()} {self.currency}"
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    ``AddIndex`` that builds the index with ``CREATE INDEX CONCURRENTLY`` on PostgreSQL, so writes to the
+    table are not blocked while a large index is built. Other backends fall back to a regular index build.
+
+    Migrations using this operation must set ``atomic = False``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, **self.concurrently(schema_editor))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, **self.concurrently(schema_editor))
+
+    def concurrently(self, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return {}
+        if schema_editor.atomic_migration:
+            raise ValueError("AddIndexConcurrently cannot run inside a transaction; set atomic = False.")
+        return {"concurrently": True}
+
+    def describe(self):
+        return f"{super().describe()} concurrently"
+
+
+class SetNotNull(migrations.AlterField):
+    """
+    ``AlterField`` making a nullable column NOT NULL. On PostgreSQL, ``SET NOT NULL`` alone scans the whole table
+    while holding an exclusive lock; this first adds a ``CHECK (column IS NOT NULL) NOT VALID`` constraint and
+    validates it, which lets reads and writes continue, so ``SET NOT NULL`` can rely on the constraint instead of
+    scanning (PostgreSQL 12+). The constraint is dropped afterwards. Other backends fall back to a regular
+    ``AlterField``.
+
+    Migrations using this operation must set ``atomic = False``.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if schema_editor.connection.vendor != "postgresql" or not self.allow_migrate_model(
+            schema_editor.connection.alias, model
+        ):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        if schema_editor.atomic_migration:
+            raise ValueError("SetNotNull cannot run inside a transaction; set atomic = False.")
+        qn = schema_editor.quote_name
+        table = model._meta.db_table
+        column = model._meta.get_field(self.name).column
+        constraint = schema_editor._create_index_name(table, [column], suffix="_not_null")
+        schema_editor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(constraint)} CHECK ({qn(column)} IS NOT NULL) NOT VALID"
+        )
+        schema_editor.execute(f"ALTER TABLE {qn(table)} VALIDATE CONSTRAINT {qn(constraint)}")
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+        schema_editor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(constraint)}")
+
+    def describe(self):
+        return f"Set NOT NULL on {self.model_name}.{self.name}"
@@ -0,0 +1,27 @@
+from rest_framework import permissions
+
+
+class IsTenantOrStaff(permissions.BasePermission):
+    """
+    Allows tenants calling with their API key (see ``core.middleware.TenantMiddleware``) and authenticated staff
+    users. Guards the endpoints that return transactions in bulk, which carry customer names and emails.
+    """
+
+    message = "An API key or a staff account is required."
+
+    def has_permission(self, request, view):
+        if getattr(request, "tenant", None) is not None:
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class IsNotTenant(permissions.BasePermission):
+    """
+    Refuses tenants calling with their API key. Guards endpoints whose data is not kept per tenant, such as the
+    transaction rollups, which sum every tenant's payments together.
+    """
+
+    message = "This endpoint is not available with an API key."
+
+    def has_permission(self, request, view):
+        return getattr(request, "tenant", None) is None
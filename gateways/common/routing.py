@@ -0,0 +1,127 @@
+import threading
+import time
+
+from django.conf import settings
+
+from gateways.common.exceptions import PaymentErrorException, PaymentServiceUnavailableException
+from gateways.common.gateways import get_registry
+
+
+class ProviderHealth:
+    """
+    Exponentially weighted latency and success rate of one provider's calls in this process.
+    """
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.latency = None
+        self.success_rate = 1.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.latency = seconds if self.latency is None else self.alpha * seconds + (1 - self.alpha) * self.latency
+            self.success_rate = self.alpha * (1.0 if ok else 0.0) + (1 - self.alpha) * self.success_rate
+
+    @property
+    def score(self):
+        """
+        Expected cost of a call: the average latency inflated by the failure rate. Lower is better.
+        """
+        return (self.latency or 0.0) / max(self.success_rate, 0.05)
+
+
+class GatewayRouter:
+    """
+    Picks a payment provider by currency, amount and live health, and fails over to the next candidate when
+    a provider is unavailable or fails with a server-side error.
+
+    Candidates are the registered providers that support the payment and whose circuit is not open, ordered
+    by health score; providers with no calls recorded yet keep their ``PAYMENT_GATEWAYS`` order ahead of
+    measured ones so every provider gets traffic.
+    """
+
+    def __init__(self, registry=None, alpha=None):
+        self._registry = registry
+        self.alpha = settings.PAYMENT_GATEWAY_HEALTH_ALPHA if alpha is None else alpha
+        self.health = {}
+        self._lock = threading.Lock()
+
+    @property
+    def registry(self):
+        return self._registry if self._registry is not None else get_registry()
+
+    def health_of(self, gateway):
+        with self._lock:
+            return self.health.setdefault(gateway.name, ProviderHealth(self.alpha))
+
+    def candidates(self, money):
+        """
+        Returns the providers to try for a payment, best first.
+
+        Raises:
+            PaymentErrorException: If no registered provider supports the currency and amount.
+            PaymentServiceUnavailableException: If every supporting provider is currently unavailable.
+        """
+        supporting = [gateway for gateway in self.registry if gateway.supports(money)]
+        if not supporting:
+            raise PaymentErrorException(f"No payment gateway supports {money}")
+
+        waits = {gateway.name: gateway.unavailable_for() for gateway in supporting}
+        available = [gateway for gateway in supporting if not waits[gateway.name]]
+        if not available:
+            raise PaymentServiceUnavailableException(
+                "All payment gateways are temporarily unavailable", retry_after=min(waits.values())
+            )
+        order = {gateway.name: index for index, gateway in enumerate(available)}
+
+        def rank(gateway):
+            health = self.health_of(gateway)
+            return health.latency is not None, health.score, order[gateway.name]
+
+        return sorted(available, key=rank)
+
+    def call(self, gateway, fn):
+        """
+        Runs ``fn`` against ``gateway`` and records its latency and outcome in the provider's health.
+        """
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except PaymentServiceUnavailableException:
+            raise
+        except PaymentErrorException as e:
+            self.health_of(gateway).record(time.perf_counter() - started, ok=e.status_code < 500)
+            raise
+        self.health_of(gateway).record(time.perf_counter() - started, ok=True)
+        return result
+
+    def initialize_payment(self, money, email, metadata=None):
+        """
+        Initializes a payment with the best available provider, failing over on shed calls and 5xx errors.
+        Client errors (4xx) are raised at once since another provider would reject the payment too.
+
+        Returns:
+            tuple: The provider that accepted the payment and its response.
+
+        Raises:
+            PaymentErrorException: If the payment is rejected or every candidate failed.
+            PaymentServiceUnavailableException: If every candidate is unavailable.
+        """
+        error = None
+        for gateway in self.candidates(money):
+            try:
+                res = self.call(
+                    gateway, lambda: gateway.initialize_payment(money=money, email=email, metadata=metadata)
+                )
+                return gateway, res
+            except PaymentServiceUnavailableException as e:
+                error = e
+            except PaymentErrorException as e:
+                if e.status_code < 500:
+                    raise
+                error = e
+        raise error
+
+
+router = GatewayRouter()
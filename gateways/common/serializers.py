@@ -0,0 +1,58 @@
+from collections.abc import Mapping
+
+from rest_framework import serializers
+
+from gateways.common.money import DEFAULT_CURRENCY, Money
+
+
+class MinorUnitAmountField(serializers.Field):
+    """
+    Read-only amount in display units (e.g. ``"400.50"``) of an integer minor-unit column, formatted with the
+    currency in the ``currency_field`` next to it.
+    """
+
+    def __init__(self, currency_field="currency", **kwargs):
+        kwargs["read_only"] = True
+        kwargs.setdefault("source", "amount_minor")
+        self.currency_field = currency_field
+        super().__init__(**kwargs)
+
+    @property
+    def columns(self):
+        return [self.source, self.currency_field]
+
+    def get_attribute(self, instance):
+        minor = super().get_attribute(instance)
+        if minor is None:
+            return None
+        if isinstance(instance, Mapping):
+            return Money(minor, instance[self.currency_field])
+        return Money(minor, getattr(instance, self.currency_field))
+
+    def to_representation(self, value):
+        return value.display()
+
+    def from_row(self, row):
+        """
+        Formats the amount straight from a row of column values, for ``CompiledReadSerializer``.
+        """
+        minor = row[self.source]
+        return None if minor is None else Money(minor, row[self.currency_field]).display()
+
+
+def validate_money(attrs, currency=DEFAULT_CURRENCY):
+    """
+    Adds ``money``, the validated ``amount`` (in display units) converted to minor units, to ``attrs``.
+    """
+    attrs["money"] = Money.from_major(attrs["amount"], attrs.get("currency", currency))
+    return attrs
+
+
+class RoutedPaymentSerializer(serializers.Serializer):
+    name = serializers.CharField(required=True, max_length=100)
+    email = serializers.EmailField(required=True)
+    amount = serializers.IntegerField(required=True, min_value=1)
+    currency = serializers.RegexField(r"^[A-Z]{3}$", required=False, default=DEFAULT_CURRENCY)
+
+    def validate(self, attrs):
+        return validate_money(attrs)
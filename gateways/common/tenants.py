@@ -0,0 +1,171 @@
+import contextvars
+import hashlib
+import secrets
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from core.metrics import registry
+from gateways.common.cache import LocalLRUCache
+from gateways.common.models import ApiKey, Tenant
+
+API_KEY_PREFIX = "pgk_"
+
+tenant_request_duration = registry.histogram(
+    "tenant_request_duration_seconds", "Time spent handling API requests per tenant.", ["tenant", "status"]
+)
+tenant_requests_rejected = registry.counter(
+    "tenant_requests_rejected_total", "API requests rejected per tenant by cause.", ["tenant", "reason"]
+)
+
+current_tenant = contextvars.ContextVar("current_tenant", default=None)
+
+# Cached in place of a tenant for keys that match nothing, so repeated bad keys do not reach the database.
+_UNKNOWN = object()
+
+
+@dataclass(slots=True)
+class TenantInfo:
+    """
+    The parts of a ``Tenant`` needed while handling its requests, cached by ``TenantResolver``.
+    """
+
+    id: str
+    name: str
+    paystack_secret_key: str
+    rate_limit: float
+    burst: int
+
+    @classmethod
+    def from_model(cls, tenant):
+        return cls(
+            id=str(tenant.id),
+            name=tenant.name,
+            paystack_secret_key=tenant.paystack_secret_key,
+            rate_limit=tenant.rate_limit,
+            burst=tenant.burst,
+        )
+
+
+def hash_api_key(raw_key):
+    """
+    Returns the hex SHA-256 digest an API key is stored and looked up by.
+    """
+    return hashlib.sha256(raw_key.encode()).hexdigest()
+
+
+def generate_api_key():
+    """
+    Returns a new random API key. Only its hash is stored, so it must be handed to the tenant straight away.
+    """
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+def issue_api_key(tenant, name=""):
+    """
+    Creates an API key for ``tenant`` and returns the raw key, which is not stored anywhere.
+    """
+    raw_key = generate_api_key()
+    ApiKey.objects.create(tenant=tenant, name=name, prefix=raw_key[:12], key_hash=hash_api_key(raw_key))
+    return raw_key
+
+
+def get_current_tenant():
+    """
+    Returns the ``TenantInfo`` of the tenant the current request or job acts for, or None.
+    """
+    return current_tenant.get()
+
+
+@contextmanager
+def tenant_context(tenant):
+    """
+    Makes ``tenant`` (a ``TenantInfo`` or None) the current tenant inside the block.
+    """
+    token = current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        current_tenant.reset(token)
+
+
+class TenantResolver:
+    """
+    Resolves API keys and tenant IDs to ``TenantInfo``, through an in-process LRU cache.
+
+    Keys are looked up by their SHA-256 hash, so the raw key never reaches the database or the cache. Resolved
+    keys are cached for ``TENANT_API_KEY_CACHE_TTL`` seconds and unknown or revoked keys for
+    ``TENANT_API_KEY_MISSING_TTL``; changes made through the ORM clear this process's cache, other processes
+    pick them up when their entries expire.
+    """
+
+    def __init__(self):
+        self.cache = LocalLRUCache(settings.TENANT_API_KEY_CACHE_MAXSIZE)
+
+    def _lookup(self, key, load):
+        cached = self.cache.get(key)
+        if cached is None:
+            tenant = load()
+            cached = _UNKNOWN if tenant is None else TenantInfo.from_model(tenant)
+            ttl = settings.TENANT_API_KEY_MISSING_TTL if tenant is None else settings.TENANT_API_KEY_CACHE_TTL
+            self.cache.set(key, cached, ttl)
+        return None if cached is _UNKNOWN else cached
+
+    def by_key(self, raw_key):
+        """
+        Returns the active tenant owning the active API key ``raw_key``, or None.
+        """
+        key_hash = hash_api_key(raw_key)
+
+        def load():
+            api_key = (
+                ApiKey.objects.select_related("tenant")
+                .filter(key_hash=key_hash, is_active=True, tenant__is_active=True)
+                .first()
+            )
+            return api_key and api_key.tenant
+
+        return self._lookup(f"key:{key_hash}", load)
+
+    async def aby_key(self, raw_key):
+        """
+        Async version of ``by_key``; only a cache miss goes to a thread.
+        """
+        cached = self.cache.get(f"key:{hash_api_key(raw_key)}")
+        if cached is not None:
+            return None if cached is _UNKNOWN else cached
+        return await sync_to_async(self.by_key)(raw_key)
+
+    def by_id(self, tenant_id):
+        """
+        Returns the tenant with ID ``tenant_id``, or None. Inactive tenants are returned too, so payments made
+        for them can still be verified with their Paystack key.
+        """
+        return self._lookup(f"id:{tenant_id}", lambda: Tenant.objects.filter(id=tenant_id).first())
+
+    def secret_keys(self):
+        """
+        Returns the Paystack secret keys set on tenants, mapped to the ID of the tenant each belongs to, for
+        checking webhook signatures. A key set on several tenants maps to the oldest of them.
+        """
+        keys = self.cache.get("secret_keys")
+        if keys is None:
+            keys = {}
+            rows = Tenant.objects.exclude(paystack_secret_key="").order_by("created_at", "id")
+            for secret_key, tenant_id in rows.values_list("paystack_secret_key", "id"):
+                keys.setdefault(secret_key, str(tenant_id))
+            self.cache.set("secret_keys", keys, settings.TENANT_API_KEY_CACHE_TTL)
+        return keys
+
+    def clear(self, **kwargs):
+        self.cache.clear()
+
+
+tenant_resolver = TenantResolver()
+
+for model in (Tenant, ApiKey):
+    post_save.connect(tenant_resolver.clear, sender=model, dispatch_uid=f"tenant_resolver_clear_{model.__name__}")
+    post_delete.connect(tenant_resolver.clear, sender=model, dispatch_uid=f"tenant_resolver_delete_{model.__name__}")
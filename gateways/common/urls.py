@@ -0,0 +1,8 @@
+from rest_framework.routers import SimpleRouter
+
+from gateways.common.views import PaymentViewSet
+
+router = SimpleRouter()
+router.register(r"", PaymentViewSet, basename="payment")
+
+urlpatterns = router.urls
@@ -0,0 +1,78 @@
+import logging
+import math
+
+from django.db import DatabaseError
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import decorators, response, status, viewsets
+
+from gateways.common.exceptions import PaymentErrorException, PaymentServiceUnavailableException
+from gateways.common.gateways import get_registry
+from gateways.common.routing import router
+from gateways.common.serializers import RoutedPaymentSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def service_unavailable(error):
+    """
+    Builds the 503 (or 429 when rate limited) response returned while provider calls are being shed.
+    """
+    headers = {"Retry-After": str(math.ceil(error.retry_after))} if error.retry_after else None
+    return response.Response({"error": str(error)}, status=error.status_code, headers=headers)
+
+
+class PaymentViewSet(viewsets.ViewSet):
+    """
+    Handling provider-agnostic payment operations.
+
+    Payments are routed to a configured provider that supports the currency and amount, preferring the
+    healthiest one and failing over when a provider is unavailable.
+    """
+
+    lookup_field = "reference"
+
+    @swagger_auto_schema(
+        request_body=RoutedPaymentSerializer,
+        responses={
+            200: "Provider response with the chosen gateway",
+            400: "Bad Request",
+            503: "Service Unavailable",
+        },
+    )
+    def create(self, request):
+        serializer = RoutedPaymentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            gateway, res = router.initialize_payment(
+                money=data["money"], email=data["email"], metadata={"name": data["name"]}
+            )
+        except PaymentServiceUnavailableException as e:
+            return service_unavailable(e)
+        except PaymentErrorException as e:
+            return response.Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            gateway.record_initialization(res, data)
+        except (KeyError, DatabaseError) as e:
+            logger.error(f"Error storing initialized payment: {e}")
+        return response.Response({"gateway": gateway.name, **res}, status=status.HTTP_200_OK)
+
+    @decorators.action(detail=False, methods=["get"], url_path=r"(?P<gateway>[\w-]+)/verify/(?P<reference>[^/.]+)")
+    def verify(self, request, gateway=None, reference=None):
+        """
+        Handling payment verification with the provider that initialized the payment.
+        """
+        try:
+            provider = get_registry().get(gateway)
+        except KeyError:
+            return response.Response({"error": "Unknown payment gateway"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            data = provider.verify_transaction(reference)
+            return response.Response({"gateway": provider.name, **data}, status=status.HTTP_200_OK)
+        except PaymentServiceUnavailableException as e:
+            return service_unavailable(e)
+        except PaymentErrorException as e:
+            return response.Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,97 @@
+import json
+import logging
+import math
+
+from django.db import DatabaseError
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+
+from core.metrics import timed
+from gateways.paystack.exceptions import PaymentErrorException, PaymentServiceUnavailableException
+from gateways.paystack.serializers import PaymentSerializer
+from gateways.paystack.services import arecord_initialization, averify_transaction
+from gateways.paystack.utils import AsyncPaystackPaymentGateway
+
+logger = logging.getLogger(__name__)
+
+
+def parse_request_data(request):
+    """
+    Reads the request payload as JSON or form data.
+
+    Returns:
+        dict: The parsed payload, or None if a JSON body could not be decoded.
+    """
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+    return request.POST
+
+
+def service_unavailable(error):
+    """
+    Builds the 503 (or 429 when rate limited) response returned while Paystack calls are being shed.
+    """
+    response = JsonResponse({"error": str(error)}, status=error.status_code)
+    if error.retry_after:
+        response["Retry-After"] = str(math.ceil(error.retry_after))
+    return response
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncPaystackPaymentView(View):
+    """
+    Async counterpart of ``PaystackPaymentViewSet.create`` for deployments served through ASGI.
+    """
+
+    payment_gateway = AsyncPaystackPaymentGateway()
+
+    async def post(self, request):
+        data = parse_request_data(request)
+        if data is None:
+            return JsonResponse({"error": "Malformed JSON body"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with timed("serialize"):
+            serializer = PaymentSerializer(data=data)
+            valid = serializer.is_valid()
+        if not valid:
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            res = await self.payment_gateway.initialize_payment(
+                money=serializer.validated_data["money"],
+                email=serializer.validated_data["email"],
+                metadata={"name": serializer.validated_data["name"]},
+            )
+        except PaymentServiceUnavailableException as e:
+            return service_unavailable(e)
+        except PaymentErrorException as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            await arecord_initialization(res, serializer.validated_data)
+        except (KeyError, DatabaseError) as e:
+            logger.error(f"Error storing initialized payment: {e}")
+        return JsonResponse(res, status=status.HTTP_200_OK)
+
+
+class AsyncPaystackPaymentVerificationView(View):
+    """
+    Async counterpart of ``PaystackPaymentVerificationViewSet.verify_payment`` for deployments served through ASGI.
+    """
+
+    payment_gateway = AsyncPaystackPaymentGateway()
+
+    async def get(self, request, reference):
+        try:
+            data = await averify_transaction(self.payment_gateway, reference)
+            return JsonResponse(data, status=status.HTTP_200_OK)
+        except PaymentServiceUnavailableException as e:
+            return service_unavailable(e)
+        except PaymentErrorException as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
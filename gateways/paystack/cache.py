@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from gateways.common.cache import LocalLRUCache  # noqa: F401 (re-exported)
+from gateways.paystack.enums import PaystackPaymentStatus
+
+MISSING = "__missing__"
+
+
+class TransactionCache:
+    """
+    Two-tier cache of serialized ``PaystackTransaction`` payloads keyed by tenant and reference.
+
+    Each tenant, and callers without one, only see their own transactions, so a payload is cached under the
+    ID of the tenant that looked it up. A transaction only changes for the tenant that owns it; invalidations
+    name that tenant, and the other scopes keep caching the reference as ``MISSING``.
+
+    Lookups go to a per-process LRU first and then to the Django cache named by ``PAYSTACK_CACHE_ALIAS``.
+    Settled transactions are kept longer than pending ones, and unknown references are cached as ``MISSING``
+    for a short while so repeated misses do not reach the database. The local tier only holds entries for
+    ``PAYSTACK_CACHE_LOCAL_TTL`` seconds because invalidations do not reach other processes' memory.
+    """
+
+    # Bumped whenever the payload shape changes, so entries cached by the previous release are not served.
+    key_prefix = "paystack:transaction:v3:"
+
+    def __init__(self):
+        self.local = LocalLRUCache(settings.PAYSTACK_CACHE_LOCAL_MAXSIZE)
+
+    @property
+    def shared(self):
+        return caches[settings.PAYSTACK_CACHE_ALIAS]
+
+    def key(self, reference, tenant_id=None):
+        if tenant_id is None:
+            return f"{self.key_prefix}{reference}"
+        return f"{self.key_prefix}tenant:{tenant_id}:{reference}"
+
+    def ttl(self, payload):
+        if payload == MISSING:
+            return settings.PAYSTACK_CACHE_MISSING_TTL
+        if payload.get("status") == PaystackPaymentStatus.PENDING:
+            return settings.PAYSTACK_CACHE_PENDING_TTL
+        return settings.PAYSTACK_CACHE_SETTLED_TTL
+
+    def get(self, reference, tenant_id=None):
+        """
+        Returns the cached payload, ``MISSING`` for a known-unknown reference, or None on a cache miss.
+        """
+        key = self.key(reference, tenant_id)
+        payload = self.local.get(key)
+        if payload is None:
+            payload = self.shared.get(key)
+            if payload is not None:
+                self.local.set(key, payload, min(self.ttl(payload), settings.PAYSTACK_CACHE_LOCAL_TTL))
+        return payload
+
+    def set(self, reference, payload, tenant_id=None):
+        key = self.key(reference, tenant_id)
+        ttl = self.ttl(payload)
+        self.shared.set(key, payload, ttl)
+        self.local.set(key, payload, min(ttl, settings.PAYSTACK_CACHE_LOCAL_TTL))
+
+    def invalidate(self, *entries):
+        """
+        Drops the cached payloads of ``entries``, ``(reference, tenant_id)`` pairs.
+        """
+        keys = [self.key(reference, tenant_id) for reference, tenant_id in entries]
+        for key in keys:
+            self.local.delete(key)
+        self.shared.delete_many(keys)
+
+
+transaction_cache = TransactionCache()
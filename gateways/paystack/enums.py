@@ -1,8 +1,24 @@
 from django.db import models
 
+from gateways.common.enums import PaymentStatus
 
-class PaystackPaymentStatus(models.TextChoices):
-    SUCCESS = "success", "Success"
+PaystackPaymentStatus = PaymentStatus
+
+
+class PaystackWebhookEventType(models.TextChoices):
+    CHARGE_SUCCESS = "charge.success", "Charge Success"
+    CHARGE_FAILED = "charge.failed", "Charge Failed"
+
+
+class WebhookEventStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    PROCESSING = "processing", "Processing"
+    PROCESSED = "processed", "Processed"
     FAILED = "failed", "Failed"
-    ABANDONED = "abandoned", "Abandoned"
+
+
+class OutboxEventStatus(models.TextChoices):
     PENDING = "pending", "Pending"
+    PROCESSING = "processing", "Processing"
+    DELIVERED = "delivered", "Delivered"
+    FAILED = "failed", "Failed"
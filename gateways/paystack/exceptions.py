@@ -1,9 +1,7 @@
-class PaymentErrorException(Exception):
-    """
-    Raised when there is an error with payment
-    """
+from gateways.common.exceptions import (
+    PaymentErrorException,
+    PaymentRateLimitedException,
+    PaymentServiceUnavailableException,
+)
 
-    def __init__(self, message, status_code=400):
-        self.message = message
-        self.status_code = status_code
-        super().__init__(self.message)
+__all__ = ["PaymentErrorException", "PaymentRateLimitedException", "PaymentServiceUnavailableException"]
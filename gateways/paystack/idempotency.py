@@ -0,0 +1,164 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from gateways.common.cache import LocalLRUCache
+from gateways.paystack.models import IdempotencyRecord
+from gateways.paystack.singleflight import SingleFlight, shared_call
+
+
+class IdempotencyConflict(Exception):
+    """
+    Raised when an idempotency key is reused with a different request.
+    """
+
+
+class _UnstoredResponse(Exception):
+    """
+    Carries a non-2xx response out of the coalesced call so it is shared with waiters but never cached.
+    """
+
+    def __init__(self, record):
+        self.record = record
+        super().__init__()
+
+
+def request_fingerprint(data):
+    """
+    Returns a stable SHA-256 fingerprint of the validated request data.
+    """
+    return hashlib.sha256(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+def expired_before(now):
+    """
+    Returns the creation time before which records are expired at ``now``.
+    """
+    return now - timedelta(seconds=settings.PAYSTACK_IDEMPOTENCY_TTL)
+
+
+def scoped_key(key, tenant=None):
+    """
+    Returns the key an ``Idempotency-Key`` is stored under: unchanged without a tenant, otherwise prefixed with
+    the tenant's ID (and hashed, to stay within the column's length) so tenants never share keys.
+    """
+    if tenant is None:
+        return key
+    return f"tenant:{tenant.id}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+class IdempotencyStore:
+    """
+    Stores the first successful response for each ``Idempotency-Key`` and replays it for retries.
+
+    Records live in the ``IdempotencyRecord`` table with an in-process LRU in front, so a replay handled by the
+    same worker costs a dictionary lookup. Concurrent requests with the same key wait for the first one, within a
+    process through ``SingleFlight`` and across workers through ``shared_call``. Only 2xx responses are stored;
+    a failed attempt may be retried with the same key. Records expire ``PAYSTACK_IDEMPOTENCY_TTL`` seconds after
+    they are stored and are deleted by ``purge_expired`` (the ``purge_idempotency_records`` command).
+    """
+
+    def __init__(self):
+        self.local = LocalLRUCache(settings.PAYSTACK_IDEMPOTENCY_LOCAL_MAXSIZE)
+        self.flight = SingleFlight()
+
+    def lookup(self, key):
+        record = self.local.get(key)
+        if record is None:
+            now = timezone.now()
+            row = (
+                IdempotencyRecord.objects.filter(key=key, created_at__gte=expired_before(now))
+                .values_list("fingerprint", "status_code", "response", "created_at")
+                .first()
+            )
+            if row is not None:
+                *record, created_at = row
+                record = tuple(record)
+                # The local copy must not outlive the stored record.
+                remaining = settings.PAYSTACK_IDEMPOTENCY_TTL - (now - created_at).total_seconds()
+                self.local.set(key, record, remaining)
+        return record
+
+    def save(self, key, record):
+        fingerprint, status_code, response = record
+        # An expired record for the key may still be stored; overwriting it starts a new TTL.
+        IdempotencyRecord.objects.update_or_create(
+            key=key,
+            defaults={
+                "fingerprint": fingerprint,
+                "status_code": status_code,
+                "response": response,
+                "created_at": timezone.now(),
+            },
+        )
+        self.local.set(key, record, settings.PAYSTACK_IDEMPOTENCY_TTL)
+
+    def purge_expired(self, batch_size=1000):
+        """
+        Deletes expired records in batches of ``batch_size``.
+
+        Returns:
+            int: The number of records deleted.
+        """
+        deleted = 0
+        while True:
+            keys = list(
+                IdempotencyRecord.objects.filter(created_at__lt=expired_before(timezone.now())).values_list(
+                    "pk", flat=True
+                )[:batch_size]
+            )
+            if not keys:
+                return deleted
+            deleted += IdempotencyRecord.objects.filter(pk__in=keys).delete()[0]
+
+    def run(self, key, fingerprint, fn):
+        """
+        Returns the stored response for ``key`` or runs ``fn`` to produce and store one.
+
+        Args:
+            key (str): The client-supplied idempotency key.
+            fingerprint (str): Fingerprint of the request, see ``request_fingerprint``.
+            fn (callable): Returns ``(status_code, response_data)`` for a first-time request.
+
+        Returns:
+            tuple: ``(status_code, response_data, replayed)``. ``replayed`` is False only for the caller whose
+            ``fn`` produced the response; callers that waited for it, here or in another worker, replay it.
+
+        Raises:
+            IdempotencyConflict: If the key was first used with a different request.
+        """
+        record = self.lookup(key)
+        replayed = record is not None
+        if record is None:
+            ran = False
+
+            def execute():
+                nonlocal ran
+                ran = True
+                existing = self.lookup(key)
+                if existing is not None:
+                    return existing, True
+                status_code, response = fn()
+                new_record = (fingerprint, status_code, response)
+                if not 200 <= status_code < 300:
+                    raise _UnstoredResponse(new_record)
+                self.save(key, new_record)
+                return new_record, False
+
+            try:
+                record, replayed = self.flight.do(key, lambda: shared_call(f"idempotency:{key}", execute))
+            except _UnstoredResponse as e:
+                record, replayed = e.record, False
+            replayed = replayed or not ran
+
+        stored_fingerprint, status_code, response = record
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyConflict("Idempotency-Key has already been used with a different request")
+        return status_code, response, replayed
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,70 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from gateways.paystack.models import PaystackTransaction
+
+CONVERSION_SQL = """\
+-- Converts {table} into a table range-partitioned by month on created_at.
+-- PostgreSQL requires the partition key in every unique constraint, so the primary key becomes
+-- (id, created_at) and reference is only unique within a partition. Run during a maintenance window:
+-- the copy rewrites the table. For large tables, copy in id batches before the final swap instead.
+BEGIN;
+ALTER TABLE {table} RENAME TO {table}_legacy;
+CREATE TABLE {table} (LIKE {table}_legacy INCLUDING DEFAULTS INCLUDING GENERATED) PARTITION BY RANGE (created_at);
+ALTER TABLE {table} ADD PRIMARY KEY (id, created_at);
+ALTER TABLE {table} ADD CONSTRAINT {table}_reference_created_uniq UNIQUE (reference, created_at);
+CREATE INDEX paystack_txn_status_created_p ON {table} (status, created_at);
+CREATE INDEX paystack_txn_email_created_p ON {table} (customer_email, created_at);
+CREATE TABLE {table}_default PARTITION OF {table} DEFAULT;
+INSERT INTO {table} SELECT * FROM {table}_legacy;
+COMMIT;
+-- Existing rows stay in the default partition; then run: python manage.py manage_paystack_partitions
+"""
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create monthly created_at partitions for PaystackTransaction when its table has been converted to a "
+        "range-partitioned table (PostgreSQL only). Use --conversion-sql to print the conversion script."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=3, help="Future months to create partitions for.")
+        parser.add_argument("--dry-run", action="store_true", help="Print the statements without running them.")
+        parser.add_argument("--conversion-sql", action="store_true", help="Print the table conversion script.")
+
+    def handle(self, *args, **options):
+        table = PaystackTransaction._meta.db_table
+        if options["conversion_sql"]:
+            self.stdout.write(CONVERSION_SQL.format(table=table))
+            return
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning is only supported on PostgreSQL.")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [connection.ops.quote_name(table)]
+            )
+            if cursor.fetchone() is None:
+                raise CommandError(f"{table} is not partitioned; see --conversion-sql.")
+
+            current = date.today().replace(day=1)
+            for offset in range(options["months_ahead"] + 1):
+                start = add_months(current, offset)
+                end = add_months(start, 1)
+                partition = f"{table}_p{start:%Y%m}"
+                statement = (
+                    f"CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(partition)} PARTITION OF "
+                    f"{connection.ops.quote_name(table)} FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+                self.stdout.write(statement)
+                if not options["dry_run"]:
+                    cursor.execute(statement)
+        self.stdout.write(self.style.SUCCESS("Partitions are up to date."))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from gateways.paystack.polling import PollScheduler
+from gateways.paystack.utils import PaystackPaymentGateway
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify initialized Paystack transactions on a backoff schedule until they settle. Run several instances "
+        "to poll in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Due transactions claimed per tick.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Verify calls in flight at once.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when nothing is due.")
+        parser.add_argument("--once", action="store_true", help="Poll what is due now and exit.")
+
+    def handle(self, *args, **options):
+        scheduler = PollScheduler(
+            PaystackPaymentGateway(), batch_size=options["batch_size"], concurrency=options["concurrency"]
+        )
+        try:
+            while True:
+                close_old_connections()
+                if not scheduler.tick():
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Polling finished: {scheduler.report}"))
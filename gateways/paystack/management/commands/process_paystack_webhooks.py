@@ -0,0 +1,54 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from gateways.paystack.queues import get_webhook_queue
+from gateways.paystack.services import process_webhook_batch
+
+
+class Command(BaseCommand):
+    help = "Run a pool of workers that apply queued Paystack webhook events to transactions in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Number of worker threads.")
+        parser.add_argument("--batch-size", type=int, default=100, help="Events claimed per batch.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when idle.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling.")
+
+    def handle(self, *args, **options):
+        queue = get_webhook_queue()
+        self.processed = 0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+        threads = [
+            threading.Thread(target=self.work, args=(queue, options), name=f"paystack-webhook-{i}", daemon=True)
+            for i in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {self.processed} webhook events."))
+
+    def work(self, queue, options):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                claimed = process_webhook_batch(queue, options["batch_size"])
+                with self.lock:
+                    self.processed += claimed
+                if not claimed:
+                    if options["once"]:
+                        return
+                    self.stop.wait(options["poll_interval"])
+        finally:
+            connection.close()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from gateways.paystack.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the transaction rollups from PaystackTransaction, aggregating the table in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=50000, help="Transactions aggregated per query.")
+
+    def handle(self, *args, **options):
+        counted = rebuild_rollups(
+            chunk_size=options["chunk_size"],
+            on_chunk=lambda chunks: self.stdout.write(f"Aggregated {chunks} chunk(s)"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups from {counted} transactions."))
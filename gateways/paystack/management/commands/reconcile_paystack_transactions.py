@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from gateways.paystack.reconciliation import Reconciler
+from gateways.paystack.utils import PaystackPaymentGateway
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify pending Paystack transactions (or references listed in a file) against Paystack and write the "
+        "results back in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--references-file",
+            help="Reconcile the references in this file (one per line) instead of pending transactions.",
+        )
+        parser.add_argument("--concurrency", type=int, default=16, help="Verify calls in flight at once.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="References read and written per chunk.")
+        parser.add_argument("--max-rps", type=float, help="Upper bound on verify calls started per second.")
+        parser.add_argument("--limit", type=int, help="Stop after this many references.")
+        parser.add_argument("--checkpoint", help="File used to store and resume progress.")
+
+    def handle(self, *args, **options):
+        reconciler = Reconciler(
+            PaystackPaymentGateway(),
+            concurrency=options["concurrency"],
+            chunk_size=options["chunk_size"],
+            max_per_second=options["max_rps"],
+            checkpoint_path=options["checkpoint"],
+            on_chunk=lambda report: self.stdout.write(str(report)),
+        )
+        if options["references_file"]:
+            rows = reconciler.file_references(options["references_file"], limit=options["limit"])
+        else:
+            rows = reconciler.pending_references(limit=options["limit"])
+
+        report = reconciler.run(rows)
+        self.stdout.write(self.style.SUCCESS(f"Reconciliation finished: {report}"))
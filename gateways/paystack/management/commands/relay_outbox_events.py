@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from gateways.paystack.outbox import OutboxRelay
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish outbox payment events to the configured sink (PAYSTACK_OUTBOX_SINK). Run several instances to "
+        "publish in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Events claimed per batch.")
+        parser.add_argument("--concurrency", type=int, help="Deliveries in flight at once.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when nothing is due.")
+        parser.add_argument("--once", action="store_true", help="Publish what is due now and exit.")
+
+    def handle(self, *args, **options):
+        relay = OutboxRelay(batch_size=options["batch_size"], concurrency=options["concurrency"])
+        try:
+            while True:
+                close_old_connections()
+                if not relay.run_once():
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Delivered {relay.delivered} outbox events, {relay.failed} failed."))
@@ -0,0 +1,52 @@
+import httpx
+import requests
+
+from core.metrics import registry
+from gateways.paystack.exceptions import PaymentRateLimitedException, PaymentServiceUnavailableException
+from gateways.paystack.ratelimit import rate_limiter
+from gateways.paystack.resilience import upstream_status
+
+upstream_latency = registry.histogram(
+    "paystack_upstream_latency_seconds", "Latency of Paystack API calls.", ["endpoint", "status"]
+)
+upstream_errors = registry.counter(
+    "paystack_upstream_errors_total", "Failed or rejected Paystack API calls by cause.", ["endpoint", "type"]
+)
+upstream_in_flight = registry.gauge("paystack_upstream_in_flight", "Paystack API calls in flight.", ["endpoint"])
+rate_limit_throttled = registry.counter(
+    "paystack_rate_limit_throttled_total", "Paystack calls delayed by the client-side rate limiter.", ["budget"]
+)
+rate_limit_throttled_seconds = registry.counter(
+    "paystack_rate_limit_throttled_seconds_total", "Time spent waiting on the client-side rate limiter.", ["budget"]
+)
+rate_limit_rejected = registry.counter(
+    "paystack_rate_limit_rejected_total", "Paystack calls rejected by the client-side rate limiter.", ["budget"]
+)
+
+
+def error_type(error):
+    """
+    Classifies an error raised around a Paystack call for the ``type`` label of ``paystack_upstream_errors_total``.
+    """
+    if isinstance(error, PaymentRateLimitedException):
+        return "rate_limited"
+    if isinstance(error, PaymentServiceUnavailableException):
+        return "circuit_open" if error.retry_after is not None else "in_flight_limit"
+    if isinstance(error, (requests.Timeout, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, (requests.ConnectionError, httpx.TransportError)):
+        return "connection"
+    status_code = upstream_status(error)
+    if status_code is not None:
+        return f"http_{status_code}"
+    return type(error).__name__
+
+
+def collect_rate_limit_stats():
+    for budget, stats in list(rate_limiter.stats.items()):
+        rate_limit_throttled.set(stats["throttled"], budget=budget)
+        rate_limit_throttled_seconds.set(stats["throttled_seconds"], budget=budget)
+        rate_limit_rejected.set(stats["rejected"], budget=budget)
+
+
+registry.add_collector(collect_rate_limit_stats)
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("paystack", "0003_idempotencyrecord"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paystacktransaction",
+            name="access_code",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
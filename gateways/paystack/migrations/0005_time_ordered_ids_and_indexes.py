@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:08
+
+import gateways.common.utils
+from django.db import migrations, models
+
+from gateways.common.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("paystack", "0004_paystacktransaction_access_code"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="idempotencyrecord",
+            name="id",
+            field=models.UUIDField(
+                default=gateways.common.utils.uuid7, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="paystacktransaction",
+            name="id",
+            field=models.UUIDField(
+                default=gateways.common.utils.uuid7, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="paystackwebhookevent",
+            name="id",
+            field=models.UUIDField(
+                default=gateways.common.utils.uuid7, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="paystacktransaction",
+            index=models.Index(fields=["status", "created_at"], name="paystack_txn_status_created"),
+        ),
+        AddIndexConcurrently(
+            model_name="paystacktransaction",
+            index=models.Index(fields=["customer_email", "created_at"], name="paystack_txn_email_created"),
+        ),
+    ]
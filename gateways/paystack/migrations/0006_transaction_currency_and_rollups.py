@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:12
+
+import gateways.common.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("paystack", "0005_time_ordered_ids_and_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=gateways.common.utils.uuid7, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("day", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("success", "Success"),
+                            ("failed", "Failed"),
+                            ("abandoned", "Abandoned"),
+                            ("pending", "Pending"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("currency", models.CharField(max_length=3)),
+                ("count", models.BigIntegerField(default=0)),
+                ("amount", models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="paystacktransaction",
+            name="currency",
+            field=models.CharField(default="NGN", max_length=3),
+        ),
+        migrations.AddConstraint(
+            model_name="transactionrollup",
+            constraint=models.UniqueConstraint(fields=("day", "status", "currency"), name="paystack_rollup_unique"),
+        ),
+    ]
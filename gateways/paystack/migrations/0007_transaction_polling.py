@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:27
+
+from django.db import migrations, models
+
+from gateways.common.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("paystack", "0006_transaction_currency_and_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paystacktransaction",
+            name="next_poll_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="paystacktransaction",
+            name="poll_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        AddIndexConcurrently(
+            model_name="paystacktransaction",
+            index=models.Index(
+                condition=models.Q(("next_poll_at__isnull", False)),
+                fields=["next_poll_at"],
+                name="paystack_txn_next_poll",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    First of three steps moving amounts to integer minor units: adds the ``amount_minor`` columns and makes the
+    old ``amount`` columns nullable, both without rewriting the tables. Code from before this change keeps
+    working while it is rolled out: its transactions get a NULL ``amount_minor`` and its rollup rows a database
+    default of 0. 0010 backfills existing rows and 0011, once no such code is left running, fills any rows it
+    wrote since, makes ``amount_minor`` NOT NULL and drops ``amount``.
+    """
+
+    dependencies = [
+        ("paystack", "0008_outboxevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paystacktransaction",
+            name="amount_minor",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="transactionrollup",
+            name="amount_minor",
+            field=models.BigIntegerField(db_default=0, default=0),
+        ),
+        migrations.AlterField(
+            model_name="paystacktransaction",
+            name="amount",
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name="transactionrollup",
+            name="amount",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20, null=True),
+        ),
+    ]
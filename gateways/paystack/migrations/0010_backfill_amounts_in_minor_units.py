@@ -0,0 +1,78 @@
+from django.db import migrations, models, transaction
+from django.db.models.functions import Cast, Round
+
+from gateways.common.money import CURRENCY_EXPONENTS, currency_exponent
+
+MODELS = ["PaystackTransaction", "TransactionRollup"]
+BATCH_SIZE = 5000
+
+
+def scale():
+    """
+    Returns an expression for 10 ** (the row currency's exponent), matching ``currency_exponent``.
+    """
+    return models.Case(
+        *[models.When(currency=currency, then=10**exponent) for currency, exponent in CURRENCY_EXPONENTS.items()],
+        default=10 ** currency_exponent(None),
+        output_field=models.BigIntegerField(),
+    )
+
+
+def in_batches(apps, update, names=MODELS):
+    """
+    Calls ``update`` with querysets of at most ``BATCH_SIZE`` rows of each model in ``names``, in primary key
+    order and each in its own transaction, so no statement locks or rewrites a whole table.
+    """
+    for name in names:
+        model = apps.get_model("paystack", name)
+        last_pk = None
+        while True:
+            queryset = model.objects.order_by("pk")
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            pks = list(queryset.values_list("pk", flat=True)[:BATCH_SIZE])
+            if not pks:
+                break
+            with transaction.atomic():
+                update(model.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]))
+            last_pk = pks[-1]
+
+
+def fill_minor_units(rows):
+    return rows.filter(amount__isnull=False).update(
+        amount_minor=Cast(Round(models.F("amount") * scale()), models.BigIntegerField())
+    )
+
+
+def amounts_to_minor_units(apps, schema_editor):
+    # Rows written by the new code since 0009 have no major-unit amount and already carry amount_minor.
+    in_batches(apps, fill_minor_units)
+
+
+def amounts_to_major_units(apps, schema_editor):
+    in_batches(
+        apps,
+        lambda rows: rows.update(
+            amount=models.ExpressionWrapper(
+                Cast(models.F("amount_minor"), models.DecimalField(max_digits=30, decimal_places=10)) / scale(),
+                output_field=models.DecimalField(max_digits=30, decimal_places=10),
+            )
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    Second step: fills ``amount_minor`` from ``amount`` in batches of ``BATCH_SIZE`` rows, one transaction
+    each. Migrating backwards refills ``amount`` from ``amount_minor`` the same way.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("paystack", "0009_amounts_in_minor_units"),
+    ]
+
+    operations = [
+        migrations.RunPython(amounts_to_minor_units, amounts_to_major_units),
+    ]
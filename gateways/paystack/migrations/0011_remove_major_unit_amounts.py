@@ -0,0 +1,51 @@
+from importlib import import_module
+
+from django.db import migrations, models
+
+from gateways.common.operations import SetNotNull
+
+backfill = import_module("gateways.paystack.migrations.0010_backfill_amounts_in_minor_units")
+
+
+def fill_remaining_minor_units(apps, schema_editor):
+    # Transactions written by code from before 0009 while it was rolled out have no amount_minor yet.
+    backfill.in_batches(
+        apps, lambda rows: backfill.fill_minor_units(rows.filter(amount_minor__isnull=True)), ["PaystackTransaction"]
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    Last step, to run once no code from before 0009 is left: fills ``amount_minor`` on transactions such code
+    wrote after 0010 ran, makes it NOT NULL and drops the ``amount`` columns. Rollups that code updated in the
+    meantime only moved ``amount``; run ``rebuild_paystack_rollups`` afterwards. Migrating backwards adds the
+    columns back empty and nullable for 0010 to refill.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("paystack", "0010_backfill_amounts_in_minor_units"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_remaining_minor_units, migrations.RunPython.noop),
+        SetNotNull(
+            model_name="paystacktransaction",
+            name="amount_minor",
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name="transactionrollup",
+            name="amount_minor",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RemoveField(
+            model_name="paystacktransaction",
+            name="amount",
+        ),
+        migrations.RemoveField(
+            model_name="transactionrollup",
+            name="amount",
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from gateways.common.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("common", "0001_initial"),
+        ("paystack", "0011_remove_major_unit_amounts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paystacktransaction",
+            name="tenant",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="common.tenant",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="paystacktransaction",
+            index=models.Index(
+                condition=models.Q(("tenant__isnull", False)),
+                fields=["tenant", "created_at"],
+                name="paystack_txn_tenant_created",
+            ),
+        ),
+    ]
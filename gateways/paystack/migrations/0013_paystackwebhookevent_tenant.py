@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+        ("paystack", "0012_transaction_tenant"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paystackwebhookevent",
+            name="tenant",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="common.tenant",
+            ),
+        ),
+    ]
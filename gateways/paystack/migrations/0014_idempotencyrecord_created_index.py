@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+from gateways.common.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("paystack", "0013_paystackwebhookevent_tenant"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="idempotencyrecord",
+            index=models.Index(fields=["created_at"], name="paystack_idem_created"),
+        ),
+    ]
@@ -1,21 +1,119 @@
 from django.db import models
+from django.utils import timezone
 
-from gateways.common.models import AbstractBaseModel
-from gateways.paystack.enums import PaystackPaymentStatus
+from gateways.common.models import AbstractBaseModel, AbstractTransaction
+from gateways.paystack.enums import (
+    OutboxEventStatus,
+    PaystackPaymentStatus,
+    PaystackWebhookEventType,
+    WebhookEventStatus,
+)
 
 
-class PaystackTransaction(AbstractBaseModel):
+class PaystackTransaction(AbstractTransaction):
     """
     Model to store Paystack transaction details.
     """
 
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
-    status = models.CharField(
-        max_length=20, choices=PaystackPaymentStatus.choices, default=PaystackPaymentStatus.PENDING
+    access_code = models.CharField(max_length=100, blank=True)
+    next_poll_at = models.DateTimeField(null=True, blank=True)
+    poll_attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="paystack_txn_status_created"),
+            models.Index(fields=["customer_email", "created_at"], name="paystack_txn_email_created"),
+            models.Index(
+                fields=["next_poll_at"], name="paystack_txn_next_poll", condition=models.Q(next_poll_at__isnull=False)
+            ),
+            models.Index(
+                fields=["tenant", "created_at"],
+                name="paystack_txn_tenant_created",
+                condition=models.Q(tenant__isnull=False),
+            ),
+        ]
+
+
+class PaystackWebhookEvent(AbstractBaseModel):
+    """
+    Durable queue entry for a Paystack webhook event awaiting processing. ``tenant`` is the tenant whose
+    Paystack key signed the event, or None for ``PAYSTACK_SECRET_KEY``.
+    """
+
+    event = models.CharField(max_length=50, choices=PaystackWebhookEventType.choices)
+    reference = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField()
+    tenant = models.ForeignKey(
+        "common.Tenant", null=True, blank=True, on_delete=models.PROTECT, related_name="+", db_index=False
     )
-    customer_name = models.CharField(max_length=255)
-    customer_email = models.EmailField()
-    reference = models.CharField(max_length=100, unique=True)
+    status = models.CharField(max_length=20, choices=WebhookEventStatus.choices, default=WebhookEventStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Webhook {self.event} {self.reference} - {self.status}"
+
+
+class IdempotencyRecord(AbstractBaseModel):
+    """
+    Stored response for a payment initialization made with an ``Idempotency-Key`` header.
+    """
+
+    key = models.CharField(max_length=255, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at"], name="paystack_idem_created")]
+
+    def __str__(self):
+        return f"Idempotency key {self.key}"
+
+
+class TransactionRollup(AbstractBaseModel):
+    """
+    Running count and amount (in minor units) of transactions per creation day (UTC), status and currency.
+
+    Kept up to date by the write paths in ``gateways.paystack.services`` and rebuilt from scratch by the
+    ``rebuild_paystack_rollups`` command.
+    """
+
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=PaystackPaymentStatus.choices)
+    currency = models.CharField(max_length=3)
+    count = models.BigIntegerField(default=0)
+    amount_minor = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["day", "status", "currency"], name="paystack_rollup_unique")]
+
+    def __str__(self):
+        return f"Rollup {self.day} {self.status} {self.currency}"
+
+
+class OutboxEvent(AbstractBaseModel):
+    """
+    Payment event written in the same database transaction as the status change it describes, awaiting
+    delivery to downstream systems by the outbox relay.
+    """
+
+    event = models.CharField(max_length=50)
+    reference = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=OutboxEventStatus.choices, default=OutboxEventStatus.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="paystack_outbox_status_due"),
+            models.Index(fields=["reference", "created_at"], name="paystack_outbox_reference"),
+        ]
 
     def __str__(self):
-        return f"Transaction {self.reference} - {self.status}"
+        return f"Outbox {self.event} {self.reference} - {self.status}"
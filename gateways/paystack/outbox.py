@@ -0,0 +1,277 @@
+import hashlib
+import hmac
+import json
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+from gateways.paystack.enums import OutboxEventStatus
+from gateways.paystack.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDeliveryError(Exception):
+    pass
+
+
+def enqueue_outbox_events(transactions):
+    """
+    Writes a ``transaction.<status>`` outbox event for each of ``transactions`` after a status change.
+
+    Must run inside the database transaction that changed the statuses, so an event exists if and only if the
+    change was committed. Does nothing unless ``PAYSTACK_OUTBOX_ENABLED`` is set. Events of every tenant go to
+    the same sink, so each payload carries the id of the tenant that owns the transaction (None for transactions
+    that belong to no tenant) for the consumer to route on.
+
+    Args:
+        transactions (list[PaystackTransaction]): Transactions as they are after the change; only their
+            reference, status, amount_minor, currency and tenant_id are read.
+    """
+    if not settings.PAYSTACK_OUTBOX_ENABLED or not transactions:
+        return
+    OutboxEvent.objects.bulk_create(
+        [
+            OutboxEvent(
+                event=f"transaction.{transaction_obj.status}",
+                reference=transaction_obj.reference,
+                payload={
+                    "reference": transaction_obj.reference,
+                    "status": transaction_obj.status,
+                    "amount": transaction_obj.money.display(),
+                    "amount_minor": transaction_obj.amount_minor,
+                    "currency": transaction_obj.currency,
+                    "tenant": transaction_obj.tenant_id and str(transaction_obj.tenant_id),
+                },
+            )
+            for transaction_obj in transactions
+        ]
+    )
+
+
+def event_message(event):
+    """
+    Returns the JSON document published for ``event``. ``id`` is stable across redeliveries, so consumers can
+    use it to discard duplicates.
+    """
+    return json.dumps(
+        {"id": event.pk, "event": event.event, "created_at": event.created_at, "data": event.payload},
+        cls=DjangoJSONEncoder,
+    )
+
+
+class OutboxSink:
+    """
+    Interface for the destination the outbox relay publishes events to.
+    """
+
+    def send(self, event):
+        """
+        Publishes ``event``, raising an exception if it was not accepted. Called from several threads at once.
+        """
+        raise NotImplementedError
+
+
+class HttpOutboxSink(OutboxSink):
+    """
+    POSTs each event to ``PAYSTACK_OUTBOX_WEBHOOK_URL``, signed like Paystack signs its webhooks: the
+    ``x-outbox-signature`` header is the HMAC-SHA512 of the body keyed with ``PAYSTACK_OUTBOX_WEBHOOK_SECRET``.
+    Any non-2xx response is a failed delivery. Every tenant's events go to that one URL, so it must be an
+    internal consumer, never an endpoint of a tenant.
+    """
+
+    def __init__(self, url=None, secret=None, timeout=None, session=None):
+        self.url = url or settings.PAYSTACK_OUTBOX_WEBHOOK_URL
+        if not self.url:
+            raise ImproperlyConfigured("PAYSTACK_OUTBOX_WEBHOOK_URL must be set to use HttpOutboxSink")
+        self.secret = (secret or settings.PAYSTACK_OUTBOX_WEBHOOK_SECRET).encode()
+        self.timeout = timeout or settings.PAYSTACK_OUTBOX_TIMEOUT
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_maxsize=settings.PAYSTACK_OUTBOX_CONCURRENCY, max_retries=0)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+    def send(self, event):
+        body = event_message(event).encode()
+        response = self.session.post(
+            self.url,
+            data=body,
+            headers={
+                "Content-Type": "application/json",
+                "x-outbox-event-id": str(event.pk),
+                "x-outbox-signature": hmac.new(self.secret, body, hashlib.sha512).hexdigest(),
+            },
+            timeout=self.timeout,
+        )
+        if not 200 <= response.status_code < 300:
+            raise OutboxDeliveryError(f"{self.url} responded with {response.status_code}")
+
+
+class FileOutboxSink(OutboxSink):
+    """
+    Appends each event as a line of JSON to ``PAYSTACK_OUTBOX_FILE_PATH``, for local development or for a log
+    shipper to pick up.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.PAYSTACK_OUTBOX_FILE_PATH
+        self._lock = threading.Lock()
+
+    def send(self, event):
+        line = event_message(event) + "\n"
+        with self._lock, open(self.path, "a") as file:
+            file.write(line)
+
+
+class InMemoryOutboxSink(OutboxSink):
+    """
+    Keeps published events in ``sent``, for tests. References listed in ``failing`` fail to publish.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.failing = set()
+        self._lock = threading.Lock()
+
+    def send(self, event):
+        if event.reference in self.failing:
+            raise OutboxDeliveryError(f"Delivery of {event.reference} failed")
+        with self._lock:
+            self.sent.append(event)
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_outbox_sink():
+    """
+    Returns the process-wide outbox sink configured by ``PAYSTACK_OUTBOX_SINK``.
+    """
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = import_string(settings.PAYSTACK_OUTBOX_SINK)()
+    return _sink
+
+
+def reset_outbox_sink():
+    global _sink
+    _sink = None
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff with jitter between delivery attempts, capped at ``PAYSTACK_OUTBOX_BACKOFF_MAX`` seconds.
+    """
+    delay = min(settings.PAYSTACK_OUTBOX_BACKOFF_MAX, settings.PAYSTACK_OUTBOX_BACKOFF * 2 ** (attempts - 1))
+    return random.uniform(delay / 2, delay)
+
+
+class OutboxRelay:
+    """
+    Publishes outbox events to a sink in batches, at least once and in order per reference.
+
+    Each batch is claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several relays can run side by side.
+    Only the oldest undelivered event of each reference is claimable, so events for one reference are
+    published one at a time and in the order they were written, while events for different references are
+    published concurrently, up to ``concurrency`` at a time. A failed delivery is retried with exponential
+    backoff, holding back later events for that reference, until ``PAYSTACK_OUTBOX_MAX_ATTEMPTS`` is reached
+    and the event is marked failed. Events left in processing by a relay that died become claimable again after
+    ``PAYSTACK_OUTBOX_VISIBILITY_TIMEOUT`` seconds; that and a crash between publishing and recording the
+    delivery are why consumers may see an event more than once.
+
+    Args:
+        sink (OutboxSink): Where events are published. Defaults to ``get_outbox_sink()``.
+        batch_size (int): The maximum number of events claimed per batch.
+        concurrency (int): The maximum number of deliveries in flight.
+    """
+
+    def __init__(self, sink=None, batch_size=100, concurrency=None):
+        self.sink = sink or get_outbox_sink()
+        self.batch_size = batch_size
+        self.concurrency = concurrency or settings.PAYSTACK_OUTBOX_CONCURRENCY
+        self.delivered = 0
+        self.failed = 0
+
+    def claim(self):
+        now = timezone.now()
+        stale_before = now - timedelta(seconds=settings.PAYSTACK_OUTBOX_VISIBILITY_TIMEOUT)
+        unfinished = [OutboxEventStatus.PENDING, OutboxEventStatus.PROCESSING]
+        earlier = OutboxEvent.objects.filter(reference=OuterRef("reference"), status__in=unfinished).filter(
+            Q(created_at__lt=OuterRef("created_at")) | Q(created_at=OuterRef("created_at"), id__lt=OuterRef("id"))
+        )
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=OutboxEventStatus.PENDING, next_attempt_at__lte=now)
+                    | Q(status=OutboxEventStatus.PROCESSING, updated_at__lt=stale_before)
+                )
+                .filter(~Exists(earlier))
+                .order_by("created_at", "id")[: self.batch_size]
+            )
+            if events:
+                OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                    status=OutboxEventStatus.PROCESSING, attempts=F("attempts") + 1, updated_at=now
+                )
+        for event in events:
+            event.attempts += 1
+        return events
+
+    def deliver(self, event):
+        try:
+            self.sink.send(event)
+        except Exception as e:
+            return e
+        return None
+
+    def run_once(self):
+        """
+        Claims and publishes one batch.
+
+        Returns:
+            int: The number of events claimed; zero means nothing was due.
+        """
+        events = self.claim()
+        if not events:
+            return 0
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(events))) as executor:
+            errors = list(executor.map(self.deliver, events))
+
+        now = timezone.now()
+        delivered, failed = [], []
+        for event, error in zip(events, errors):
+            if error is None:
+                delivered.append(event.pk)
+                continue
+            logger.warning(f"Outbox delivery of {event.event} for {event.reference} failed: {error}")
+            event.last_error = str(error)
+            event.updated_at = now
+            if event.attempts >= settings.PAYSTACK_OUTBOX_MAX_ATTEMPTS:
+                event.status = OutboxEventStatus.FAILED
+            else:
+                event.status = OutboxEventStatus.PENDING
+                event.next_attempt_at = now + timedelta(seconds=retry_delay(event.attempts))
+            failed.append(event)
+        OutboxEvent.objects.filter(pk__in=delivered).update(
+            status=OutboxEventStatus.DELIVERED, last_error="", updated_at=now
+        )
+        OutboxEvent.objects.bulk_update(failed, ["status", "next_attempt_at", "last_error", "updated_at"])
+        self.delivered += len(delivered)
+        self.failed += sum(event.status == OutboxEventStatus.FAILED for event in failed)
+        return len(events)
@@ -0,0 +1,73 @@
+import base64
+import json
+import uuid
+from collections.abc import Mapping
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(transaction_obj):
+    """
+    Encodes the (created_at, id) position of ``transaction_obj``, a model instance or ``.values()`` row, as an
+    opaque cursor.
+    """
+    if isinstance(transaction_obj, Mapping):
+        created_at, pk = transaction_obj["created_at"], transaction_obj["id"]
+    else:
+        created_at, pk = transaction_obj.created_at, transaction_obj.id
+    position = [created_at.isoformat(), str(pk)]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor produced by ``encode_cursor``.
+
+    Returns:
+        tuple: The ``created_at`` datetime and ``id`` UUID of the last row of the previous page.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError(created_at)
+        return created_at, uuid.UUID(pk)
+    except (ValueError, TypeError, AttributeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset_page(queryset, cursor, page_size):
+    """
+    Returns one page of ``queryset`` ordered newest first by (created_at, id).
+
+    Instead of an ``OFFSET``, each page starts strictly after the (created_at, id) position stored in the
+    cursor, so the database walks the index from that position and every page costs the same regardless of
+    how deep it is.
+
+    Args:
+        queryset (QuerySet): The filtered queryset to paginate. A ``.values()`` queryset must include
+            ``created_at`` and ``id``.
+        cursor (str): The ``next_cursor`` of the previous page, or None for the first page.
+        page_size (int): The number of rows per page.
+
+    Returns:
+        tuple: The rows of the page and the cursor of the next page, or None on the last page.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    rows = list(queryset.order_by("-created_at", "-id")[: page_size + 1])
+    if len(rows) > page_size:
+        return rows[:page_size], encode_cursor(rows[page_size - 1])
+    return rows, None
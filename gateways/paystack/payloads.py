@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+
+from gateways.common.money import DEFAULT_CURRENCY, Money
+
+
+@dataclass(slots=True)
+class VerificationData:
+    """
+    The fields the API reads from a Paystack verify response.
+
+    The body is still decoded in full (see ``core.fastjson.response_json``), but only these six values are read
+    from it and kept; nothing else in the (much larger) ``data`` object is copied or validated.
+    """
+
+    status: str
+    email: str
+    name: str
+    amount_minor: int
+    currency: str
+    message: str
+
+    @classmethod
+    def from_response(cls, res):
+        """
+        Args:
+            res (dict): The JSON response from Paystack's verify endpoint.
+
+        Returns:
+            VerificationData: The extracted fields, with the amount kept in the currency's minor unit.
+        """
+        data = res.get("data") or {}
+        return cls(
+            status=data.get("status"),
+            email=(data.get("customer") or {}).get("email"),
+            name=(data.get("metadata") or {}).get("name"),
+            amount_minor=int(data.get("amount")),
+            currency=data.get("currency") or DEFAULT_CURRENCY,
+            message=data.get("gateway_response"),
+        )
+
+    def as_dict(self):
+        return {
+            "status": self.status,
+            "email": self.email,
+            "name": self.name,
+            "amount": Money(self.amount_minor, self.currency).display(),
+            "amount_minor": self.amount_minor,
+            "currency": self.currency,
+            "message": self.message,
+        }
+
+
+@dataclass(slots=True)
+class InitializeData:
+    """
+    The fields stored from a Paystack initialize response.
+    """
+
+    reference: str
+    access_code: str
+
+    @classmethod
+    def from_response(cls, res):
+        """
+        Args:
+            res (dict): The JSON response from Paystack's initialize endpoint.
+
+        Returns:
+            InitializeData: The payment reference and access code.
+
+        Raises:
+            KeyError: If the response carries no reference.
+        """
+        data = res.get("data") or {}
+        return cls(reference=data["reference"], access_code=data.get("access_code") or "")
@@ -0,0 +1,136 @@
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from gateways.common.tenants import tenant_context, tenant_resolver
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.services import SETTLED_STATUSES, build_verification_data, next_poll_time, record_verification
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PollReport:
+    polled: int = 0
+    settled: int = 0
+    rescheduled: int = 0
+    expired: int = 0
+    errors: int = 0
+
+    def __str__(self):
+        return (
+            f"polled={self.polled} settled={self.settled} rescheduled={self.rescheduled} expired={self.expired} "
+            f"errors={self.errors}"
+        )
+
+
+class PollScheduler:
+    """
+    Verifies initialized transactions on the ``PAYSTACK_POLL_SCHEDULE`` backoff until they settle.
+
+    ``record_initialization`` sets ``next_poll_at`` on every pending transaction. Each tick claims up to
+    ``batch_size`` due transactions through the partial index on ``next_poll_at`` with
+    ``SELECT ... FOR UPDATE SKIP LOCKED``, so several workers can poll side by side without verifying the same
+    transaction twice, and leases them by moving ``next_poll_at`` ``PAYSTACK_POLL_LEASE`` seconds ahead; a
+    worker that dies mid-batch leaves its transactions to be picked up again when the lease runs out.
+
+    The claimed references are verified with up to ``concurrency`` calls in flight and the results recorded
+    with ``record_verification``. Each transaction is then taken off the schedule once it settles (success or
+    failed) or its schedule is exhausted, or moved to its next slot; failed verify calls count as attempts.
+
+    Args:
+        gateway (PaystackPaymentGateway): The gateway used to verify transactions.
+        batch_size (int): The maximum number of transactions claimed per tick.
+        concurrency (int): The maximum number of verify calls in flight.
+    """
+
+    def __init__(self, gateway, batch_size=100, concurrency=8):
+        self.gateway = gateway
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.report = PollReport()
+
+    def claim(self):
+        """
+        Claims the due transactions, oldest due first.
+
+        Returns:
+            list[tuple]: ``(pk, reference, poll_attempts, tenant_id)`` for each claimed transaction.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                PaystackTransaction.objects.select_for_update(skip_locked=True)
+                .filter(next_poll_at__lte=now)
+                .order_by("next_poll_at")
+                .values_list("pk", "reference", "poll_attempts", "tenant_id")[: self.batch_size]
+            )
+            if rows:
+                PaystackTransaction.objects.filter(pk__in=[pk for pk, _, _, _ in rows]).update(
+                    next_poll_at=now + timedelta(seconds=settings.PAYSTACK_POLL_LEASE)
+                )
+        return rows
+
+    def verify(self, reference, tenant=None):
+        """
+        Verifies ``reference`` with the Paystack key of ``tenant``, the tenant it was initialized for, returning
+        the verification data or None on error.
+        """
+        try:
+            with tenant_context(tenant):
+                return build_verification_data(self.gateway.verify_payment(reference))
+        except Exception as e:
+            logger.error(f"Error polling transaction {reference}: {e}")
+            return None
+
+    def tick(self):
+        """
+        Claims, verifies and reschedules one batch.
+
+        Returns:
+            int: The number of transactions polled; zero means nothing was due.
+        """
+        rows = self.claim()
+        if not rows:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(
+                executor.map(
+                    self.verify,
+                    [reference for _, reference, _, _ in rows],
+                    [tenant_resolver.by_id(tenant_id) if tenant_id else None for _, _, _, tenant_id in rows],
+                )
+            )
+
+        now = timezone.now()
+        schedule = defaultdict(list)
+        for (pk, reference, attempts, _), data in zip(rows, results):
+            status = None
+            if data is None:
+                self.report.errors += 1
+            else:
+                record_verification(reference, data)
+                status = data["status"]
+            attempts += 1
+            next_poll_at = None if status in SETTLED_STATUSES else next_poll_time(attempts, now)
+            if status in SETTLED_STATUSES:
+                self.report.settled += 1
+            elif next_poll_at is None:
+                self.report.expired += 1
+                logger.info(f"Stopped polling transaction {reference} after {attempts} attempts")
+            else:
+                self.report.rescheduled += 1
+            schedule[next_poll_at, attempts].append(pk)
+        # A transaction settled while it was leased (by a webhook or callback) is already off the schedule.
+        for (next_poll_at, attempts), pks in schedule.items():
+            PaystackTransaction.objects.filter(pk__in=pks).exclude(status__in=SETTLED_STATUSES).update(
+                next_poll_at=next_poll_at, poll_attempts=attempts
+            )
+        self.report.polled += len(rows)
+        return len(rows)
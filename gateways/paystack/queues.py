@@ -0,0 +1,152 @@
+import collections
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from gateways.paystack.enums import WebhookEventStatus
+from gateways.paystack.models import PaystackWebhookEvent
+
+
+class WebhookQueue:
+    """
+    Interface for the queue that buffers Paystack webhook events between ingestion and processing.
+    """
+
+    def enqueue(self, event, reference, payload, tenant_id=None):
+        """
+        Adds an event; ``tenant_id`` is the tenant whose Paystack key signed it, or None for the global key.
+        """
+        raise NotImplementedError
+
+    def claim(self, batch_size):
+        """
+        Hands out up to ``batch_size`` events to the calling worker. Claimed events are not handed to other
+        workers until they are acked, failed, or their visibility timeout expires.
+        """
+        raise NotImplementedError
+
+    def ack(self, events):
+        raise NotImplementedError
+
+    def fail(self, events, error):
+        raise NotImplementedError
+
+
+class DatabaseWebhookQueue(WebhookQueue):
+    """
+    Durable queue stored in the ``PaystackWebhookEvent`` table.
+
+    Workers claim rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several processes can drain the queue
+    without handing out the same event twice. Rows left in processing by a crashed worker become claimable
+    again after ``PAYSTACK_WEBHOOK_VISIBILITY_TIMEOUT`` seconds.
+    """
+
+    def enqueue(self, event, reference, payload, tenant_id=None):
+        return PaystackWebhookEvent.objects.create(
+            event=event, reference=reference, payload=payload, tenant_id=tenant_id
+        )
+
+    def claim(self, batch_size):
+        stale_before = timezone.now() - timedelta(seconds=settings.PAYSTACK_WEBHOOK_VISIBILITY_TIMEOUT)
+        with transaction.atomic():
+            events = list(
+                PaystackWebhookEvent.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=WebhookEventStatus.PENDING)
+                    | Q(status=WebhookEventStatus.PROCESSING, updated_at__lt=stale_before)
+                )
+                .order_by("created_at")[:batch_size]
+            )
+            if events:
+                PaystackWebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                    status=WebhookEventStatus.PROCESSING, attempts=F("attempts") + 1, updated_at=timezone.now()
+                )
+        return events
+
+    def ack(self, events):
+        PaystackWebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            status=WebhookEventStatus.PROCESSED, last_error="", updated_at=timezone.now()
+        )
+
+    def fail(self, events, error):
+        ids = [event.pk for event in events]
+        now = timezone.now()
+        PaystackWebhookEvent.objects.filter(pk__in=ids, attempts__gte=settings.PAYSTACK_WEBHOOK_MAX_ATTEMPTS).update(
+            status=WebhookEventStatus.FAILED, last_error=str(error), updated_at=now
+        )
+        PaystackWebhookEvent.objects.filter(pk__in=ids, status=WebhookEventStatus.PROCESSING).update(
+            status=WebhookEventStatus.PENDING, last_error=str(error), updated_at=now
+        )
+
+
+class InMemoryWebhookQueue(WebhookQueue):
+    """
+    Process-local stand-in for ``DatabaseWebhookQueue``, for tests and local development.
+
+    Events are plain ``PaystackWebhookEvent`` instances that are never saved.
+    """
+
+    def __init__(self):
+        self.pending = collections.deque()
+        self.processed = []
+        self.failed = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, event, reference, payload, tenant_id=None):
+        webhook_event = PaystackWebhookEvent(
+            event=event, reference=reference, payload=payload, tenant_id=tenant_id, created_at=timezone.now()
+        )
+        with self._lock:
+            self.pending.append(webhook_event)
+        return webhook_event
+
+    def claim(self, batch_size):
+        with self._lock:
+            events = [self.pending.popleft() for _ in range(min(batch_size, len(self.pending)))]
+        for event in events:
+            event.status = WebhookEventStatus.PROCESSING
+            event.attempts += 1
+        return events
+
+    def ack(self, events):
+        with self._lock:
+            for event in events:
+                event.status = WebhookEventStatus.PROCESSED
+                self.processed.append(event)
+
+    def fail(self, events, error):
+        with self._lock:
+            for event in events:
+                event.last_error = str(error)
+                if event.attempts >= settings.PAYSTACK_WEBHOOK_MAX_ATTEMPTS:
+                    event.status = WebhookEventStatus.FAILED
+                    self.failed.append(event)
+                else:
+                    event.status = WebhookEventStatus.PENDING
+                    self.pending.append(event)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_webhook_queue():
+    """
+    Returns the process-wide webhook queue configured by ``PAYSTACK_WEBHOOK_QUEUE``.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = import_string(settings.PAYSTACK_WEBHOOK_QUEUE)()
+    return _queue
+
+
+def reset_webhook_queue():
+    global _queue
+    _queue = None
@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from gateways.paystack.exceptions import PaymentRateLimitedException
+
+WAIT = "wait"
+QUEUE = "queue"
+FAIL = "fail"
+
+
+class TokenBucketStore:
+    """
+    Interface for the shared state behind ``RateLimiter``'s token buckets.
+    """
+
+    def take(self, key, rate, capacity, max_wait):
+        """
+        Takes one token from the bucket at ``key``, refilled at ``rate`` tokens per second up to ``capacity``.
+
+        Returns:
+            float: 0 if a token was taken; otherwise the seconds until one is available. When that wait is at most
+            ``max_wait`` the token is reserved anyway, and the caller must sleep for the wait before proceeding.
+        """
+        raise NotImplementedError
+
+    async def atake(self, key, rate, capacity, max_wait):
+        """
+        asyncio counterpart of ``take``. In-process stores answer without I/O and can use this default; stores
+        that make network calls must override it so the event loop is never blocked.
+        """
+        return self.take(key, rate, capacity, max_wait)
+
+
+class LocalTokenBucketStore(TokenBucketStore):
+    """
+    In-process token buckets, for a single worker, tests and local development.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity, max_wait):
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait <= max_wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            return wait
+
+
+class RedisTokenBucketStore(TokenBucketStore):
+    """
+    Token buckets kept in Redis and updated atomically by a Lua script, shared by every worker.
+
+    Connects to ``PAYSTACK_RATE_LIMIT_REDIS_URL`` with its own client (``redis`` must be installed): a blocking
+    one for ``take`` and one ``redis.asyncio`` client per event loop for ``atake``. Time comes from the Redis
+    server so worker clock skew does not matter.
+    """
+
+    script = """
+        local now_parts = redis.call('TIME')
+        local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+        local rate = tonumber(ARGV[1])
+        local capacity = tonumber(ARGV[2])
+        local max_wait = tonumber(ARGV[3])
+        local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+        local tokens = tonumber(state[1]) or capacity
+        local updated_at = tonumber(state[2]) or now
+        tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+        local wait = 0
+        if tokens < 1 then
+            wait = (1 - tokens) / rate
+        end
+        if wait <= max_wait then
+            tokens = tokens - 1
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+        redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+        return tostring(wait)
+    """
+
+    key_prefix = "paystack:"
+
+    def __init__(self, url=None):
+        self.url = url or settings.PAYSTACK_RATE_LIMIT_REDIS_URL
+        if not self.url:
+            raise ImproperlyConfigured("RedisTokenBucketStore requires PAYSTACK_RATE_LIMIT_REDIS_URL")
+        self._script = None
+        self._lock = threading.Lock()
+        self._async_scripts = weakref.WeakKeyDictionary()
+
+    def _sync_script(self):
+        if self._script is None:
+            import redis
+
+            with self._lock:
+                if self._script is None:
+                    self._script = redis.Redis.from_url(self.url).register_script(self.script)
+        return self._script
+
+    def _loop_script(self):
+        loop = asyncio.get_running_loop()
+        script = self._async_scripts.get(loop)
+        if script is None:
+            from redis import asyncio as aioredis
+
+            script = self._async_scripts[loop] = aioredis.Redis.from_url(self.url).register_script(self.script)
+        return script
+
+    def take(self, key, rate, capacity, max_wait):
+        return float(self._sync_script()(keys=[self.key_prefix + key], args=[rate, capacity, max_wait]))
+
+    async def atake(self, key, rate, capacity, max_wait):
+        return float(await self._loop_script()(keys=[self.key_prefix + key], args=[rate, capacity, max_wait]))
+
+
+class RateLimiter:
+    """
+    Client-side token-bucket limiter with separate budgets for Paystack endpoints.
+
+    Budgets come from ``PAYSTACK_RATE_LIMITS`` as ``{name: (tokens_per_second, burst)}``; a budget with a rate
+    of 0 is unlimited. When a budget is exhausted the caller's mode decides what happens:
+
+    - ``wait``: poll until a token frees up, for at most ``PAYSTACK_RATE_LIMIT_MAX_WAIT`` seconds.
+    - ``queue``: reserve the next free token and sleep until its slot, if that slot is within the max wait.
+    - ``fail``: raise ``PaymentRateLimitedException`` straight away.
+
+    Time spent throttled and the number of rejected calls are tracked per budget in ``stats``.
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+        self._stats_lock = threading.Lock()
+        self.stats = defaultdict(lambda: {"throttled": 0, "throttled_seconds": 0.0, "rejected": 0})
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = import_string(settings.PAYSTACK_RATE_LIMIT_STORE)()
+        return self._store
+
+    def record(self, budget, waited=0.0, rejected=False):
+        with self._stats_lock:
+            stats = self.stats[budget]
+            if waited:
+                stats["throttled"] += 1
+                stats["throttled_seconds"] += waited
+            if rejected:
+                stats["rejected"] += 1
+
+    def _bucket(self, budget):
+        """
+        Returns the store key, rate and capacity of ``budget``, or None if it is unlimited.
+        """
+        rate, capacity = settings.PAYSTACK_RATE_LIMITS.get(budget, (0, 0))
+        if not rate:
+            return None
+        return f"ratelimit:paystack:{budget}", rate, max(capacity, 1)
+
+    def _next_sleep(self, budget, mode, wait, waited):
+        """
+        Decides what follows a take that returned ``wait`` after ``waited`` seconds of throttling.
+
+        Returns:
+            float: How long to sleep before trying again (or, in ``queue`` mode, before proceeding with the
+            reserved token); None once a token is held.
+
+        Raises:
+            PaymentRateLimitedException: If the mode gives up.
+        """
+        if not wait:
+            return None
+        max_wait = settings.PAYSTACK_RATE_LIMIT_MAX_WAIT
+        if mode == QUEUE and wait <= max_wait - waited:
+            return wait
+        if mode == FAIL or waited + wait > max_wait:
+            self.record(budget, waited, rejected=True)
+            raise PaymentRateLimitedException(f"Paystack {budget} rate limit reached", retry_after=wait)
+        return wait
+
+    def _reservable(self, mode, waited):
+        return settings.PAYSTACK_RATE_LIMIT_MAX_WAIT - waited if mode == QUEUE else 0
+
+    def acquire(self, budget, mode=None):
+        """
+        Blocks until a token for ``budget`` is available, according to ``mode``.
+
+        Raises:
+            PaymentRateLimitedException: If no token can be had within the mode's limits.
+        """
+        bucket = self._bucket(budget)
+        if bucket is None:
+            return
+        mode = mode or settings.PAYSTACK_RATE_LIMIT_MODE
+        waited = 0.0
+        while True:
+            wait = self.store.take(*bucket, self._reservable(mode, waited))
+            sleep = self._next_sleep(budget, mode, wait, waited)
+            if sleep is None:
+                break
+            time.sleep(sleep)
+            waited += sleep
+            if mode == QUEUE:
+                break
+        if waited:
+            self.record(budget, waited)
+
+    async def aacquire(self, budget, mode=None):
+        """
+        asyncio counterpart of ``acquire``; the store is reached through ``atake`` so the loop never blocks.
+        """
+        bucket = self._bucket(budget)
+        if bucket is None:
+            return
+        mode = mode or settings.PAYSTACK_RATE_LIMIT_MODE
+        waited = 0.0
+        while True:
+            wait = await self.store.atake(*bucket, self._reservable(mode, waited))
+            sleep = self._next_sleep(budget, mode, wait, waited)
+            if sleep is None:
+                break
+            await asyncio.sleep(sleep)
+            waited += sleep
+            if mode == QUEUE:
+                break
+        if waited:
+            self.record(budget, waited)
+
+
+rate_limiter = RateLimiter()
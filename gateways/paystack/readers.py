@@ -0,0 +1,133 @@
+import decimal
+from functools import cached_property
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, fields
+from rest_framework.settings import api_settings
+
+from gateways.paystack.serializers import PaystackTransactionSerializer
+
+
+def _decimal_converter(field):
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            return field.to_representation(value)
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        return "{:f}".format(value.quantize(exponent, rounding=rounding, context=context))
+
+    return convert
+
+
+def _datetime_converter(field):
+    if getattr(field, "format", api_settings.DATETIME_FORMAT) != ISO_8601 or hasattr(field, "timezone"):
+        return field.to_representation
+
+    def convert(value):
+        if not settings.USE_TZ or timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(timezone.get_current_timezone()).isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return convert
+
+
+def _converter(field):
+    """
+    Returns the function turning a database value into ``field``'s representation.
+
+    The common field types get a closure with the checks DRF repeats on every value done once up front;
+    anything else uses the field's own ``to_representation``.
+    """
+    field_type = type(field)
+    if field_type in (fields.CharField, fields.EmailField):
+        return str
+    if field_type is fields.UUIDField and field.uuid_format == "hex_verbose":
+        return str
+    if field_type is fields.DecimalField:
+        return _decimal_converter(field)
+    if field_type is fields.DateTimeField:
+        return _datetime_converter(field)
+    return field.to_representation
+
+
+class CompiledReadSerializer:
+    """
+    Read-only serializer producing the same output as ``serializer_class`` from ``.values()`` rows.
+
+    ``ModelSerializer`` builds its fields from the model on every instantiation and resolves each attribute
+    through the field machinery. This builds the field plan (output name, column and converter per field)
+    once, reads only those columns with ``.values()`` instead of loading model instances, and applies the
+    converters directly.
+
+    Args:
+        serializer_class (type): The serializer whose output is reproduced. Every field must read a single
+            model field, or provide ``columns`` and ``from_row(row)`` to read several.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def plan(self):
+        plan = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if hasattr(field, "from_row"):
+                plan.append((name, None, field.from_row))
+                continue
+            if len(field.source_attrs) != 1:
+                raise ImproperlyConfigured(f"{self.serializer_class.__name__}.{name} does not read a single column")
+            plan.append((name, field.source_attrs[0], _converter(field)))
+        return tuple(plan)
+
+    @cached_property
+    def columns(self):
+        fields = self.serializer_class().fields
+        columns = []
+        for name, column, _ in self.plan:
+            columns += fields[name].columns if column is None else [column]
+        return tuple(dict.fromkeys(columns))
+
+    def values(self, queryset):
+        """
+        Returns ``queryset`` reading only the columns the plan needs, as dicts.
+        """
+        return queryset.values(*self.columns)
+
+    def to_representation(self, row):
+        """
+        Serializes one ``.values()`` row.
+        """
+        data = {}
+        for name, column, convert in self.plan:
+            if column is None:
+                data[name] = convert(row)
+                continue
+            value = row[column]
+            data[name] = None if value is None else convert(value)
+        return data
+
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+transaction_reader = CompiledReadSerializer(PaystackTransactionSerializer)
+
+
+def use_compiled_serializer(endpoint):
+    """
+    Returns whether ``endpoint`` (``"retrieve"`` or ``"list"``) reads transactions through
+    ``transaction_reader`` instead of ``PaystackTransactionSerializer``.
+    """
+    return endpoint in settings.PAYSTACK_COMPILED_SERIALIZER_ENDPOINTS
@@ -0,0 +1,230 @@
+import itertools
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.db import transaction
+
+from gateways.common.tenants import tenant_context, tenant_resolver
+from gateways.paystack.exceptions import PaymentErrorException
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.outbox import enqueue_outbox_events
+from gateways.paystack.rollups import RollupDeltas, apply_rollup_deltas
+from gateways.paystack.services import (
+    SETTLED_STATUSES,
+    apply_verification,
+    build_verification_data,
+    invalidate_transactions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReconciliationReport:
+    processed: int = 0
+    updated: int = 0
+    created: int = 0
+    errors: int = 0
+    throttled: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"processed={self.processed} updated={self.updated} created={self.created} errors={self.errors} "
+            f"throttled={self.throttled} rate={self.rate:.1f}/s"
+        )
+
+
+class Pacer:
+    """
+    Spaces out calls so no more than ``max_per_second`` start each second across all threads.
+
+    A 429 from Paystack pushes the next allowed start back by its ``Retry-After`` hint.
+    """
+
+    def __init__(self, max_per_second=None):
+        self.interval = 1 / max_per_second if max_per_second else 0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def back_off(self, seconds):
+        with self.lock:
+            self.next_at = max(self.next_at, time.monotonic() + seconds)
+
+
+class Reconciler:
+    """
+    Verifies transactions against Paystack in chunks and writes the results back in bulk.
+
+    Each chunk is verified with up to ``concurrency`` calls in flight, then written in one database transaction
+    through ``apply_verification``, the same status rules callbacks, polling and webhooks follow. The
+    checkpoint file is rewritten after every chunk so an interrupted run resumes where it stopped; it keeps a
+    position per mode (the pending sweep's primary key and the references file's line number), so resuming one
+    mode never reads the other's. Memory use is bounded by the chunk size. Each reference is verified with the
+    Paystack key of the tenant it was initialized for, as polling does.
+    """
+
+    def __init__(
+        self,
+        gateway,
+        concurrency=16,
+        chunk_size=500,
+        max_per_second=None,
+        max_retries=3,
+        checkpoint_path=None,
+        on_chunk=None,
+    ):
+        self.gateway = gateway
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.pacer = Pacer(max_per_second)
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.on_chunk = on_chunk
+        self.mode = "pending"
+        self.report = ReconciliationReport()
+        self.report_lock = threading.Lock()
+
+    def read_checkpoints(self):
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return {}
+        try:
+            checkpoints = json.loads(self.checkpoint_path.read_text() or "{}")
+        except ValueError:
+            checkpoints = None
+        if not isinstance(checkpoints, dict):
+            logger.warning(f"Ignoring checkpoint file {self.checkpoint_path} in an unknown format")
+            return {}
+        return checkpoints
+
+    def read_checkpoint(self, mode):
+        return self.read_checkpoints().get(mode)
+
+    def write_checkpoint(self, mode, value):
+        if self.checkpoint_path:
+            checkpoints = {**self.read_checkpoints(), mode: str(value)}
+            tmp_path = self.checkpoint_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(checkpoints))
+            tmp_path.replace(self.checkpoint_path)
+
+    def pending_references(self, limit=None):
+        """
+        Streams ``(checkpoint, reference)`` pairs for unsettled (pending or abandoned) transactions in primary
+        key order.
+
+        Uses ``iterator()`` so Postgres serves the rows from a server-side cursor.
+        """
+        self.mode = "pending"
+        queryset = PaystackTransaction.objects.exclude(status__in=SETTLED_STATUSES).order_by("pk")
+        checkpoint = self.read_checkpoint(self.mode)
+        if checkpoint:
+            queryset = queryset.filter(pk__gt=checkpoint)
+        rows = queryset.values_list("pk", "reference").iterator(chunk_size=self.chunk_size)
+        return itertools.islice(rows, limit)
+
+    def file_references(self, path, limit=None):
+        """
+        Streams ``(checkpoint, reference)`` pairs from a file with one reference per line, where the checkpoint
+        is the line number.
+        """
+        self.mode = "references_file"
+        skip = int(self.read_checkpoint(self.mode) or 0)
+
+        def rows():
+            with open(path) as file:
+                for line_number, line in enumerate(file, start=1):
+                    reference = line.strip()
+                    if line_number > skip and reference:
+                        yield line_number, reference
+
+        return itertools.islice(rows(), limit)
+
+    def tenants(self, references):
+        """
+        Returns the tenant each of ``references`` was initialized for, or None, read with one query so the verify
+        threads never touch the database.
+        """
+        tenant_ids = dict(
+            PaystackTransaction.objects.filter(reference__in=references, tenant__isnull=False).values_list(
+                "reference", "tenant_id"
+            )
+        )
+        return [
+            tenant_resolver.by_id(tenant_ids[reference]) if reference in tenant_ids else None
+            for reference in references
+        ]
+
+    def verify(self, reference, tenant=None):
+        """
+        Verifies ``reference`` with the Paystack key of ``tenant``, the tenant it was initialized for, retrying
+        429 responses.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.pacer.wait()
+            try:
+                with tenant_context(tenant):
+                    return build_verification_data(self.gateway.verify_payment(reference))
+            except PaymentErrorException as e:
+                if e.status_code != 429 or attempt == self.max_retries:
+                    raise
+                with self.report_lock:
+                    self.report.throttled += 1
+                self.pacer.back_off(2**attempt if e.retry_after is None else e.retry_after)
+
+    def run(self, rows):
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                chunk = list(itertools.islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                references = [reference for _, reference in chunk]
+                results = executor.map(self.safe_verify, references, self.tenants(references))
+                self.apply(dict(zip(references, results)))
+                self.write_checkpoint(self.mode, chunk[-1][0])
+                self.report.processed += len(chunk)
+                if self.on_chunk:
+                    self.on_chunk(self.report)
+        return self.report
+
+    def safe_verify(self, reference, tenant=None):
+        try:
+            return self.verify(reference, tenant)
+        except Exception as e:
+            logger.error(f"Error reconciling transaction {reference}: {e}")
+            with self.report_lock:
+                self.report.errors += 1
+            return None
+
+    def apply(self, results):
+        deltas = RollupDeltas()
+        updated, created = [], []
+        with transaction.atomic():
+            for reference, data in results.items():
+                if data is None:
+                    continue
+                changed, inserted = apply_verification(reference, data, deltas)
+                updated += changed
+                created += inserted
+            apply_rollup_deltas(deltas)
+            enqueue_outbox_events(updated + created)
+            invalidate_transactions(*updated, *created)
+        self.report.updated += len(updated)
+        self.report.created += len(created)
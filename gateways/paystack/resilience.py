@@ -0,0 +1,172 @@
+import random
+import threading
+import time
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.cache import caches
+
+
+def upstream_status(error):
+    """
+    Returns the HTTP status code carried by a requests/httpx error, or None for transport errors.
+    """
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_failure(error):
+    """
+    Whether an error means Paystack itself is unhealthy: a 5xx response, a timeout or a connection error.
+    """
+    status_code = upstream_status(error)
+    if status_code is not None:
+        return status_code >= 500
+    return isinstance(error, (requests.RequestException, httpx.TransportError))
+
+
+def is_retryable(error):
+    return is_failure(error) or upstream_status(error) == 429
+
+
+def backoff_delay(attempt, retry_after=None):
+    """
+    Full-jitter exponential backoff, capped at ``PAYSTACK_RETRY_BACKOFF_MAX`` seconds.
+    """
+    if retry_after is not None:
+        return min(retry_after, settings.PAYSTACK_RETRY_BACKOFF_MAX)
+    return random.uniform(0, min(settings.PAYSTACK_RETRY_BACKOFF_MAX, settings.PAYSTACK_RETRY_BACKOFF * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker whose state lives in the Django cache so every worker sees the same circuit.
+
+    The circuit opens after ``PAYSTACK_CIRCUIT_FAILURE_THRESHOLD`` failures within
+    ``PAYSTACK_CIRCUIT_FAILURE_WINDOW`` seconds and rejects calls for ``PAYSTACK_CIRCUIT_RECOVERY_TIMEOUT``
+    seconds. After that one caller across all workers is let through as a half-open probe: success closes the
+    circuit, failure opens it again, and any other outcome (a 4xx, a rate-limit rejection) hands the probe to the
+    next caller.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.failures_key = f"circuit:{name}:failures"
+        self.open_key = f"circuit:{name}:open_until"
+        self.probe_key = f"circuit:{name}:probe"
+
+    @property
+    def cache(self):
+        return caches[settings.PAYSTACK_CACHE_ALIAS]
+
+    @property
+    def probe_timeout(self):
+        """
+        How long the half-open probe holds its lock: long enough for one call to time out.
+        """
+        return settings.PAYSTACK_CONNECT_TIMEOUT + settings.PAYSTACK_READ_TIMEOUT
+
+    def retry_after(self, open_until):
+        return max(0.0, open_until - time.time()) if open_until else 0.0
+
+    def allow(self):
+        """
+        Returns True if a call may go through. While half-open only the caller that wins the probe lock does.
+        """
+        open_until = self.cache.get(self.open_key)
+        if open_until is None:
+            return True
+        if open_until > time.time():
+            return False
+        return self.cache.add(self.probe_key, 1, self.probe_timeout)
+
+    def remaining(self):
+        """
+        Seconds until the circuit allows a probe, 0 if it is closed.
+        """
+        return self.retry_after(self.cache.get(self.open_key))
+
+    def record_success(self):
+        if self.cache.get(self.open_key) is not None or self.cache.get(self.failures_key):
+            self.cache.delete_many([self.open_key, self.probe_key, self.failures_key])
+
+    def release_probe(self):
+        """
+        Frees the half-open probe lock after a call that neither proved nor disproved Paystack's health.
+        """
+        self.cache.delete(self.probe_key)
+
+    def record_failure(self):
+        cache = self.cache
+        if cache.get(self.open_key) is not None:
+            self.trip()
+            return
+        cache.add(self.failures_key, 0, settings.PAYSTACK_CIRCUIT_FAILURE_WINDOW)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            cache.set(self.failures_key, 1, settings.PAYSTACK_CIRCUIT_FAILURE_WINDOW)
+            failures = 1
+        if failures >= settings.PAYSTACK_CIRCUIT_FAILURE_THRESHOLD:
+            self.trip()
+
+    def trip(self):
+        open_until = time.time() + settings.PAYSTACK_CIRCUIT_RECOVERY_TIMEOUT
+        self.cache.set(self.open_key, open_until, None)
+        self.cache.delete_many([self.probe_key, self.failures_key])
+
+    async def aallow(self):
+        open_until = await self.cache.aget(self.open_key)
+        if open_until is None:
+            return True
+        if open_until > time.time():
+            return False
+        return await self.cache.aadd(self.probe_key, 1, self.probe_timeout)
+
+    async def aremaining(self):
+        return self.retry_after(await self.cache.aget(self.open_key))
+
+    async def arecord_success(self):
+        if await self.cache.aget(self.open_key) is not None or await self.cache.aget(self.failures_key):
+            await self.cache.adelete_many([self.open_key, self.probe_key, self.failures_key])
+
+    async def arelease_probe(self):
+        await self.cache.adelete(self.probe_key)
+
+    async def arecord_failure(self):
+        cache = self.cache
+        if await cache.aget(self.open_key) is not None:
+            await self.atrip()
+            return
+        await cache.aadd(self.failures_key, 0, settings.PAYSTACK_CIRCUIT_FAILURE_WINDOW)
+        try:
+            failures = await cache.aincr(self.failures_key)
+        except ValueError:
+            await cache.aset(self.failures_key, 1, settings.PAYSTACK_CIRCUIT_FAILURE_WINDOW)
+            failures = 1
+        if failures >= settings.PAYSTACK_CIRCUIT_FAILURE_THRESHOLD:
+            await self.atrip()
+
+    async def atrip(self):
+        open_until = time.time() + settings.PAYSTACK_CIRCUIT_RECOVERY_TIMEOUT
+        await self.cache.aset(self.open_key, open_until, None)
+        await self.cache.adelete_many([self.probe_key, self.failures_key])
+
+
+class Bulkhead:
+    """
+    Caps the number of Paystack calls in flight in this process; calls over the cap are shed immediately.
+
+    A limit of 0 disables the cap.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit) if limit else None
+
+    def acquire(self):
+        return self._semaphore is None or self._semaphore.acquire(blocking=False)
+
+    def release(self):
+        if self._semaphore is not None:
+            self._semaphore.release()
@@ -0,0 +1,143 @@
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from gateways.common.utils import uuid7
+from gateways.paystack.models import PaystackTransaction, TransactionRollup
+
+
+def rollup_day(created_at):
+    """
+    Returns the UTC day a transaction created at ``created_at`` is counted under.
+    """
+    return created_at.astimezone(dt_timezone.utc).date()
+
+
+class RollupDeltas:
+    """
+    Collects count and amount (minor units) changes per (day, status, currency) so one write applies them all.
+    """
+
+    def __init__(self):
+        self.changes = defaultdict(lambda: [0, 0])
+
+    def add(self, transaction_obj, sign=1):
+        """
+        Counts ``transaction_obj`` (its created_at, status, currency and amount_minor) in the rollups.
+        """
+        change = self.changes[
+            (rollup_day(transaction_obj.created_at), transaction_obj.status, transaction_obj.currency)
+        ]
+        change[0] += sign
+        change[1] += sign * transaction_obj.amount_minor
+
+    def remove(self, transaction_obj):
+        """
+        Stops counting ``transaction_obj`` as it was before a change.
+        """
+        self.add(transaction_obj, sign=-1)
+
+    def __bool__(self):
+        return any(count or amount_minor for count, amount_minor in self.changes.values())
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Adds ``deltas`` to the rollup table with one ``INSERT ... ON CONFLICT DO UPDATE`` statement.
+
+    The increment happens in the database, so concurrent writers never overwrite each other's changes.
+    Must run inside the transaction that made the changes for the rollups to stay exact.
+    """
+    rows = [(key, change) for key, change in deltas.changes.items() if change[0] or change[1]]
+    if not rows:
+        return
+
+    meta = TransactionRollup._meta
+    qn = connection.ops.quote_name
+    table = qn(meta.db_table)
+    columns = ["id", "created_at", "updated_at", "day", "status", "currency", "count", "amount_minor"]
+    fields = [meta.get_field(column) for column in columns]
+    now = timezone.now()
+    params = []
+    for (day, status, currency), (count, amount_minor) in rows:
+        values = [uuid7(), now, now, day, status, currency, count, amount_minor]
+        params += [field.get_db_prep_save(value, connection) for field, value in zip(fields, values)]
+
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(rows))
+    sql = (
+        f"INSERT INTO {table} ({', '.join(qn(column) for column in columns)}) VALUES {placeholders} "
+        f"ON CONFLICT ({qn('day')}, {qn('status')}, {qn('currency')}) DO UPDATE SET "
+        f"{qn('count')} = {table}.{qn('count')} + EXCLUDED.{qn('count')}, "
+        f"{qn('amount_minor')} = {table}.{qn('amount_minor')} + EXCLUDED.{qn('amount_minor')}, "
+        f"{qn('updated_at')} = EXCLUDED.{qn('updated_at')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def rebuild_rollups(chunk_size=50000, on_chunk=None):
+    """
+    Recomputes the rollup table from ``PaystackTransaction``.
+
+    Transactions are aggregated in primary key ranges of ``chunk_size`` rows, so each query stays short
+    however large the table is, and the rollup table is replaced in one transaction at the end. Changes made
+    while the rebuild runs may be counted twice or not at all; rerun it once writes are quiet.
+
+    Args:
+        chunk_size (int): Transactions aggregated per query.
+        on_chunk (callable): Called with the number of chunks processed after each chunk.
+
+    Returns:
+        int: The number of transactions counted.
+    """
+    totals = RollupDeltas()
+    counted, chunks, last_pk = 0, 0, None
+    last_offset = chunk_size - 1
+    while True:
+        queryset = PaystackTransaction.objects.order_by("pk")
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        boundary = list(queryset.values_list("pk", flat=True)[last_offset:chunk_size])
+        chunk = queryset.filter(pk__lte=boundary[0]) if boundary else queryset
+
+        rows = (
+            chunk.order_by()
+            .annotate(day=TruncDate("created_at", tzinfo=dt_timezone.utc))
+            .values("day", "status", "currency")
+            .annotate(rows=Count("id"), total=Sum("amount_minor"))
+        )
+        for row in rows:
+            change = totals.changes[(row["day"], row["status"], row["currency"])]
+            change[0] += row["rows"]
+            change[1] += row["total"] or 0
+            counted += row["rows"]
+
+        chunks += 1
+        if on_chunk:
+            on_chunk(chunks)
+        if not boundary:
+            break
+        last_pk = boundary[0]
+
+    now = timezone.now()
+    with transaction.atomic():
+        TransactionRollup.objects.all().delete()
+        TransactionRollup.objects.bulk_create(
+            [
+                TransactionRollup(
+                    day=day,
+                    status=status,
+                    currency=currency,
+                    count=count,
+                    amount_minor=amount_minor,
+                    created_at=now,
+                )
+                for (day, status, currency), (count, amount_minor) in totals.changes.items()
+            ],
+            batch_size=1000,
+        )
+    return counted
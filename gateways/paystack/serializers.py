@@ -1,15 +1,83 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
-from gateways.paystack.models import PaystackTransaction
+from gateways.common.money import DEFAULT_CURRENCY, Money
+from gateways.common.serializers import MinorUnitAmountField, validate_money
+from gateways.paystack.enums import PaystackPaymentStatus
+from gateways.paystack.models import PaystackTransaction, TransactionRollup
 
 
 class PaymentSerializer(serializers.Serializer):
     name = serializers.CharField(required=True, max_length=100)
     email = serializers.EmailField(required=True)
     amount = serializers.IntegerField(required=True, min_value=1)
+    currency = serializers.RegexField(r"^[A-Z]{3}$", required=False, default=DEFAULT_CURRENCY)
+
+    def validate(self, attrs):
+        return validate_money(attrs)
 
 
 class PaystackTransactionSerializer(serializers.ModelSerializer):
+    amount = MinorUnitAmountField()
+
     class Meta:
         model = PaystackTransaction
-        fields = "__all__"
+        exclude = ["next_poll_at", "poll_attempts", "tenant"]
+
+
+class TransactionFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=PaystackPaymentStatus.choices, required=False)
+    email = serializers.EmailField(required=False)
+    currency = serializers.CharField(required=False, max_length=3)
+    amount_min = serializers.DecimalField(max_digits=18, decimal_places=2, required=False)
+    amount_max = serializers.DecimalField(max_digits=18, decimal_places=2, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    page_size = serializers.IntegerField(required=False, min_value=1, max_value=500, default=50)
+    cursor = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        # Amount bounds are given in display units and compared against the minor-unit column.
+        currency = attrs.get("currency", DEFAULT_CURRENCY)
+        for name in ("amount_min", "amount_max"):
+            if name in attrs:
+                try:
+                    attrs[name] = Money.from_major(attrs[name], currency).minor
+                except ValueError as e:
+                    raise serializers.ValidationError({name: str(e)})
+        return attrs
+
+
+class TransactionRollupSerializer(serializers.ModelSerializer):
+    amount = MinorUnitAmountField()
+
+    class Meta:
+        model = TransactionRollup
+        fields = ["day", "status", "currency", "count", "amount", "amount_minor"]
+
+
+class RollupTotalSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    currency = serializers.CharField()
+    count = serializers.IntegerField()
+    amount = MinorUnitAmountField()
+    amount_minor = serializers.IntegerField()
+
+
+class RollupFilterSerializer(serializers.Serializer):
+    day_from = serializers.DateField(required=False)
+    day_to = serializers.DateField(required=False)
+    status = serializers.ChoiceField(choices=PaystackPaymentStatus.choices, required=False)
+    currency = serializers.CharField(required=False, max_length=3)
+
+    def validate(self, attrs):
+        day_to = attrs.setdefault("day_to", timezone.now().date())
+        day_from = attrs.setdefault("day_from", day_to - timedelta(days=29))
+        if day_from > day_to:
+            raise serializers.ValidationError("day_from must not be after day_to")
+        if (day_to - day_from).days >= settings.PAYSTACK_ROLLUP_MAX_DAYS:
+            raise serializers.ValidationError(f"The range can span at most {settings.PAYSTACK_ROLLUP_MAX_DAYS} days")
+        return attrs
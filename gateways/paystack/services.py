@@ -0,0 +1,549 @@
+import csv
+import logging
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.db_routers import pin_reads, read_alias, reads_pinned
+from core.log_context import add_log_context
+from core.metrics import timed
+from gateways.common.money import DEFAULT_CURRENCY
+from gateways.common.tenants import get_current_tenant, tenant_context, tenant_resolver
+from gateways.paystack.cache import MISSING, transaction_cache
+from gateways.paystack.enums import PaystackPaymentStatus, PaystackWebhookEventType
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.outbox import enqueue_outbox_events
+from gateways.paystack.payloads import InitializeData, VerificationData
+from gateways.paystack.readers import transaction_reader
+from gateways.paystack.rollups import RollupDeltas, apply_rollup_deltas
+from gateways.paystack.serializers import PaystackTransactionSerializer
+from gateways.paystack.singleflight import AsyncSingleFlight, SingleFlight, ashared_call, shared_call
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Statuses after which a transaction is no longer polled. Paystack reports payments the customer has not
+# completed yet as abandoned, and those can still succeed, so they keep being polled.
+SETTLED_STATUSES = {PaystackPaymentStatus.SUCCESS, PaystackPaymentStatus.FAILED}
+
+WEBHOOK_EVENT_STATUSES = {
+    PaystackWebhookEventType.CHARGE_SUCCESS: PaystackPaymentStatus.SUCCESS,
+    PaystackWebhookEventType.CHARGE_FAILED: PaystackPaymentStatus.FAILED,
+}
+
+
+def next_poll_time(attempts, now=None):
+    """
+    Returns when a transaction that has been polled ``attempts`` times is next due for polling, following
+    ``PAYSTACK_POLL_SCHEDULE``, or None once the schedule is exhausted.
+    """
+    schedule = settings.PAYSTACK_POLL_SCHEDULE
+    if attempts >= len(schedule):
+        return None
+    return (now or timezone.now()) + timedelta(seconds=schedule[attempts])
+
+
+def get_transaction_payload(reference, compiled=False):
+    """
+    Returns the serialized transaction for ``reference`` if it belongs to the current tenant, or to no tenant
+    when none is current, reading through the transaction cache.
+
+    Cache misses read from a replica unless ``reference`` is pinned to the primary: changes pin the reference
+    before they drop its cached payload (see ``invalidate_transactions``), so a miss after an invalidation reads
+    the change. A replica read during which the reference got pinned may predate the change, so it is returned
+    but not cached.
+
+    Args:
+        reference (str): The transaction reference.
+        compiled (bool): Whether to read and serialize a cache miss through ``transaction_reader`` instead of
+            ``PaystackTransactionSerializer``. Both produce the same payload.
+
+    Returns:
+        dict: The serialized transaction, or None if no transaction has this reference.
+    """
+    tenant = get_current_tenant()
+    tenant_id = tenant and tenant.id
+    payload = transaction_cache.get(reference, tenant_id)
+    if payload is None:
+        alias = read_alias(reference)
+        queryset = PaystackTransaction.objects.using(alias).filter(reference=reference, tenant_id=tenant_id)
+        if compiled:
+            row = transaction_reader.values(queryset).first()
+            with timed("serialize"):
+                payload = transaction_reader.to_representation(row) if row else MISSING
+        else:
+            transaction_obj = queryset.first()
+            with timed("serialize"):
+                payload = dict(PaystackTransactionSerializer(transaction_obj).data) if transaction_obj else MISSING
+        if alias is not None or not reads_pinned(reference):
+            transaction_cache.set(reference, payload, tenant_id)
+    return None if payload == MISSING else payload
+
+
+def filter_transactions(filters):
+    """
+    Builds the transaction queryset for the list and export endpoints, limited to the current tenant's
+    transactions when the request is made with an API key and to transactions that belong to no tenant otherwise.
+
+    Args:
+        filters (dict): Validated ``TransactionFilterSerializer`` data.
+
+    Returns:
+        QuerySet: The matching transactions, unordered.
+    """
+    lookups = {
+        "status": "status",
+        "email": "customer_email",
+        "currency": "currency",
+        "amount_min": "amount_minor__gte",
+        "amount_max": "amount_minor__lte",
+        "created_after": "created_at__gte",
+        "created_before": "created_at__lt",
+    }
+    queryset = PaystackTransaction.objects.filter(
+        **{lookup: filters[name] for name, lookup in lookups.items() if name in filters}
+    )
+    tenant = get_current_tenant()
+    if tenant is None:
+        return queryset.filter(tenant__isnull=True)
+    return queryset.filter(tenant_id=tenant.id)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_transactions_csv(queryset, fields):
+    """
+    Yields ``queryset`` as CSV lines, header first, reading rows through a server-side cursor where the
+    database supports one so memory use does not grow with the number of rows.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+
+
+def stream_transactions_ndjson(queryset, fields):
+    """
+    Yields ``queryset`` as newline-delimited JSON objects, streamed like ``stream_transactions_csv``.
+    """
+    encoder = DjangoJSONEncoder()
+    for row in queryset.values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield encoder.encode(row) + "\n"
+
+
+def invalidate_transactions(*transactions):
+    """
+    Once the current database transaction commits, pins reads of ``transactions`` to the primary database until
+    the replicas have caught up, then drops their cached payloads for the tenants that own them. Pinning first
+    means no read made after the invalidation can come from a replica that has not seen the change yet.
+    """
+    entries = [(transaction_obj.reference, transaction_obj.tenant_id) for transaction_obj in transactions]
+
+    def refresh():
+        pin_reads(*[reference for reference, _ in entries])
+        transaction_cache.invalidate(*entries)
+
+    if entries:
+        transaction.on_commit(refresh)
+
+
+def build_verification_data(res):
+    """
+    Extracts the fields the API exposes from a Paystack verify response.
+
+    Args:
+        res (dict): The JSON response from Paystack's verify endpoint.
+
+    Returns:
+        dict: The status, customer email and name, amount (in display units), amount_minor, currency and gateway
+        message.
+    """
+    return VerificationData.from_response(res).as_dict()
+
+
+def insert_new_transactions(transactions):
+    """
+    Inserts ``transactions`` in one ``INSERT ... ON CONFLICT (reference) DO NOTHING RETURNING`` statement.
+
+    ``bulk_create(ignore_conflicts=True)`` cannot report which rows were skipped, which the rollups need, so
+    the statement is written out here.
+
+    Returns:
+        list[PaystackTransaction]: The transactions that were inserted; references that already existed are
+        left out.
+    """
+    if not transactions:
+        return []
+    meta = PaystackTransaction._meta
+    qn = connection.ops.quote_name
+    fields = meta.concrete_fields
+    row = f"({', '.join(['%s'] * len(fields))})"
+    sql = (
+        f"INSERT INTO {qn(meta.db_table)} ({', '.join(qn(field.column) for field in fields)}) "
+        f"VALUES {', '.join([row] * len(transactions))} "
+        f"ON CONFLICT ({qn('reference')}) DO NOTHING RETURNING {qn('reference')}"
+    )
+    params = [
+        field.get_db_prep_save(field.pre_save(transaction_obj, add=True), connection)
+        for transaction_obj in transactions
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        inserted = {reference for (reference,) in cursor.fetchall()}
+    return [transaction_obj for transaction_obj in transactions if transaction_obj.reference in inserted]
+
+
+def transition_status(reference, old_statuses, new_status):
+    """
+    Moves the transaction for ``reference`` to ``new_status`` if its status is one of ``old_statuses``, with one
+    conditional ``UPDATE ... RETURNING`` statement. The previous status, which the rollups need, is read by a
+    ``SELECT ... FOR UPDATE`` subquery in the same statement and returned from it (PostgreSQL). Moving to a
+    settled status also takes the transaction off the polling schedule.
+
+    Returns:
+        PaystackTransaction: The transaction as it was before the change (created_at, status, currency,
+        amount_minor and tenant only), or None if no transaction with that reference had one of ``old_statuses``.
+    """
+    meta = PaystackTransaction._meta
+    qn = connection.ops.quote_name
+    table, pk = qn(meta.db_table), qn(meta.pk.column)
+    returned = [meta.get_field(name) for name in ("created_at", "currency", "amount_minor", "tenant")]
+    assignments = f"{qn('status')} = %s, {qn('updated_at')} = %s"
+    if new_status in SETTLED_STATUSES:
+        assignments += f", {qn('next_poll_at')} = NULL"
+    sql = (
+        f"UPDATE {table} SET {assignments} "
+        f"FROM (SELECT {pk}, {qn('status')} AS previous_status FROM {table} "
+        f"WHERE {qn('reference')} = %s AND {qn('status')} IN ({', '.join(['%s'] * len(old_statuses))}) FOR UPDATE) "
+        f"AS previous "
+        f"WHERE {table}.{pk} = previous.{pk} AND {table}.{qn('status')} = previous.previous_status "
+        f"RETURNING previous.previous_status, {', '.join(f'{table}.{qn(field.column)}' for field in returned)}"
+    )
+    updated_at = meta.get_field("updated_at").get_db_prep_save(timezone.now(), connection)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [new_status, updated_at, reference, *old_statuses])
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    values = {}
+    for field, value in zip(returned, row[1:]):
+        column = field.get_col(meta.db_table)
+        for converter in connection.ops.get_db_converters(column) + field.get_db_converters(connection):
+            value = converter(value, column, connection)
+        values[field.attname] = value
+    return PaystackTransaction(reference=reference, status=row[0], **values)
+
+
+def record_initialization(res, validated_data):
+    """
+    Stores a pending transaction for a payment Paystack has just initialized, in a single ``INSERT`` that
+    leaves an existing row for the same reference untouched. The transaction is scheduled for polling (see
+    ``gateways.paystack.polling``) in case the customer never returns to the callback, and belongs to the
+    current tenant, whose Paystack key later verifications use.
+
+    Args:
+        res (dict): The JSON response from Paystack's initialize endpoint.
+        validated_data (dict): The validated ``PaymentSerializer`` data the payment was initialized with.
+    """
+    initialized = InitializeData.from_response(res)
+    reference = initialized.reference
+    add_log_context(reference=reference)
+    tenant = get_current_tenant()
+    deltas = RollupDeltas()
+    with transaction.atomic():
+        inserted = insert_new_transactions(
+            [
+                PaystackTransaction(
+                    reference=reference,
+                    tenant_id=tenant and tenant.id,
+                    access_code=initialized.access_code,
+                    amount_minor=validated_data["money"].minor,
+                    customer_name=validated_data["name"],
+                    customer_email=validated_data["email"],
+                    currency=validated_data["money"].currency,
+                    status=PaystackPaymentStatus.PENDING,
+                    next_poll_at=next_poll_time(0),
+                )
+            ]
+        )
+        for transaction_obj in inserted:
+            deltas.add(transaction_obj)
+        apply_rollup_deltas(deltas)
+    invalidate_transactions(*inserted)
+
+
+def apply_verification(reference, data, deltas):
+    """
+    Applies a verification result to the stored transaction inside the caller's database transaction.
+
+    The status change is a single conditional ``UPDATE`` (see ``transition_status``): a pending transaction
+    moves to any final status, and only success may replace a failed or abandoned one, so concurrent
+    verifications and webhooks can never downgrade a successful payment. When it matches no row, a successful
+    payment for a reference that was not initialized through this service is inserted with one
+    ``INSERT ... ON CONFLICT DO NOTHING``; other results for unknown references are not stored.
+
+    Args:
+        reference (str): The Paystack transaction reference.
+        data (dict): Verification data as returned by ``build_verification_data``.
+        deltas (RollupDeltas): Collects the change for the rollups; the caller applies them.
+
+    Returns:
+        tuple[list, list]: The transactions updated and inserted, at most one in all. The caller enqueues their
+        outbox events and invalidates them.
+    """
+    new_status = data["status"]
+    if new_status not in PaystackPaymentStatus.values or new_status == PaystackPaymentStatus.PENDING:
+        return [], []
+
+    old_statuses = [PaystackPaymentStatus.PENDING]
+    if new_status == PaystackPaymentStatus.SUCCESS:
+        old_statuses += [PaystackPaymentStatus.FAILED, PaystackPaymentStatus.ABANDONED]
+    old_statuses = [status for status in old_statuses if status != new_status]
+
+    previous = transition_status(reference, old_statuses, new_status)
+    if previous is not None:
+        deltas.remove(previous)
+        previous.status = new_status
+        deltas.add(previous)
+        return [previous], []
+    if new_status != PaystackPaymentStatus.SUCCESS:
+        return [], []
+    inserted = insert_new_transactions(
+        [
+            PaystackTransaction(
+                reference=reference,
+                customer_email=data["email"] or "",
+                customer_name=data["name"] or "",
+                amount_minor=data["amount_minor"],
+                currency=data.get("currency") or DEFAULT_CURRENCY,
+                status=new_status,
+            )
+        ]
+    )
+    for transaction_obj in inserted:
+        deltas.add(transaction_obj)
+    return [], inserted
+
+
+def record_verification(reference, data):
+    """
+    Applies a verification result to the stored transaction (see ``apply_verification``). The rollups are
+    adjusted in the same database transaction, as is the outbox event announcing the change.
+
+    Args:
+        reference (str): The Paystack transaction reference.
+        data (dict): Verification data as returned by ``build_verification_data``.
+    """
+    deltas = RollupDeltas()
+    with transaction.atomic():
+        updated, inserted = apply_verification(reference, data, deltas)
+        enqueue_outbox_events(updated + inserted)
+        apply_rollup_deltas(deltas)
+    invalidate_transactions(*updated, *inserted)
+
+
+arecord_initialization = sync_to_async(record_initialization)
+arecord_verification = sync_to_async(record_verification)
+
+_verify_flight = SingleFlight()
+_averify_flight = AsyncSingleFlight()
+
+
+def verification_tenant(reference):
+    """
+    Returns the tenant whose Paystack key ``reference`` is verified with: the current tenant, or else the one
+    the transaction was initialized for. Skips the lookup while no tenant has a Paystack key of its own.
+    """
+    tenant = get_current_tenant()
+    if tenant is not None or not tenant_resolver.secret_keys():
+        return tenant
+    tenant_id = (
+        PaystackTransaction.objects.using(read_alias(reference))
+        .filter(reference=reference)
+        .values_list("tenant_id", flat=True)
+        .first()
+    )
+    return tenant_resolver.by_id(tenant_id) if tenant_id else None
+
+
+averification_tenant = sync_to_async(verification_tenant)
+
+
+def verification_key(reference):
+    """
+    Returns the key concurrent verifications of ``reference`` are coalesced under. It includes the current
+    tenant, so a tenant never receives the result of a verification made by, or with the key of, another.
+    """
+    tenant = get_current_tenant()
+    return reference if tenant is None else f"tenant:{tenant.id}:{reference}"
+
+
+def verify_transaction(gateway, reference):
+    """
+    Verifies ``reference`` with Paystack and records the result, coalescing concurrent calls.
+
+    Concurrent callers in this process share one call, and callers in other workers wait on a short-lived
+    cache lock, so N simultaneous verifications of one reference by the same tenant (see ``verification_key``)
+    make one upstream request and one write. The call is made with the Paystack key of the transaction's tenant
+    (see ``verification_tenant``).
+
+    Returns:
+        dict: Verification data as returned by ``build_verification_data``.
+
+    Raises:
+        PaymentErrorException: If the verification request fails.
+    """
+
+    def verify():
+        with tenant_context(verification_tenant(reference)):
+            data = build_verification_data(gateway.verify_payment(reference))
+        record_verification(reference, data)
+        return data
+
+    key = verification_key(reference)
+    return _verify_flight.do(key, lambda: shared_call(f"verify:{key}", verify))
+
+
+async def averify_transaction(gateway, reference):
+    """
+    asyncio counterpart of ``verify_transaction`` for ``AsyncPaystackPaymentGateway``.
+    """
+
+    async def verify():
+        with tenant_context(await averification_tenant(reference)):
+            data = build_verification_data(await gateway.verify_payment(reference))
+        await arecord_verification(reference, data)
+        return data
+
+    key = verification_key(reference)
+    return await _averify_flight.do(key, lambda: ashared_call(f"verify:{key}", verify))
+
+
+def apply_webhook_events(events):
+    """
+    Applies a batch of ``charge.success``/``charge.failed`` webhook events to ``PaystackTransaction``.
+
+    Existing rows are updated with one ``bulk_update`` and new references inserted with one ``INSERT``.
+    When a batch holds several events for the same reference the latest one wins, except that a success is
+    never replaced by a later failure, whether the success is already stored or earlier in the batch. A new
+    reference that a concurrent batch inserted first is updated afterwards under the same rules, so neither
+    batch's event is lost.
+
+    An event is only applied to a transaction of the tenant whose Paystack key signed it, or to one that
+    belongs to no tenant when it was signed with ``PAYSTACK_SECRET_KEY``; other events are logged and dropped.
+    New references are stored for the event's tenant.
+
+    Args:
+        events (list[PaystackWebhookEvent]): Claimed webhook events, oldest first.
+
+    Returns:
+        int: The number of transactions written.
+    """
+    fields = ["status", "customer_email", "customer_name", "amount_minor", "currency", "next_poll_at"]
+    now = timezone.now()
+    deltas = RollupDeltas()
+    with transaction.atomic():
+        existing = PaystackTransaction.objects.select_for_update().in_bulk(
+            list({event.reference for event in events}), field_name="reference"
+        )
+        owners = {reference: transaction_obj.tenant_id for reference, transaction_obj in existing.items()}
+        changes = {}
+        for event in events:
+            owner = owners.setdefault(event.reference, event.tenant_id)
+            if str(owner) != str(event.tenant_id):
+                logger.warning(f"Ignoring webhook event for {event.reference}: not signed with its tenant's key")
+                continue
+            new_status = WEBHOOK_EVENT_STATUSES[event.event]
+            previous = changes.get(event.reference)
+            if previous and previous["status"] == PaystackPaymentStatus.SUCCESS and new_status != previous["status"]:
+                continue
+            data = event.payload.get("data") or {}
+            changes[event.reference] = {
+                "status": new_status,
+                "customer_email": (data.get("customer") or {}).get("email") or "",
+                "customer_name": (data.get("metadata") or {}).get("name") or "",
+                "amount_minor": int(data.get("amount") or 0),
+                "currency": data.get("currency") or DEFAULT_CURRENCY,
+                "next_poll_at": None,
+            }
+
+        to_update = []
+
+        def update(rows):
+            updated = []
+            for transaction_obj in rows:
+                change = changes.pop(transaction_obj.reference, None)
+                if change is None or transaction_obj.status == PaystackPaymentStatus.SUCCESS:
+                    continue
+                if str(transaction_obj.tenant_id) != str(owners[transaction_obj.reference]):
+                    logger.warning(
+                        f"Ignoring webhook event for {transaction_obj.reference}: not signed with its tenant's key"
+                    )
+                    continue
+                deltas.remove(transaction_obj)
+                for field in fields:
+                    setattr(transaction_obj, field, change[field])
+                transaction_obj.updated_at = now
+                deltas.add(transaction_obj)
+                updated.append(transaction_obj)
+            PaystackTransaction.objects.bulk_update(updated, fields + ["updated_at"])
+            to_update.extend(updated)
+
+        update(existing.values())
+        inserted = insert_new_transactions(
+            [
+                PaystackTransaction(reference=reference, tenant_id=owners[reference], **change)
+                for reference, change in changes.items()
+            ]
+        )
+        for transaction_obj in inserted:
+            changes.pop(transaction_obj.reference)
+            deltas.add(transaction_obj)
+        if changes:
+            # A concurrent batch inserted these references after they were looked up; its insert has committed,
+            # since ON CONFLICT waits for it, so the rows can be locked and updated like the existing ones.
+            update(PaystackTransaction.objects.select_for_update().filter(reference__in=list(changes)))
+        apply_rollup_deltas(deltas)
+        enqueue_outbox_events(to_update + inserted)
+        invalidate_transactions(*to_update, *inserted)
+    return len(to_update) + len(inserted)
+
+
+def process_webhook_batch(queue, batch_size):
+    """
+    Claims up to ``batch_size`` events from ``queue``, applies them and acknowledges the outcome.
+
+    If the batch fails as a whole, events are retried individually so one bad payload does not hold
+    back the rest of the batch.
+
+    Returns:
+        int: The number of events claimed; zero means the queue was empty.
+    """
+    events = queue.claim(batch_size)
+    if not events:
+        return 0
+    try:
+        apply_webhook_events(events)
+    except Exception as e:
+        logger.error(f"Error processing webhook batch, retrying events one by one: {e}")
+        for event in events:
+            try:
+                apply_webhook_events([event])
+            except Exception as event_error:
+                logger.error(f"Error processing webhook event {event.reference}: {event_error}")
+                queue.fail([event], event_error)
+            else:
+                queue.ack([event])
+    else:
+        queue.ack(events)
+    return len(events)
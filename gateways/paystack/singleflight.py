@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key within a process.
+
+    The first caller for a key runs the function; callers that arrive while it is running wait for it and
+    receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of ``SingleFlight``: concurrent awaiters of the same key share one task.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key, fn):
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+
+def _keys(key):
+    return f"paystack:singleflight:{key}:result", f"paystack:singleflight:{key}:lock"
+
+
+def shared_call(key, fn):
+    """
+    Runs ``fn`` at most once across all workers sharing the ``PAYSTACK_CACHE_ALIAS`` cache.
+
+    The caller that wins ``cache.add`` on the lock key runs ``fn`` and publishes its result for
+    ``PAYSTACK_SINGLEFLIGHT_RESULT_TTL`` seconds; other callers poll for that result. Failures are not
+    published, so a waiter takes over the lock once the failed leader releases it. If no result shows up
+    within ``PAYSTACK_SINGLEFLIGHT_LOCK_TTL`` seconds the caller runs ``fn`` itself.
+    """
+    cache = caches[settings.PAYSTACK_CACHE_ALIAS]
+    result_key, lock_key = _keys(key)
+    deadline = time.monotonic() + settings.PAYSTACK_SINGLEFLIGHT_LOCK_TTL
+    while True:
+        result = cache.get(result_key)
+        if result is not None:
+            return result
+        if cache.add(lock_key, 1, settings.PAYSTACK_SINGLEFLIGHT_LOCK_TTL):
+            try:
+                result = fn()
+                cache.set(result_key, result, settings.PAYSTACK_SINGLEFLIGHT_RESULT_TTL)
+                return result
+            finally:
+                cache.delete(lock_key)
+        if time.monotonic() >= deadline:
+            return fn()
+        time.sleep(settings.PAYSTACK_SINGLEFLIGHT_POLL_INTERVAL)
+
+
+async def ashared_call(key, fn):
+    """
+    asyncio counterpart of ``shared_call``; ``fn`` returns an awaitable.
+    """
+    cache = caches[settings.PAYSTACK_CACHE_ALIAS]
+    result_key, lock_key = _keys(key)
+    deadline = time.monotonic() + settings.PAYSTACK_SINGLEFLIGHT_LOCK_TTL
+    while True:
+        result = await cache.aget(result_key)
+        if result is not None:
+            return result
+        if await cache.aadd(lock_key, 1, settings.PAYSTACK_SINGLEFLIGHT_LOCK_TTL):
+            try:
+                result = await fn()
+                await cache.aset(result_key, result, settings.PAYSTACK_SINGLEFLIGHT_RESULT_TTL)
+                return result
+            finally:
+                await cache.adelete(lock_key)
+        if time.monotonic() >= deadline:
+            return await fn()
+        await asyncio.sleep(settings.PAYSTACK_SINGLEFLIGHT_POLL_INTERVAL)
@@ -1,10 +1,26 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from gateways.paystack.views import PaystackPaymentVerificationViewSet, PaystackPaymentViewSet
+from gateways.paystack.async_views import AsyncPaystackPaymentVerificationView, AsyncPaystackPaymentView
+from gateways.paystack.views import (
+    PaystackPaymentVerificationViewSet,
+    PaystackPaymentViewSet,
+    PaystackRollupViewSet,
+    PaystackWebhookViewSet,
+)
 
 router = DefaultRouter()
 router.register(r"payment", PaystackPaymentViewSet, basename="paystack-payment")
 router.register(r"callback", PaystackPaymentVerificationViewSet, basename="paystack-verification")
+router.register(r"webhook", PaystackWebhookViewSet, basename="paystack-webhook")
+router.register(r"rollups", PaystackRollupViewSet, basename="paystack-rollups")
 
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("async/payment/", AsyncPaystackPaymentView.as_view(), name="paystack-async-payment"),
+    path(
+        "async/callback/<str:reference>/",
+        AsyncPaystackPaymentVerificationView.as_view(),
+        name="paystack-async-verification",
+    ),
+]
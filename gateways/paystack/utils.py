@@ -1,28 +1,199 @@
+import asyncio
+import hashlib
+import hmac
 import logging
+import os
+import threading
+import time
+import weakref
 
+import httpx
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
 
-from gateways.paystack.exceptions import PaymentErrorException
+from core.fastjson import response_json
+from core.metrics import add_timing
+from gateways.common.gateways import BasePaymentGateway
+from gateways.common.tenants import get_current_tenant, tenant_resolver
+from gateways.paystack.exceptions import PaymentErrorException, PaymentServiceUnavailableException
+from gateways.paystack.metrics import error_type, upstream_errors, upstream_in_flight, upstream_latency
+from gateways.paystack.ratelimit import rate_limiter
+from gateways.paystack.resilience import (
+    Bulkhead,
+    CircuitBreaker,
+    backoff_delay,
+    is_failure,
+    is_retryable,
+    upstream_status,
+)
+from gateways.paystack.services import record_initialization, verify_transaction
 
 logger = logging.getLogger(__name__)
 
+# Returned by ``verify_webhook_signature`` for webhooks signed with ``PAYSTACK_SECRET_KEY``.
+GLOBAL_KEY = object()
 
-class PaystackPaymentGateway:
+_session = None
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+_bulkhead = None
+
+
+def _build_session():
+    """
+    Builds a requests session with a keep-alive connection pool sized from settings.
+
+    Returns:
+        requests.Session: A session whose adapters reuse TCP/TLS connections to Paystack.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.PAYSTACK_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.PAYSTACK_HTTP_POOL_MAXSIZE,
+        pool_block=settings.PAYSTACK_HTTP_POOL_BLOCK,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Returns the process-wide pooled session used for Paystack API requests, creating it on first use.
+
+    Returns:
+        requests.Session: The shared session for the current process.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def get_async_client():
+    """
+    Returns the pooled async HTTP client for the running event loop, creating it on first use.
+
+    httpx connection pools are bound to the loop they were opened on, so one client is kept per loop.
+
+    Returns:
+        httpx.AsyncClient: The shared async client for the current event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.PAYSTACK_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PAYSTACK_HTTP_POOL_MAXSIZE,
+            ),
+            timeout=httpx.Timeout(settings.PAYSTACK_READ_TIMEOUT, connect=settings.PAYSTACK_CONNECT_TIMEOUT),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def get_bulkhead():
+    """
+    Returns the process-wide cap on Paystack calls in flight, sized by ``PAYSTACK_MAX_IN_FLIGHT``.
+    """
+    global _bulkhead
+    if _bulkhead is None or _bulkhead.limit != settings.PAYSTACK_MAX_IN_FLIGHT:
+        with _session_lock:
+            if _bulkhead is None or _bulkhead.limit != settings.PAYSTACK_MAX_IN_FLIGHT:
+                _bulkhead = Bulkhead(settings.PAYSTACK_MAX_IN_FLIGHT)
+    return _bulkhead
+
+
+def reset_session():
+    """
+    Drops the process-wide session and async clients so the next request builds a fresh pool.
+
+    Registered as an after-fork hook so gunicorn workers never share sockets inherited from the master process.
+    """
+    global _session, _session_lock
+    _session = None
+    _session_lock = threading.Lock()
+    _async_clients.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_session)
+
+
+def verify_webhook_signature(payload, signature):
+    """
+    Checks the ``x-paystack-signature`` header of a webhook request and returns whose key signed it.
+
+    Args:
+        payload (bytes): The raw request body.
+        signature (str): The hex HMAC-SHA512 digest sent by Paystack.
+
+    Returns:
+        ``GLOBAL_KEY`` if the signature matches the body signed with ``PAYSTACK_SECRET_KEY``, the ``TenantInfo``
+        of the tenant whose Paystack secret key it matches, or None if it matches neither.
+    """
+    if not signature:
+        return None
+    signers = [(settings.PAYSTACK_SECRET_KEY, GLOBAL_KEY), *tenant_resolver.secret_keys().items()]
+    for secret_key, signer in signers:
+        expected = hmac.new(secret_key.encode(), payload, hashlib.sha512).hexdigest()
+        if hmac.compare_digest(expected, signature):
+            return signer if signer is GLOBAL_KEY else tenant_resolver.by_id(signer)
+    return None
+
+
+class PaystackPaymentGateway(BasePaymentGateway):
     """
     A service class to handle Paystack payment operations such as initializing and verifying payments.
+
+    Requests go through the process-wide pooled session from ``get_session`` unless a session is passed in,
+    so a single instance can be shared across requests and threads. Every call is guarded by a circuit breaker
+    shared by all workers and by a per-process cap on calls in flight; idempotent verify calls are retried with
+    jittered exponential backoff on timeouts, 5xx and 429 responses. Calls also draw from the client-side rate
+    limit budget for their endpoint; ``rate_limit_mode`` picks whether to wait, queue or fail when it runs out.
     """
 
+    name = "paystack"
+    currencies = {"NGN", "GHS", "ZAR", "KES", "USD"}
+    circuit_breaker = CircuitBreaker("paystack")
+    rate_limiter = rate_limiter
+
+    def __init__(self, session=None, timeout=None, rate_limit_mode=None):
+        self._session = session
+        self._timeout = timeout
+        self.rate_limit_mode = rate_limit_mode
+
+    @property
+    def session(self):
+        return self._session or get_session()
+
+    @property
+    def timeout(self):
+        return self._timeout or (settings.PAYSTACK_CONNECT_TIMEOUT, settings.PAYSTACK_READ_TIMEOUT)
+
+    def url(self, path):
+        """
+        Builds an absolute Paystack API URL for the given path.
+        """
+        return f"{settings.PAYSTACK_BASE_URL.rstrip('/')}/{path.lstrip('/')}"
+
     def headers(self):
         """
-        Constructs the headers required for Paystack API requests.
+        Constructs the headers required for Paystack API requests, authorized with the current tenant's Paystack
+        secret key or, without one, ``PAYSTACK_SECRET_KEY``.
 
         Returns:
             dict: A dictionary containing the authorization and content-type headers.
                   Returns None if an error occurs during header construction.
         """
         try:
-            access_token = settings.PAYSTACK_SECRET_KEY
+            tenant = get_current_tenant()
+            access_token = (tenant and tenant.paystack_secret_key) or settings.PAYSTACK_SECRET_KEY
             header = {
                 "Authorization": f"Bearer {access_token}",
                 "Content-Type": "application/json",
@@ -32,12 +203,98 @@ class PaystackPaymentGateway:
             logger.error(f"Error getting header: {e}")
             return None
 
-    def initialize_payment(self, amount, email, metadata=None):
+    def initialize_payload(self, money, email, metadata=None):
+        """
+        Builds the request body for Paystack's initialize endpoint, which takes the amount in the currency's
+        subunit (kobo, pesewas, cents).
+        """
+        return {"amount": money.minor, "currency": money.currency, "email": email, "metadata": metadata}
+
+    def unavailable_for(self):
+        return self.circuit_breaker.remaining()
+
+    def record_initialization(self, res, validated_data):
+        record_initialization(res, validated_data)
+
+    def verify_transaction(self, reference):
+        return verify_transaction(self, reference)
+
+    def unavailable(self, retry_after=None):
+        if retry_after is None:
+            return PaymentServiceUnavailableException("Too many Paystack requests in flight, try again shortly")
+        return PaymentServiceUnavailableException(
+            "Paystack is currently unavailable, try again shortly", retry_after=retry_after
+        )
+
+    def request(self, method, path, budget, retries=0, **kwargs):
+        """
+        Sends a request to Paystack through the rate limiter and circuit breaker and returns the decoded JSON body.
+
+        Args:
+            method (str): ``"get"`` or ``"post"``.
+            path (str): The API path, relative to ``PAYSTACK_BASE_URL``.
+            budget (str): The rate limit budget the call draws from, see ``PAYSTACK_RATE_LIMITS``.
+            retries (int): How many times to retry transient failures. Only pass this for idempotent calls.
+
+        Raises:
+            PaymentServiceUnavailableException: If the circuit is open, too many calls are in flight or the rate
+                limit is exhausted.
+            Exception: Whatever the HTTP client raised for the final attempt.
+        """
+        bulkhead = get_bulkhead()
+        try:
+            if not bulkhead.acquire():
+                raise self.unavailable()
+            try:
+                for attempt in range(retries + 1):
+                    self.rate_limiter.acquire(budget, self.rate_limit_mode)
+                    if not self.circuit_breaker.allow():
+                        raise self.unavailable(self.circuit_breaker.remaining())
+                    started = time.perf_counter()
+                    try:
+                        with upstream_in_flight.track_inprogress(endpoint=budget):
+                            response = getattr(self.session, method)(
+                                self.url(path), headers=self.headers(), timeout=self.timeout, **kwargs
+                            )
+                            response.raise_for_status()
+                    except Exception as e:
+                        self.observe(budget, started, error=e)
+                        if is_failure(e):
+                            self.circuit_breaker.record_failure()
+                        else:
+                            self.circuit_breaker.release_probe()
+                        if attempt == retries or not is_retryable(e):
+                            raise
+                        time.sleep(backoff_delay(attempt, PaymentErrorException.from_error(e).retry_after))
+                    else:
+                        self.observe(budget, started, response=response)
+                        self.circuit_breaker.record_success()
+                        return response_json(response)
+            finally:
+                bulkhead.release()
+        except PaymentServiceUnavailableException as e:
+            upstream_errors.inc(endpoint=budget, type=error_type(e))
+            raise
+
+    def observe(self, budget, started, response=None, error=None):
+        """
+        Records latency, status and error type of one Paystack call.
+        """
+        elapsed = time.perf_counter() - started
+        status_code = response.status_code if response is not None else upstream_status(error) or "error"
+        upstream_latency.observe(elapsed, endpoint=budget, status=status_code)
+        add_timing("upstream_seconds", elapsed)
+        if error is not None:
+            upstream_errors.inc(endpoint=budget, type=error_type(error))
+
+    def initialize_payment(self, money, email, metadata=None):
         """
         Initiates a payment transaction using Paystack.
 
+        Initialization is not idempotent upstream, so it is never retried.
+
         Args:
-            amount (float or int): The amount to be charged (in base currency).
+            money (Money): The amount to be charged, in minor units, and its currency.
             email (str): The customer's email address.
             metadata (dict, optional): Additional metadata to attach to the transaction.
 
@@ -48,14 +305,17 @@ class PaystackPaymentGateway:
             PaymentErrorException: If the API request fails or returns an error.
         """
         try:
-            data = {"amount": float(amount) * 100, "email": email, "metadata": metadata}
-            payment_url = "https://api.paystack.co/transaction/initialize"
-            response = requests.post(payment_url, headers=self.headers(), json=data)
-            response.raise_for_status()
-            return response.json()
+            return self.request(
+                "post",
+                "transaction/initialize",
+                "initialize",
+                json=self.initialize_payload(money, email, metadata),
+            )
+        except PaymentErrorException:
+            raise
         except Exception as e:
             logger.error(f"Error making payment: {e}")
-            raise PaymentErrorException(str(e))
+            raise PaymentErrorException.from_error(e)
 
     def verify_payment(self, reference):
         """
@@ -71,10 +331,119 @@ class PaystackPaymentGateway:
             PaymentErrorException: If the verification request fails or returns an error.
         """
         try:
-            verification_url = "https://api.paystack.co/transaction/verify"
-            response = requests.get(f"{verification_url}/{reference}", headers=self.headers())
-            response.raise_for_status()
-            return response.json()
+            return self.request(
+                "get", f"transaction/verify/{reference}", "verify", retries=settings.PAYSTACK_RETRY_ATTEMPTS
+            )
+        except PaymentErrorException:
+            raise
+        except Exception as e:
+            logger.error(f"Error verifying payment: {e}")
+            raise PaymentErrorException.from_error(e)
+
+
+class AsyncPaystackPaymentGateway(PaystackPaymentGateway):
+    """
+    An asyncio variant of ``PaystackPaymentGateway`` backed by a pooled ``httpx.AsyncClient``.
+
+    Calls suspend the event loop instead of blocking a worker, so a single ASGI process can keep many
+    Paystack requests in flight at once.
+    """
+
+    @property
+    def client(self):
+        return self._session or get_async_client()
+
+    @property
+    def async_timeout(self):
+        connect, read = self.timeout
+        return httpx.Timeout(read, connect=connect)
+
+    async def request(self, method, path, budget, retries=0, **kwargs):
+        """
+        asyncio counterpart of ``PaystackPaymentGateway.request``.
+        """
+        bulkhead = get_bulkhead()
+        try:
+            if not bulkhead.acquire():
+                raise self.unavailable()
+            try:
+                for attempt in range(retries + 1):
+                    await self.rate_limiter.aacquire(budget, self.rate_limit_mode)
+                    if not await self.circuit_breaker.aallow():
+                        raise self.unavailable(await self.circuit_breaker.aremaining())
+                    started = time.perf_counter()
+                    try:
+                        with upstream_in_flight.track_inprogress(endpoint=budget):
+                            response = await getattr(self.client, method)(
+                                self.url(path), headers=self.headers(), timeout=self.async_timeout, **kwargs
+                            )
+                            response.raise_for_status()
+                    except Exception as e:
+                        self.observe(budget, started, error=e)
+                        if is_failure(e):
+                            await self.circuit_breaker.arecord_failure()
+                        else:
+                            await self.circuit_breaker.arelease_probe()
+                        if attempt == retries or not is_retryable(e):
+                            raise
+                        await asyncio.sleep(backoff_delay(attempt, PaymentErrorException.from_error(e).retry_after))
+                    else:
+                        self.observe(budget, started, response=response)
+                        await self.circuit_breaker.arecord_success()
+                        return response_json(response)
+            finally:
+                bulkhead.release()
+        except PaymentServiceUnavailableException as e:
+            upstream_errors.inc(endpoint=budget, type=error_type(e))
+            raise
+
+    async def initialize_payment(self, money, email, metadata=None):
+        """
+        Initiates a payment transaction using Paystack.
+
+        Args:
+            money (Money): The amount to be charged, in minor units, and its currency.
+            email (str): The customer's email address.
+            metadata (dict, optional): Additional metadata to attach to the transaction.
+
+        Returns:
+            dict: The JSON response from Paystack containing transaction details.
+
+        Raises:
+            PaymentErrorException: If the API request fails or returns an error.
+        """
+        try:
+            return await self.request(
+                "post",
+                "transaction/initialize",
+                "initialize",
+                json=self.initialize_payload(money, email, metadata),
+            )
+        except PaymentErrorException:
+            raise
+        except Exception as e:
+            logger.error(f"Error making payment: {e}")
+            raise PaymentErrorException.from_error(e)
+
+    async def verify_payment(self, reference):
+        """
+        Verifies the status of a Paystack transaction using its reference.
+
+        Args:
+            reference (str): The unique transaction reference to verify.
+
+        Returns:
+            dict: The JSON response from Paystack containing the verification result.
+
+        Raises:
+            PaymentErrorException: If the verification request fails or returns an error.
+        """
+        try:
+            return await self.request(
+                "get", f"transaction/verify/{reference}", "verify", retries=settings.PAYSTACK_RETRY_ATTEMPTS
+            )
+        except PaymentErrorException:
+            raise
         except Exception as e:
             logger.error(f"Error verifying payment: {e}")
-            raise PaymentErrorException(str(e))
+            raise PaymentErrorException.from_error(e)
@@ -1,55 +1,392 @@
+import contextvars
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.http import StreamingHttpResponse
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import decorators, response, status, viewsets
+from rest_framework import decorators, permissions, response, serializers, status, viewsets
+
+from core.log_context import add_log_context, bind_log_context
+from core.metrics import timed
+from gateways.common.permissions import IsNotTenant, IsTenantOrStaff
+from gateways.common.tenants import get_current_tenant
+from gateways.paystack.enums import PaystackWebhookEventType
+from gateways.paystack.exceptions import PaymentErrorException, PaymentServiceUnavailableException
+from gateways.paystack.idempotency import IdempotencyConflict, idempotency_store, request_fingerprint, scoped_key
+from gateways.paystack.models import TransactionRollup
+from gateways.paystack.pagination import InvalidCursor, keyset_page
+from gateways.paystack.queues import get_webhook_queue
+from gateways.paystack.readers import transaction_reader, use_compiled_serializer
+from gateways.paystack.serializers import (
+    PaymentSerializer,
+    PaystackTransactionSerializer,
+    RollupFilterSerializer,
+    RollupTotalSerializer,
+    TransactionFilterSerializer,
+    TransactionRollupSerializer,
+)
+from gateways.paystack.services import (
+    filter_transactions,
+    get_transaction_payload,
+    record_initialization,
+    stream_transactions_csv,
+    stream_transactions_ndjson,
+    verify_transaction,
+)
+from gateways.paystack.utils import GLOBAL_KEY, PaystackPaymentGateway, verify_webhook_signature
+
+logger = logging.getLogger(__name__)
 
-from gateways.paystack.exceptions import PaymentErrorException
-from gateways.paystack.models import PaystackTransaction
-from gateways.paystack.serializers import PaymentSerializer, PaystackTransactionSerializer
-from gateways.paystack.utils import PaystackPaymentGateway
+EXPORT_FIELDS = [
+    "id",
+    "reference",
+    "status",
+    "amount_minor",
+    "currency",
+    "customer_name",
+    "customer_email",
+    "created_at",
+    "updated_at",
+]
+EXPORT_FORMATS = {
+    "csv": (stream_transactions_csv, "text/csv"),
+    "ndjson": (stream_transactions_ndjson, "application/x-ndjson"),
+}
+
+
+def service_unavailable(error):
+    """
+    Builds the 503 (or 429 when rate limited) response returned while Paystack calls are being shed.
+    """
+    headers = {"Retry-After": str(math.ceil(error.retry_after))} if error.retry_after else None
+    return response.Response({"error": str(error)}, status=error.status_code, headers=headers)
 
 
 class PaystackPaymentViewSet(viewsets.ViewSet):
     lookup_field = "reference"
+    payment_gateway = PaystackPaymentGateway()
+    # Listing and exporting stream customer details in bulk, so they need an API key or a staff account.
+    bulk_read_actions = ("list", "export")
+
+    def get_permissions(self):
+        if self.action in self.bulk_read_actions:
+            return [IsTenantOrStaff()]
+        return super().get_permissions()
 
     @swagger_auto_schema(
         request_body=PaymentSerializer,
         responses={
             200: PaymentSerializer,
             400: "Bad Request",
+            503: "Service Unavailable",
         },
     )
     def create(self, request):
         """
         Handling Paystack payment operations.
 
-        This endpoint allows you to create a payment by providing the customer's name, email, and the amount.
+        This endpoint allows you to create a payment by providing the customer's name, email, and the amount,
+        and optionally its `currency` (NGN by default).
+        Send an `Idempotency-Key` header to make retries safe: a repeated request with the same key and body
+        returns the original response without contacting Paystack again.
         """
-        serializer = PaymentSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        with timed("serialize"):
+            serializer = PaymentSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if not idempotency_key:
+            try:
+                status_code, data = self.initialize_payment(serializer.validated_data)
+            except PaymentServiceUnavailableException as e:
+                return service_unavailable(e)
+            return response.Response(data, status=status_code)
 
-        payment_gateway = PaystackPaymentGateway()
+        if len(idempotency_key) > 255:
+            return response.Response(
+                {"error": "Idempotency-Key must be at most 255 characters"}, status=status.HTTP_400_BAD_REQUEST
+            )
         try:
-            res = payment_gateway.initialize_payment(
-                amount=serializer.validated_data["amount"],
-                email=serializer.validated_data["email"],
-                metadata={"name": serializer.validated_data["name"]},
+            status_code, data, replayed = idempotency_store.run(
+                scoped_key(idempotency_key, get_current_tenant()),
+                request_fingerprint(serializer.validated_data),
+                lambda: self.initialize_payment(serializer.validated_data),
             )
+        except IdempotencyConflict as e:
+            return response.Response({"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except PaymentServiceUnavailableException as e:
+            return service_unavailable(e)
+        headers = {"Idempotent-Replayed": "true"} if replayed else None
+        return response.Response(data, status=status_code, headers=headers)
+
+    def initialize_payment(self, validated_data):
+        """
+        Initializes the payment with Paystack and stores it.
 
-            return response.Response(res, status=status.HTTP_200_OK)
+        Returns:
+            tuple: The HTTP status code and response data for the client.
+
+        Raises:
+            PaymentServiceUnavailableException: If Paystack calls are currently being shed.
+        """
+        status_code, data = self.request_payment(validated_data)
+        if status_code == status.HTTP_200_OK:
+            self.store_payment(data, validated_data)
+        return status_code, data
+
+    def request_payment(self, validated_data):
+        """
+        Initializes the payment with Paystack without storing it.
+
+        Returns:
+            tuple: The HTTP status code and response data for the client.
+
+        Raises:
+            PaymentServiceUnavailableException: If Paystack calls are currently being shed.
+        """
+        try:
+            res = self.payment_gateway.initialize_payment(
+                money=validated_data["money"],
+                email=validated_data["email"],
+                metadata={"name": validated_data["name"]},
+            )
+        except PaymentServiceUnavailableException:
+            raise
         except PaymentErrorException as e:
+            return status.HTTP_400_BAD_REQUEST, {"error": str(e)}
+        return status.HTTP_200_OK, res
+
+    def store_payment(self, res, validated_data):
+        try:
+            record_initialization(res, validated_data)
+        except (KeyError, DatabaseError) as e:
+            logger.error(f"Error storing initialized payment: {e}")
+
+    @swagger_auto_schema(
+        request_body=PaymentSerializer(many=True),
+        responses={
+            200: "NDJSON stream, one line per payment",
+            400: "Bad Request",
+        },
+    )
+    @decorators.action(detail=False, methods=["post"])
+    def batch(self, request):
+        """
+        Handling batch Paystack payment initialization.
+
+        Accepts a list of payments (name, email, amount) and initializes them concurrently. Results are streamed
+        back as newline-delimited JSON as each payment finishes, one line per item with its `index` in the
+        request, an HTTP-style `status` and either `data` or `error`. A failed item does not fail the batch.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return response.Response(
+                {"error": "Expected a non-empty list of payments"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.PAYSTACK_BATCH_MAX_SIZE:
+            return response.Response(
+                {"error": f"A batch can contain at most {settings.PAYSTACK_BATCH_MAX_SIZE} payments"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        valid, invalid = [], []
+        with timed("serialize"):
+            serializer = PaymentSerializer()
+            for index, item in enumerate(items):
+                try:
+                    valid.append((index, serializer.run_validation(item)))
+                except serializers.ValidationError as e:
+                    invalid.append({"index": index, "status": status.HTTP_400_BAD_REQUEST, "error": e.detail})
+
+        return StreamingHttpResponse(
+            self.stream_batch(valid, invalid, contextvars.copy_context()), content_type="application/x-ndjson"
+        )
+
+    def stream_batch(self, valid, invalid, context):
+        """
+        Yields one NDJSON line per payment: validation failures first, then initialization results in
+        completion order, with at most ``PAYSTACK_BATCH_CONCURRENCY`` Paystack calls in flight.
+
+        The stream is consumed after the request has left the middleware, so everything for a payment runs in a
+        copy of the request's ``context`` (its tenant and log context). Workers only call Paystack and close
+        their database connection when done; each initialized payment is stored from the streaming thread as
+        its result comes in, so the batch never writes from several connections at once. If the client
+        disconnects, payments not yet started are cancelled and the stream waits for the ones in flight and
+        stores them, so no call outlives the response and none initialized at Paystack goes unrecorded.
+        """
+        for result in invalid:
+            yield json.dumps(result) + "\n"
+        if not valid:
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(settings.PAYSTACK_BATCH_CONCURRENCY, len(valid)), thread_name_prefix="paystack-batch"
+        )
+        futures = {
+            executor.submit(self.batch_worker, context.copy(), index, validated_data): (index, validated_data)
+            for index, validated_data in valid
+        }
+        streamed = set()
+        try:
+            for future in as_completed(futures):
+                streamed.add(future)
+                yield json.dumps(context.copy().run(self.batch_result, *futures[future], future)) + "\n"
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, item in futures.items():
+                if future not in streamed and not future.cancelled():
+                    context.copy().run(self.batch_result, *item, future)
+
+    def batch_worker(self, context, index, validated_data):
+        def call():
+            with bind_log_context(batch_index=index):
+                return self.request_payment(validated_data)
+
+        try:
+            return context.run(call)
+        finally:
+            connection.close()
+
+    def batch_result(self, index, validated_data, future):
+        with bind_log_context(batch_index=index):
+            try:
+                status_code, data = future.result()
+            except PaymentServiceUnavailableException as e:
+                return {"index": index, "status": e.status_code, "error": str(e), "retry_after": e.retry_after}
+            except Exception:
+                logger.exception("Batch payment initialization failed", extra={"index": index})
+                return {"index": index, "status": status.HTTP_500_INTERNAL_SERVER_ERROR, "error": "Internal error"}
+            if status_code >= 400:
+                return {"index": index, "status": status_code, "error": data["error"]}
+            self.store_payment(data, validated_data)
+            return {"index": index, "status": status_code, "data": data}
+
+    @swagger_auto_schema(
+        query_serializer=TransactionFilterSerializer,
+        responses={
+            200: PaystackTransactionSerializer(many=True),
+            400: "Bad Request",
+        },
+    )
+    def list(self, request):
+        """
+        Handling Paystack transaction listing.
+
+        Lists transactions newest first, optionally filtered by status, email, amount range and creation date
+        range. Each page returns a `next_cursor`; pass it back as `cursor` to fetch the following page. Requires
+        an API key or a staff account.
+        """
+        filters = TransactionFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        compiled = use_compiled_serializer("list")
+        queryset = filter_transactions(filters.validated_data)
+        if compiled:
+            queryset = transaction_reader.values(queryset)
+        try:
+            rows, next_cursor = keyset_page(
+                queryset,
+                filters.validated_data.get("cursor"),
+                filters.validated_data["page_size"],
+            )
+        except InvalidCursor as e:
             return response.Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        with timed("serialize"):
+            if compiled:
+                results = transaction_reader.many(rows)
+            else:
+                results = PaystackTransactionSerializer(rows, many=True).data
+        return response.Response({"results": results, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        query_serializer=TransactionFilterSerializer,
+        responses={
+            200: "CSV or NDJSON stream of transactions",
+            400: "Bad Request",
+        },
+    )
+    @decorators.action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Handling Paystack transaction export.
+
+        Streams every transaction matching the listing filters, oldest first, as CSV (`output=csv`, the
+        default) or newline-delimited JSON (`output=ndjson`). Requires an API key or a staff account.
+        """
+        output = request.query_params.get("output", "csv")
+        if output not in EXPORT_FORMATS:
+            return response.Response(
+                {"error": f"output must be one of {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        filters = TransactionFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+
+        queryset = filter_transactions(filters.validated_data).order_by("created_at", "id")
+        stream, content_type = EXPORT_FORMATS[output]
+        return StreamingHttpResponse(
+            stream(queryset, EXPORT_FIELDS),
+            content_type=content_type,
+            headers={"Content-Disposition": f'attachment; filename="transactions.{output}"'},
+        )
 
     def retrieve(self, request, reference=None):
         """
         Handling Paystack transaction retrieval.
 
-        Retrieve a specific Paystack transaction by its reference.
+        Retrieve a specific Paystack transaction by its reference. Requests made with an API key only find the
+        tenant's transactions, and requests without one only transactions that belong to no tenant.
         """
-        try:
-            transaction = PaystackTransaction.objects.get(reference=reference)
-            serializer = PaystackTransactionSerializer(transaction)
-            return response.Response(serializer.data, status=status.HTTP_200_OK)
-        except PaystackTransaction.DoesNotExist:
+        payload = get_transaction_payload(reference, compiled=use_compiled_serializer("retrieve"))
+        if payload is None:
             return response.Response({"error": "Transaction not found"}, status=status.HTTP_404_NOT_FOUND)
+        return response.Response(payload, status=status.HTTP_200_OK)
+
+
+class PaystackRollupViewSet(viewsets.ViewSet):
+    """
+    Handling Paystack transaction rollups.
+
+    Returns precomputed transaction counts and amounts per creation day (UTC), status and currency, with totals
+    per status and currency over the range. Defaults to the last 30 days. Rollups cover every tenant's
+    transactions, so they are only served to staff users, never to requests made with an API key.
+    """
+
+    permission_classes = [IsNotTenant, permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        query_serializer=RollupFilterSerializer,
+        responses={
+            200: TransactionRollupSerializer(many=True),
+            400: "Bad Request",
+        },
+    )
+    def list(self, request):
+        filters = RollupFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        lookups = {"day__gte": filters.validated_data["day_from"], "day__lte": filters.validated_data["day_to"]}
+        for name in ("status", "currency"):
+            if name in filters.validated_data:
+                lookups[name] = filters.validated_data[name]
+        rollups = list(TransactionRollup.objects.filter(**lookups).exclude(count=0).order_by("day", "status"))
+
+        totals = {}
+        for rollup in rollups:
+            total = totals.setdefault(
+                (rollup.status, rollup.currency),
+                {"status": rollup.status, "currency": rollup.currency, "count": 0, "amount_minor": 0},
+            )
+            total["count"] += rollup.count
+            total["amount_minor"] += rollup.amount_minor
+        return response.Response(
+            {
+                "results": TransactionRollupSerializer(rollups, many=True).data,
+                "totals": RollupTotalSerializer(totals.values(), many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class PaystackPaymentVerificationViewSet(viewsets.ViewSet):
@@ -59,30 +396,45 @@ class PaystackPaymentVerificationViewSet(viewsets.ViewSet):
     This endpoint allows you to verify a payment by providing the transaction reference.
     """
 
+    payment_gateway = PaystackPaymentGateway()
+
     @decorators.action(detail=False, methods=["get"], url_path="(?P<reference>[^/.]+)")
     def verify_payment(self, request, reference=None):
-        payment_gateway = PaystackPaymentGateway()
         try:
-            res = payment_gateway.verify_payment(reference)
-            response_data = res.get("data", {})
-            data = {
-                "status": response_data.get("status"),
-                "email": response_data.get("customer", {}).get("email"),
-                "name": response_data.get("metadata", {}).get("name"),
-                "amount": response_data.get("amount") / 100,
-                "message": response_data.get("gateway_response"),
-            }
-
-            if data["status"] == "success":
-                PaystackTransaction.objects.update_or_create(
-                    reference=reference,
-                    defaults={
-                        "customer_email": data["email"],
-                        "customer_name": data["name"],
-                        "amount": data["amount"],
-                        "status": data["status"],
-                    },
-                )
+            data = verify_transaction(self.payment_gateway, reference)
             return response.Response(data, status=status.HTTP_200_OK)
+        except PaymentServiceUnavailableException as e:
+            return service_unavailable(e)
         except PaymentErrorException as e:
             return response.Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PaystackWebhookViewSet(viewsets.ViewSet):
+    """
+    Handling Paystack webhook events.
+
+    Verifies the ``x-paystack-signature`` header, queues ``charge.success`` and ``charge.failed`` events for the
+    webhook workers and acknowledges immediately. Other event types are acknowledged and ignored. Events are
+    queued with the tenant whose Paystack key signed them, and are only applied to that tenant's transactions.
+    """
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def create(self, request):
+        payload = request.body
+        signer = verify_webhook_signature(payload, request.headers.get("x-paystack-signature"))
+        if signer is None:
+            return response.Response({"error": "Invalid signature"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            body = json.loads(payload)
+            event = body["event"]
+            reference = body["data"]["reference"] if event in PaystackWebhookEventType.values else None
+        except (ValueError, KeyError, TypeError):
+            return response.Response({"error": "Malformed payload"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if reference is not None:
+            add_log_context(reference=reference)
+            get_webhook_queue().enqueue(event, reference, body, tenant_id=None if signer is GLOBAL_KEY else signer.id)
+        return response.Response(status=status.HTTP_200_OK)
@@ -0,0 +1,64 @@
+import io
+import json
+import tempfile
+from contextlib import redirect_stdout
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from benchmarks.fake_paystack import FakePaystackConfig, FakePaystackServer
+from benchmarks.load_test import compare, percentile
+from gateways.common.money import Money
+from gateways.paystack.exceptions import PaymentErrorException
+from gateways.paystack.utils import PaystackPaymentGateway
+
+
+class TestFakePaystack(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.server = FakePaystackServer(("127.0.0.1", 0), FakePaystackConfig(latency_ms=0, jitter_ms=0)).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_gateway_round_trip(self):
+        with override_settings(PAYSTACK_BASE_URL=self.server.url):
+            gateway = PaystackPaymentGateway()
+            initialized = gateway.initialize_payment(Money(5000, "NGN"), "a@b.com")
+            verified = gateway.verify_payment(initialized["data"]["reference"])
+
+        self.assertEqual(initialized["data"]["amount"], 5000)
+        self.assertEqual(verified["data"]["status"], "success")
+        self.assertEqual(self.server.requests, 2)
+
+    @override_settings(PAYSTACK_RETRY_ATTEMPTS=0)
+    def test_throttled_responses_carry_retry_after(self):
+        self.server.config.throttle_rate = 1.0
+        with override_settings(PAYSTACK_BASE_URL=self.server.url):
+            with self.assertRaises(PaymentErrorException) as raised:
+                PaystackPaymentGateway().verify_payment("ref")
+
+        self.assertEqual(raised.exception.status_code, 429)
+        self.assertEqual(raised.exception.retry_after, 1)
+
+
+class TestLoadTestReport(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_compare_flags_p95_regressions(self):
+        baseline = {"results": [{"endpoint": "create", "concurrency": 10, "p95_ms": 100.0, "rps": 50.0}]}
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as baseline_file:
+            json.dump(baseline, baseline_file)
+            baseline_file.flush()
+            slower = {"results": [{"endpoint": "create", "concurrency": 10, "p95_ms": 125.0, "rps": 40.0}]}
+            faster = {"results": [{"endpoint": "create", "concurrency": 10, "p95_ms": 105.0, "rps": 52.0}]}
+
+            with redirect_stdout(io.StringIO()) as output:
+                self.assertTrue(compare(slower, baseline_file.name, threshold=10))
+                self.assertFalse(compare(faster, baseline_file.name, threshold=10))
+
+        self.assertIn("REGRESSION", output.getvalue())
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from gateways.common.money import Money
+
+
+class TestMoney(SimpleTestCase):
+    def test_from_major_converts_to_minor_units(self):
+        self.assertEqual(Money.from_major(400), Money(40000, "NGN"))
+        self.assertEqual(Money.from_major("400.5", "USD"), Money(40050, "USD"))
+        self.assertEqual(Money.from_major(Decimal("19.99"), "GHS"), Money(1999, "GHS"))
+        self.assertEqual(Money.from_major(1500, "XOF"), Money(1500, "XOF"))
+
+    def test_from_major_rejects_fractions_of_the_minor_unit(self):
+        for amount, currency in (("1.001", "NGN"), (0.1 + 0.2, "NGN"), ("1.5", "XOF"), ("abc", "NGN"), ("NaN", "NGN")):
+            with self.assertRaises(ValueError):
+                Money.from_major(amount, currency)
+
+    def test_display_uses_the_currency_exponent(self):
+        self.assertEqual(Money(40050, "NGN").display(), "400.50")
+        self.assertEqual(Money(5, "NGN").display(), "0.05")
+        self.assertEqual(Money(-150, "USD").display(), "-1.50")
+        self.assertEqual(Money(1500, "XOF").display(), "1500")
+        self.assertEqual(Money(9_007_199_254_740_993, "NGN").major, Decimal("90071992547409.93"))
+
+    def test_addition_requires_the_same_currency(self):
+        self.assertEqual(Money(150, "NGN") + Money(250, "NGN"), Money(400, "NGN"))
+        with self.assertRaises(ValueError):
+            Money(150, "NGN") + Money(250, "USD")
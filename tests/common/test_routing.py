@@ -0,0 +1,124 @@
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from gateways.common.exceptions import PaymentErrorException, PaymentServiceUnavailableException
+from gateways.common.fake import FakePaymentGateway
+from gateways.common.gateways import GatewayRegistry, get_registry, reset_registry
+from gateways.common.money import Money
+from gateways.common.routing import GatewayRouter
+
+
+class TestGatewayRouter(SimpleTestCase):
+    def setUp(self):
+        self.primary = FakePaymentGateway("primary", currencies={"NGN"})
+        self.secondary = FakePaymentGateway("secondary", currencies={"NGN", "USD"})
+        self.router = GatewayRouter(GatewayRegistry([self.primary, self.secondary]), alpha=0.5)
+
+    def initialize(self, currency="NGN"):
+        return self.router.initialize_payment(Money(10000, currency), email="a@b.com", metadata={"name": "A"})
+
+    def test_routes_by_currency(self):
+        self.assertEqual(self.initialize("NGN")[0], self.primary)
+        self.assertEqual(self.initialize("USD")[0], self.secondary)
+        with self.assertRaises(PaymentErrorException):
+            self.initialize("EUR")
+
+    def test_fails_over_when_primary_circuit_is_open(self):
+        self.primary.unavailable = 30
+
+        gateway, res = self.initialize()
+
+        self.assertEqual(gateway, self.secondary)
+        self.assertIn(res["data"]["reference"], self.secondary.payments)
+
+    def test_fails_over_on_server_errors_but_not_on_rejections(self):
+        self.primary.error = PaymentErrorException("Bad gateway", status_code=502)
+        self.assertEqual(self.initialize()[0], self.secondary)
+
+        self.primary.error = PaymentErrorException("Invalid email", status_code=400)
+        with self.assertRaises(PaymentErrorException):
+            self.router.initialize_payment(Money(10000, "NGN"), email="a@b.com")
+        self.assertEqual(len(self.secondary.payments), 1)
+
+    def test_fails_over_when_the_primary_times_out(self):
+        self.primary.error = PaymentErrorException.from_error(requests.Timeout("Read timed out"))
+
+        gateway, res = self.initialize()
+
+        self.assertEqual(gateway, self.secondary)
+        self.assertIn(res["data"]["reference"], self.secondary.payments)
+        self.assertLess(self.router.health_of(self.primary).success_rate, 1.0)
+
+    def test_all_unavailable_raises_with_the_shortest_wait(self):
+        self.primary.unavailable = 30
+        self.secondary.unavailable = 10
+
+        with self.assertRaises(PaymentServiceUnavailableException) as raised:
+            self.initialize()
+
+        self.assertEqual(raised.exception.retry_after, 10)
+
+    def test_prefers_the_healthier_provider(self):
+        self.router.health_of(self.primary).record(0.5, ok=True)
+        self.router.health_of(self.secondary).record(0.1, ok=True)
+        self.assertEqual(self.initialize()[0], self.secondary)
+
+        for _ in range(5):
+            self.router.health_of(self.secondary).record(0.1, ok=False)
+        self.assertEqual(self.initialize()[0], self.primary)
+
+    def test_paystack_is_registered_by_default(self):
+        reset_registry()
+        self.addCleanup(reset_registry)
+
+        paystack = get_registry().get("paystack")
+
+        self.assertTrue(paystack.supports(Money(10000, "NGN")))
+        self.assertFalse(paystack.supports(Money(10000, "EUR")))
+        self.assertEqual(paystack.unavailable_for(), 0)
+
+    def test_registry_rejects_duplicate_names(self):
+        with self.assertRaises(ValueError):
+            GatewayRegistry([FakePaymentGateway("fake"), FakePaymentGateway("fake")])
+
+
+@override_settings(PAYMENT_GATEWAYS=["gateways.common.fake.FakePaymentGateway"])
+class TestPaymentEndpoints(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_registry()
+        self.addCleanup(reset_registry)
+        self.client = APIClient()
+
+    def test_initialize_and_verify_through_the_router(self):
+        response = self.client.post(
+            reverse("payment-list"), {"name": "A", "email": "a@b.com", "amount": 100, "currency": "USD"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["gateway"], "fake")
+        reference = response.data["data"]["reference"]
+
+        response = self.client.get(reverse("payment-verify", kwargs={"gateway": "fake", "reference": reference}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "success")
+        self.assertEqual((response.data["amount"], response.data["amount_minor"]), ("100.00", 10000))
+        self.assertEqual(response.data["currency"], "USD")
+
+    def test_unavailable_providers_return_503(self):
+        get_registry().get("fake").unavailable = 12
+
+        response = self.client.post(reverse("payment-list"), {"name": "A", "email": "a@b.com", "amount": 100})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "12")
+
+    def test_unknown_gateway_returns_404(self):
+        response = self.client.get(reverse("payment-verify", kwargs={"gateway": "nope", "reference": "ref"}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,260 @@
+import hashlib
+import hmac
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from gateways.common.models import ApiKey, Tenant
+from gateways.common.tenants import get_current_tenant, issue_api_key, tenant_context, tenant_resolver
+from gateways.paystack.enums import PaystackPaymentStatus
+from gateways.paystack.idempotency import idempotency_store
+from gateways.paystack.models import PaystackTransaction, PaystackWebhookEvent
+from gateways.paystack.queues import InMemoryWebhookQueue
+from gateways.paystack.ratelimit import rate_limiter
+from gateways.paystack.services import process_webhook_batch, verification_key
+from gateways.paystack.utils import GLOBAL_KEY, PaystackPaymentGateway, verify_webhook_signature
+
+
+class TestTenantResolver(TestCase):
+    def setUp(self):
+        tenant_resolver.clear()
+        self.tenant = Tenant.objects.create(name="acme", paystack_secret_key="sk_acme")
+        self.raw_key = issue_api_key(self.tenant)
+
+    def test_keys_are_stored_hashed_and_resolved_from_cache(self):
+        self.assertFalse(ApiKey.objects.filter(key_hash=self.raw_key).exists())
+        self.assertEqual(tenant_resolver.by_key(self.raw_key).name, "acme")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(tenant_resolver.by_key(self.raw_key).paystack_secret_key, "sk_acme")
+
+    def test_unknown_keys_are_cached_as_missing(self):
+        self.assertIsNone(tenant_resolver.by_key("pgk_unknown"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(tenant_resolver.by_key("pgk_unknown"))
+
+    def test_revoking_a_key_clears_the_cache(self):
+        tenant_resolver.by_key(self.raw_key)
+        ApiKey.objects.filter(tenant=self.tenant).get().delete()
+
+        self.assertIsNone(tenant_resolver.by_key(self.raw_key))
+
+    def test_inactive_tenants_keys_do_not_resolve(self):
+        self.tenant.is_active = False
+        self.tenant.save()
+
+        self.assertIsNone(tenant_resolver.by_key(self.raw_key))
+        self.assertEqual(tenant_resolver.by_id(self.tenant.id).name, "acme")
+
+
+@patch("gateways.paystack.views.PaystackPaymentGateway.initialize_payment")
+class TestTenantRequests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        tenant_resolver.clear()
+        idempotency_store.local.clear()
+        self.client = APIClient()
+        self.payment_url = reverse("paystack-payment-list")
+        self.payment_data = {"name": "Test User", "email": "testemail@email.com", "amount": 1000}
+        self.tenant = Tenant.objects.create(name="acme", paystack_secret_key="sk_acme")
+        self.raw_key = issue_api_key(self.tenant)
+        self.used_keys = []
+
+    def initialize(self, money, email, metadata=None):
+        self.used_keys.append(PaystackPaymentGateway().headers()["Authorization"])
+        reference = f"ref_{len(self.used_keys)}"
+        return {"status": True, "data": {"reference": reference, "access_code": "access"}}
+
+    @override_settings(PAYSTACK_SECRET_KEY="sk_test")
+    def test_payments_use_the_tenants_paystack_key_and_belong_to_the_tenant(self, mock_initialize_payment):
+        mock_initialize_payment.side_effect = self.initialize
+
+        response = self.client.post(self.payment_url, self.payment_data, HTTP_X_API_KEY=self.raw_key)
+        self.client.post(self.payment_url, self.payment_data)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.used_keys, ["Bearer sk_acme", "Bearer sk_test"])
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_1").tenant_id, self.tenant.id)
+        self.assertIsNone(PaystackTransaction.objects.get(reference="ref_2").tenant_id)
+        self.assertIsNone(get_current_tenant())
+
+    @patch("gateways.paystack.views.PaystackPaymentGateway.verify_payment")
+    def test_callbacks_verify_with_the_transactions_tenant_key(self, mock_verify_payment, mock_initialize_payment):
+        baker.make(PaystackTransaction, reference="mine", tenant=self.tenant, amount_minor=100)
+
+        def verify(reference):
+            self.used_keys.append(PaystackPaymentGateway().headers()["Authorization"])
+            return {"data": {"status": "success", "customer": {"email": "test@email.com"}, "amount": 100}}
+
+        mock_verify_payment.side_effect = verify
+
+        response = self.client.get(reverse("paystack-verification-verify-payment", kwargs={"reference": "mine"}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.used_keys, ["Bearer sk_acme"])
+
+    @patch("gateways.paystack.async_views.AsyncPaystackPaymentGateway.initialize_payment")
+    async def test_async_payments_run_as_the_tenant(self, mock_async_initialize, mock_initialize_payment):
+        async def initialize(money, email, metadata=None):
+            return self.initialize(money, email, metadata)
+
+        mock_async_initialize.side_effect = initialize
+        url = reverse("paystack-async-payment")
+
+        response = await self.async_client.post(
+            url, self.payment_data, content_type="application/json", headers={"X-API-Key": self.raw_key}
+        )
+        rejected = await self.async_client.post(
+            url, self.payment_data, content_type="application/json", headers={"X-API-Key": "pgk_wrong"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.used_keys, ["Bearer sk_acme"])
+        self.assertEqual(rejected.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_async_requests_take_the_quota_without_blocking(self, mock_initialize_payment):
+        self.tenant.rate_limit, self.tenant.burst = 0.01, 1
+        await self.tenant.asave()
+        store = MagicMock()
+        store.atake = AsyncMock(return_value=30)
+
+        with patch.object(rate_limiter, "_store", store):
+            response = await self.async_client.post(
+                reverse("paystack-async-payment"),
+                self.payment_data,
+                content_type="application/json",
+                headers={"X-API-Key": self.raw_key},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "30")
+        store.atake.assert_awaited_once_with(f"ratelimit:tenant:{self.tenant.id}", 0.01, 1, 0)
+        store.take.assert_not_called()
+
+    def test_invalid_or_missing_keys_are_rejected(self, mock_initialize_payment):
+        response = self.client.post(self.payment_url, self.payment_data, HTTP_X_API_KEY="pgk_wrong")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with override_settings(TENANT_AUTH_REQUIRED=True):
+            response = self.client.post(self.payment_url, self.payment_data)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            webhook = self.client.post(reverse("paystack-webhook-list"), {}, format="json")
+            self.assertEqual(webhook.data, {"error": "Invalid signature"})
+        mock_initialize_payment.assert_not_called()
+
+    def test_requests_over_the_tenant_quota_get_429(self, mock_initialize_payment):
+        mock_initialize_payment.side_effect = self.initialize
+        self.tenant.rate_limit, self.tenant.burst = 0.01, 2
+        self.tenant.save()
+
+        responses = [
+            self.client.post(self.payment_url, self.payment_data, HTTP_X_API_KEY=self.raw_key) for _ in range(3)
+        ]
+
+        self.assertEqual([r.status_code for r in responses], [200, 200, 429])
+        self.assertGreater(int(responses[2]["Retry-After"]), 0)
+        self.assertEqual(mock_initialize_payment.call_count, 2)
+
+    def test_listing_is_limited_to_the_tenants_transactions(self, mock_initialize_payment):
+        baker.make(PaystackTransaction, reference="mine", tenant=self.tenant, amount_minor=100)
+        baker.make(PaystackTransaction, reference="other", amount_minor=100)
+
+        tenant_list = self.client.get(self.payment_url, HTTP_X_API_KEY=self.raw_key)
+        self.client.force_authenticate(get_user_model().objects.create_user("finance", is_staff=True))
+        staff_list = self.client.get(self.payment_url)
+
+        self.assertEqual([row["reference"] for row in tenant_list.data["results"]], ["mine"])
+        self.assertEqual([row["reference"] for row in staff_list.data["results"]], ["other"])
+        self.assertNotIn("tenant", staff_list.data["results"][0])
+
+    def test_retrieval_is_limited_to_the_tenants_transactions(self, mock_initialize_payment):
+        baker.make(PaystackTransaction, reference="mine", tenant=self.tenant, amount_minor=100)
+        baker.make(PaystackTransaction, reference="other", amount_minor=100)
+
+        def retrieve(reference, **headers):
+            return self.client.get(reverse("paystack-payment-detail", kwargs={"reference": reference}), **headers)
+
+        self.assertEqual(retrieve("mine", HTTP_X_API_KEY=self.raw_key).status_code, status.HTTP_200_OK)
+        self.assertEqual(retrieve("mine").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(retrieve("other", HTTP_X_API_KEY=self.raw_key).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(retrieve("other").status_code, status.HTTP_200_OK)
+
+    def test_verifications_are_coalesced_per_tenant(self, mock_initialize_payment):
+        with tenant_context(tenant_resolver.by_id(self.tenant.id)):
+            tenant_key = verification_key("ref_1")
+
+        self.assertNotEqual(tenant_key, verification_key("ref_1"))
+
+    def test_rollups_are_refused_to_tenants(self, mock_initialize_payment):
+        url = reverse("paystack-rollups-list")
+        self.client.force_authenticate(get_user_model().objects.create_user("finance", is_staff=True))
+
+        self.assertEqual(self.client.get(url, HTTP_X_API_KEY=self.raw_key).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_idempotency_keys_are_scoped_to_the_tenant(self, mock_initialize_payment):
+        mock_initialize_payment.side_effect = self.initialize
+
+        self.client.post(self.payment_url, self.payment_data, HTTP_IDEMPOTENCY_KEY="key-1")
+        response = self.client.post(
+            self.payment_url, self.payment_data, HTTP_IDEMPOTENCY_KEY="key-1", HTTP_X_API_KEY=self.raw_key
+        )
+
+        self.assertEqual(response.data["data"]["reference"], "ref_2")
+        self.assertEqual(mock_initialize_payment.call_count, 2)
+
+    @override_settings(PAYSTACK_SECRET_KEY="sk_test")
+    def test_webhooks_signed_with_a_tenants_key_are_accepted(self, mock_initialize_payment):
+        payload = json.dumps({"event": "charge.success"}).encode()
+
+        def sign(key):
+            return hmac.new(key.encode(), payload, hashlib.sha512).hexdigest()
+
+        self.assertEqual(verify_webhook_signature(payload, sign("sk_acme")).id, str(self.tenant.id))
+        self.assertIs(verify_webhook_signature(payload, sign("sk_test")), GLOBAL_KEY)
+        self.assertIsNone(verify_webhook_signature(payload, sign("sk_other")))
+
+    def test_webhooks_are_queued_with_the_signing_tenant(self, mock_initialize_payment):
+        body = json.dumps({"event": "charge.success", "data": {"reference": "mine"}}).encode()
+        signature = hmac.new(b"sk_acme", body, hashlib.sha512).hexdigest()
+
+        self.client.generic(
+            "POST",
+            reverse("paystack-webhook-list"),
+            body,
+            content_type="application/json",
+            HTTP_X_PAYSTACK_SIGNATURE=signature,
+        )
+
+        self.assertEqual(PaystackWebhookEvent.objects.get().tenant_id, self.tenant.id)
+
+    def test_webhook_events_only_apply_to_the_signing_tenants_transactions(self, mock_initialize_payment):
+        baker.make(PaystackTransaction, reference="mine", tenant=self.tenant, amount_minor=100)
+        baker.make(PaystackTransaction, reference="other", amount_minor=100)
+        tenant_id = str(self.tenant.id)
+        queue = InMemoryWebhookQueue()
+        queue.enqueue("charge.success", "mine", {"data": {"amount": 100}})
+        queue.enqueue("charge.success", "other", {"data": {"amount": 100}}, tenant_id=tenant_id)
+        queue.enqueue("charge.failed", "mine", {"data": {"amount": 100}}, tenant_id=tenant_id)
+        queue.enqueue("charge.success", "new", {"data": {"amount": 100}}, tenant_id=tenant_id)
+        queue.enqueue("charge.failed", "new", {"data": {"amount": 100}})
+
+        process_webhook_batch(queue, 10)
+
+        statuses = dict(PaystackTransaction.objects.values_list("reference", "status"))
+        self.assertEqual(
+            statuses,
+            {
+                "mine": PaystackPaymentStatus.FAILED,
+                "other": PaystackPaymentStatus.PENDING,
+                "new": PaystackPaymentStatus.SUCCESS,
+            },
+        )
+        self.assertEqual(PaystackTransaction.objects.get(reference="new").tenant_id, self.tenant.id)
@@ -0,0 +1,32 @@
+import time
+
+from django.test import SimpleTestCase
+from model_bakery import baker
+
+from gateways.common.utils import uuid7, uuid7_timestamp
+
+
+class TestUUID7(SimpleTestCase):
+    def test_version_and_variant(self):
+        value = uuid7()
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, "specified in RFC 4122")
+
+    def test_encodes_the_current_time(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+
+        self.assertTrue(before <= uuid7_timestamp(value) <= after + 1)
+
+    def test_ids_are_strictly_increasing(self):
+        values = [uuid7() for _ in range(10000)]
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+    def test_models_use_time_ordered_ids(self):
+        transaction_obj = baker.prepare("paystack.PaystackTransaction")
+
+        self.assertEqual(transaction_obj.id.version, 7)
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.db_routers import ReplicaRouter, pin_reads, read_alias, routing_state
+from core.middleware import DatabaseRoutingMiddleware
+from gateways.paystack.models import PaystackTransaction
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica_0"], DATABASE_REPLICA_MODELS=["paystack.paystacktransaction"], DB_REPLICA_PIN_SECONDS=5
+)
+class TestReplicaRouter(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.middleware = DatabaseRoutingMiddleware(self.view)
+        self.routed = []
+
+    def view(self, request):
+        self.routed.append(self.router.db_for_read(PaystackTransaction))
+        if request.method == "POST":
+            self.router.db_for_write(PaystackTransaction)
+            self.routed.append(self.router.db_for_read(PaystackTransaction))
+        return HttpResponse()
+
+    def test_request_reads_go_to_replica_until_request_writes(self):
+        self.middleware(RequestFactory().post("/"))
+        self.middleware(RequestFactory().get("/"))
+
+        self.assertEqual(self.routed, ["replica_0", "default", "replica_0"])
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(PaystackTransaction), "default")
+        self.assertIsNone(routing_state.get())
+
+    def test_other_models_are_not_routed(self):
+        self.assertIsNone(self.router.db_for_read(User))
+
+    def test_migrations_skip_replicas(self):
+        self.assertTrue(self.router.allow_migrate("default", "paystack"))
+        self.assertFalse(self.router.allow_migrate("replica_0", "paystack"))
+
+    def test_pinned_keys_read_from_primary(self):
+        pin_reads("ref_1")
+
+        self.assertEqual(read_alias("ref_1"), "default")
+        self.assertIsNone(read_alias("ref_2"))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_means_no_routing(self):
+        pin_reads("ref_1")
+
+        self.assertIsNone(self.router.db_for_read(PaystackTransaction))
+        self.assertIsNone(read_alias("ref_1"))
@@ -0,0 +1,95 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.fastjson import response_json
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    def assertRendersLikeDRF(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_output_matches_drf(self):
+        self.assertRendersLikeDRF(
+            {
+                "id": uuid.UUID("0190f5a2-7c1e-7a3b-8f00-0123456789ab"),
+                "amount": Decimal("400.50"),
+                "ratio": 0.1,
+                "created_at": datetime(2024, 8, 22, 9, 14, 24, 123456, tzinfo=timezone.utc),
+                "day": date(2024, 8, 22),
+                "at": time(9, 14, 24),
+                "elapsed": timedelta(seconds=90),
+                "name": "Adéọlá 北京",
+                "note": "line\u2028break\u2029",
+                "errors": [ErrorDetail("This field is required.", code="required")],
+                "tags": ("a", "b"),
+                "nested": {"empty": [], "none": None, "flag": True, 1: "int key"},
+            }
+        )
+
+    def test_indented_output_falls_back_to_drf(self):
+        self.assertRendersLikeDRF({"a": [1, 2]}, "application/json; indent=4")
+
+    def test_unencodable_values_fall_back_to_drf(self):
+        self.assertRendersLikeDRF({"big": 2**70})
+
+    def test_exponent_floats_differ_only_in_notation(self):
+        data = {"big": 1e16, "small": 1e-7, "plain": 0.1}
+
+        self.assertEqual(FastJSONRenderer().render(data), b'{"big":1e16,"small":1e-7,"plain":0.1}')
+        self.assertEqual(JSONRenderer().render(data), b'{"big":1e+16,"small":1e-07,"plain":0.1}')
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), data)
+
+    def test_non_finite_floats_are_rejected_like_drf(self):
+        for value in (float("nan"), float("inf"), float("-inf")):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({"results": [{"ratio": value}]})
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render({"results": [{"ratio": value}]})
+
+        self.assertRendersLikeDRF({"ratio": None, "amount": 1.5})
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class TestFastJSONParser(SimpleTestCase):
+    def test_parses_like_drf(self):
+        body = '{"amount": 400.5, "name": "Adéọlá", "items": [1, null, true]}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"amount": '))
+
+    def test_other_encodings_use_drf_parser(self):
+        body = '{"name": "Adéọlá"}'.encode("utf-16")
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body), parser_context={"encoding": "utf-16"}), {"name": "Adéọlá"}
+        )
+
+
+class TestResponseJSON(SimpleTestCase):
+    def test_decodes_raw_bytes(self):
+        response = MagicMock(content=b'{"status": true, "data": {"amount": 5000}}')
+        self.assertEqual(response_json(response), {"status": True, "data": {"amount": 5000}})
+        response.json.assert_not_called()
+
+    def test_falls_back_to_response_json(self):
+        response = MagicMock()
+        response.json.return_value = {"status": True}
+        self.assertEqual(response_json(response), {"status": True})
@@ -0,0 +1,179 @@
+import io
+import json
+import logging
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core.log_context import add_log_context, bind_log_context, get_log_context
+from core.logging_formatter import CustomJsonFormatter
+from core.logging_handlers import QueueLogHandler
+from core.middleware import RequestIDMiddleware
+
+
+def make_record(msg="payment verified", level=logging.INFO, **extra):
+    record = logging.LogRecord("tests", level, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestCustomJsonFormatter(SimpleTestCase):
+    def test_timestamp_is_utc_with_microseconds(self):
+        formatter = CustomJsonFormatter()
+        record = make_record()
+        record.created = 1724318064.123456
+
+        first = json.loads(formatter.format(record))["timestamp"]
+        record.created += 0.5
+        second = json.loads(formatter.format(record))["timestamp"]
+
+        self.assertEqual(first, "2024-08-22T09:14:24.123456Z")
+        self.assertEqual(second, "2024-08-22T09:14:24.623456Z")
+
+    def test_adds_bound_correlation_fields(self):
+        formatter = CustomJsonFormatter()
+        with bind_log_context(request_id="req-1"):
+            add_log_context(reference="ref-1")
+            output = json.loads(formatter.format(make_record(reference="explicit")))
+
+        self.assertEqual(output["request_id"], "req-1")
+        self.assertEqual(output["reference"], "explicit")
+        self.assertEqual(get_log_context(), {})
+
+
+class TestQueueLogHandler(SimpleTestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.handler = QueueLogHandler(stream=self.stream, queue_size=10, batch_size=4)
+        self.handler.setFormatter(CustomJsonFormatter())
+        self.addCleanup(self.handler.close)
+
+    def lines(self):
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_records_are_written_with_the_context_they_were_logged_in(self):
+        for i in range(6):
+            with bind_log_context(request_id=f"req-{i}"):
+                self.handler.handle(make_record(f"attempt {i}"))
+        self.handler.flush()
+
+        self.assertEqual([line["message"] for line in self.lines()], [f"attempt {i}" for i in range(6)])
+        self.assertEqual([line["request_id"] for line in self.lines()], [f"req-{i}" for i in range(6)])
+
+    def test_messages_and_exceptions_are_resolved_when_logged(self):
+        arguments = ["first"]
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("tests", logging.ERROR, __file__, 1, "failed: %s", (arguments,), sys.exc_info())
+        self.handler.handle(record)
+        arguments.append("second")
+        self.handler.flush()
+
+        (line,) = self.lines()
+        self.assertEqual(line["message"], "failed: ['first']")
+        self.assertIn("ValueError: boom", line["exc_info"])
+
+    def test_records_seen_by_other_handlers_are_left_untouched(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            exc_info = sys.exc_info()
+        record = logging.LogRecord("tests", logging.ERROR, __file__, 1, "failed: %s", ("ref-1",), exc_info)
+
+        self.handler.handle(record)
+        self.handler.flush()
+
+        self.assertEqual((record.msg, record.args, record.exc_info), ("failed: %s", ("ref-1",), exc_info))
+        self.assertFalse(hasattr(record, "_log_context"))
+        self.assertIn("ValueError: boom", logging.Formatter().format(record))
+        self.assertEqual(self.lines()[0]["message"], "failed: ref-1")
+
+    def test_debug_records_are_dropped_under_load_and_reported(self):
+        self.handler.ensure_writer = lambda: None
+        for _ in range(6):
+            self.handler.queue.put_nowait(make_record())
+
+        self.handler.handle(make_record(level=logging.DEBUG))
+        self.assertEqual(self.handler.queue.qsize(), 6)
+        self.handler.handle(make_record(level=logging.INFO))
+        self.assertEqual(self.handler.queue.qsize(), 7)
+        for _ in range(3):
+            self.handler.queue.put_nowait(make_record())
+        self.handler.handle(make_record(level=logging.INFO))
+
+        del self.handler.ensure_writer
+        self.handler.ensure_writer()
+        self.handler.flush()
+        self.handler.handle(make_record("after"))
+        self.handler.flush()
+        messages = [line["message"] for line in self.lines()]
+        self.assertIn("Dropped 2 log records", messages)
+        self.assertEqual(messages[-1], "after")
+
+    def test_close_writes_remaining_records(self):
+        self.handler.handle(make_record("last"))
+        self.handler.close()
+
+        self.assertEqual(self.lines()[-1]["message"], "last")
+
+    def test_close_does_not_block_on_a_full_queue(self):
+        released = threading.Event()
+        stream = MagicMock()
+        stream.write.side_effect = lambda _: released.wait()
+        self.addCleanup(released.set)
+        handler = QueueLogHandler(stream=stream, queue_size=2, batch_size=1, close_timeout=0.1)
+        handler.setFormatter(CustomJsonFormatter())
+        for i in range(4):
+            handler.handle(make_record(f"attempt {i}"))
+
+        started = time.monotonic()
+        handler.close()
+
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_writer_stops_once_it_has_drained_the_queue_when_closing(self):
+        for i in range(3):
+            self.handler.queue.put_nowait(make_record(f"attempt {i}"))
+        self.handler._closing.set()
+
+        self.handler.write_loop()
+
+        self.assertEqual([line["message"] for line in self.lines()], [f"attempt {i}" for i in range(3)])
+
+
+class TestRequestIDMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = {}
+
+        def view(request):
+            self.seen.update(get_log_context())
+            return HttpResponse()
+
+        self.middleware = RequestIDMiddleware(view)
+
+    def test_uses_incoming_request_id(self):
+        response = self.middleware(self.factory.get("/", HTTP_X_REQUEST_ID="abc-123"))
+
+        self.assertEqual(response["X-Request-ID"], "abc-123")
+        self.assertEqual(self.seen["request_id"], "abc-123")
+
+    def test_generates_request_id_for_missing_or_invalid_header(self):
+        response = self.middleware(self.factory.get("/", HTTP_X_REQUEST_ID="not valid\n"))
+
+        self.assertRegex(response["X-Request-ID"], r"^[0-9a-f]{32}$")
+        self.assertEqual(self.seen["request_id"], response["X-Request-ID"])
+
+    def test_binds_reference_from_view_kwargs(self):
+        def view(request):
+            self.middleware.process_view(request, view, (), {"reference": "ref-9"})
+            self.seen.update(get_log_context())
+            return HttpResponse()
+
+        RequestIDMiddleware(view)(self.factory.get("/"))
+        self.assertEqual(self.seen["reference"], "ref-9")
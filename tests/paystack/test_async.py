@@ -0,0 +1,110 @@
+from unittest.mock import patch
+
+import httpx
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from gateways.common.money import Money
+from gateways.paystack.exceptions import PaymentErrorException
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.utils import AsyncPaystackPaymentGateway
+
+
+@override_settings(PAYSTACK_RETRY_BACKOFF=0)
+class TestAsyncPaystackPaymentGateway(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.reference = "test_reference_12345"
+        self.requests = []
+
+    def make_gateway(self, status_code=200, payload=None):
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(status_code, json=payload or {})
+
+        return AsyncPaystackPaymentGateway(session=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    async def test_initialize_payment_success(self):
+        gateway = self.make_gateway(payload={"status": True, "data": {"reference": self.reference}})
+
+        res = await gateway.initialize_payment(Money(100000, "NGN"), "test@example.com", {"name": "Test User"})
+
+        self.assertEqual(res["data"]["reference"], self.reference)
+        self.assertEqual(self.requests[0].url, "https://api.paystack.co/transaction/initialize")
+        self.assertEqual(self.requests[0].headers["Authorization"], gateway.headers()["Authorization"])
+
+    async def test_verify_payment_success(self):
+        gateway = self.make_gateway(payload={"status": True, "data": {"status": "success"}})
+
+        res = await gateway.verify_payment(self.reference)
+
+        self.assertEqual(res["data"]["status"], "success")
+        self.assertEqual(self.requests[0].url, f"https://api.paystack.co/transaction/verify/{self.reference}")
+
+    async def test_verify_payment_failure_raises_custom_exception(self):
+        gateway = self.make_gateway(status_code=500)
+
+        with self.assertRaises(PaymentErrorException):
+            await gateway.verify_payment(self.reference)
+
+        self.assertEqual(len(self.requests), 3)
+
+
+class TestAsyncPaystackViews(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reference = "1gh2j3k4l5m6n7o8p9q0r"
+        self.payment_url = reverse("paystack-async-payment")
+        self.verify_url = reverse("paystack-async-verification", kwargs={"reference": self.reference})
+        self.payment_data = {"name": "Test User", "email": "testemail@email.com", "amount": 1000}
+
+    @patch("gateways.paystack.async_views.AsyncPaystackPaymentGateway.initialize_payment")
+    async def test_make_payment_success(self, mock_initialize_payment):
+        mock_initialize_payment.return_value = {"status": True, "data": {"reference": "ref_12345"}}
+
+        response = await self.async_client.post(self.payment_url, self.payment_data, content_type="application/json")
+
+        mock_initialize_payment.assert_awaited_once_with(
+            money=Money(100000, "NGN"),
+            email=self.payment_data["email"],
+            metadata={"name": self.payment_data["name"]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["reference"], "ref_12345")
+
+    async def test_make_payment_with_invalid_data_returns_400(self):
+        self.payment_data["amount"] = 0
+
+        response = await self.async_client.post(self.payment_url, self.payment_data, content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("amount", response.json())
+
+    @patch("gateways.paystack.async_views.AsyncPaystackPaymentGateway.verify_payment")
+    async def test_verify_payment_success_records_transaction(self, mock_verify_payment):
+        mock_verify_payment.return_value = {
+            "data": {
+                "status": "success",
+                "customer": {"email": "test@email.com"},
+                "metadata": {"name": "Test User"},
+                "amount": 100000,
+                "gateway_response": "Payment successful",
+            }
+        }
+
+        response = await self.async_client.get(self.verify_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["status"], "success")
+        self.assertTrue(await PaystackTransaction.objects.filter(reference=self.reference).aexists())
+
+    @patch("gateways.paystack.async_views.AsyncPaystackPaymentGateway.verify_payment")
+    async def test_verify_payment_failure(self, mock_verify_payment):
+        mock_verify_payment.side_effect = PaymentErrorException("Verification failed")
+
+        response = await self.async_client.get(self.verify_url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["error"], "Verification failed")
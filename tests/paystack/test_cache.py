@@ -0,0 +1,136 @@
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from core.db_routers import ReplicaRouter, pin_reads
+from gateways.paystack.cache import MISSING, LocalLRUCache, transaction_cache
+from gateways.paystack.enums import PaystackPaymentStatus
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.queues import InMemoryWebhookQueue
+from gateways.paystack.services import get_transaction_payload, invalidate_transactions, process_webhook_batch
+
+
+class TestLocalLRUCache(APITestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        lru = LocalLRUCache(maxsize=2)
+        lru.set("a", 1, ttl=60)
+        lru.set("b", 2, ttl=60)
+        lru.get("a")
+        lru.set("c", 3, ttl=60)
+
+        self.assertEqual((lru.get("a"), lru.get("b"), lru.get("c")), (1, None, 3))
+
+    def test_expired_entry_is_a_miss(self):
+        lru = LocalLRUCache(maxsize=2)
+        lru.set("a", 1, ttl=-1)
+
+        self.assertIsNone(lru.get("a"))
+
+
+class TestCachedTransactionRetrieval(APITestCase):
+    def setUp(self):
+        cache.clear()
+        transaction_cache.local.clear()
+        self.client = APIClient()
+        self.transaction = baker.make(PaystackTransaction, status=PaystackPaymentStatus.PENDING)
+        self.retrieve_url = reverse("paystack-payment-detail", kwargs={"reference": self.transaction.reference})
+
+    def test_repeated_retrieve_is_served_from_cache(self):
+        self.client.get(self.retrieve_url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.retrieve_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["reference"], self.transaction.reference)
+
+    def test_unknown_reference_is_negatively_cached(self):
+        url = reverse("paystack-payment-detail", kwargs={"reference": "unknown"})
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(transaction_cache.get("unknown"), MISSING)
+
+    @override_settings(PAYSTACK_CACHE_PENDING_TTL=5, PAYSTACK_CACHE_SETTLED_TTL=3600)
+    def test_settled_transactions_are_cached_longer_than_pending(self):
+        self.assertEqual(transaction_cache.ttl({"status": "pending"}), 5)
+        self.assertEqual(transaction_cache.ttl({"status": "success"}), 3600)
+
+    @patch("gateways.paystack.views.PaystackPaymentGateway.verify_payment")
+    def test_verify_invalidates_cached_transaction(self, mock_verify_payment):
+        self.client.get(self.retrieve_url)
+        mock_verify_payment.return_value = {
+            "data": {
+                "status": "success",
+                "customer": {"email": "test@email.com"},
+                "metadata": {"name": "Test User"},
+                "amount": 100000,
+                "gateway_response": "Payment successful",
+            }
+        }
+
+        verify_url = reverse("paystack-verification-verify-payment", kwargs={"reference": self.transaction.reference})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(verify_url)
+        response = self.client.get(self.retrieve_url)
+
+        self.assertEqual(response.data["status"], "success")
+
+    def test_webhook_invalidates_negative_cache_entry(self):
+        url = reverse("paystack-payment-detail", kwargs={"reference": "ref_new"})
+        self.client.get(url)
+        queue = InMemoryWebhookQueue()
+        queue.enqueue("charge.success", "ref_new", {"data": {"reference": "ref_new", "amount": 1000}})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_webhook_batch(queue, 10)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalidation_pins_reads_before_dropping_the_cache(self):
+        calls = MagicMock()
+        with (
+            patch("gateways.paystack.services.pin_reads", calls.pin_reads),
+            patch.object(transaction_cache, "invalidate", calls.invalidate),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_transactions(PaystackTransaction(reference="ref_1"))
+
+        self.assertEqual([name for name, _, _ in calls.mock_calls], ["pin_reads", "invalidate"])
+
+    @override_settings(DATABASE_REPLICAS=["replica_0"], DB_REPLICA_PIN_SECONDS=5)
+    def test_cache_misses_are_routed_to_replicas(self):
+        with patch.object(ReplicaRouter, "db_for_read", return_value="default") as db_for_read:
+            payload = get_transaction_payload(self.transaction.reference)
+
+        self.assertEqual(payload["reference"], self.transaction.reference)
+        db_for_read.assert_called()
+
+    @override_settings(DATABASE_REPLICAS=["replica_0"], DB_REPLICA_PIN_SECONDS=5)
+    def test_cache_misses_of_pinned_references_read_from_the_primary(self):
+        pin_reads(self.transaction.reference)
+        # replica_0 is not a configured database, so a read routed to it would fail.
+        with patch.object(ReplicaRouter, "db_for_read", return_value="replica_0"):
+            payload = get_transaction_payload(self.transaction.reference)
+
+        self.assertEqual(payload["reference"], self.transaction.reference)
+
+    @override_settings(DATABASE_REPLICAS=["replica_0"], DB_REPLICA_PIN_SECONDS=5)
+    def test_replica_read_is_not_cached_when_the_reference_is_pinned_meanwhile(self):
+        def pin_and_route(model, **hints):
+            pin_reads(self.transaction.reference)
+            return "default"
+
+        with patch.object(ReplicaRouter, "db_for_read", side_effect=pin_and_route):
+            get_transaction_payload(self.transaction.reference)
+
+        self.assertIsNone(transaction_cache.get(self.transaction.reference, None))
@@ -0,0 +1,132 @@
+import io
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from gateways.paystack.exceptions import PaymentErrorException
+from gateways.paystack.idempotency import idempotency_store
+from gateways.paystack.models import IdempotencyRecord
+
+
+@patch("gateways.paystack.views.PaystackPaymentGateway.initialize_payment")
+class TestIdempotentPaymentInitialization(APITestCase):
+    def setUp(self):
+        cache.clear()
+        idempotency_store.local.clear()
+        self.client = APIClient()
+        self.payment_url = reverse("paystack-payment-list")
+        self.payment_data = {"name": "Test User", "email": "testemail@email.com", "amount": 1000}
+        self.initialize_response = {"status": True, "data": {"reference": "ref_12345", "access_code": "access"}}
+
+    def post(self, data=None, key="key-1"):
+        return self.client.post(self.payment_url, data or self.payment_data, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay_returns_stored_response_without_calling_paystack(self, mock_initialize_payment):
+        mock_initialize_payment.return_value = self.initialize_response
+
+        first = self.post()
+        replay = self.post()
+
+        mock_initialize_payment.assert_called_once()
+        self.assertEqual(replay.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertFalse(first.has_header("Idempotent-Replayed"))
+
+    def test_replay_is_served_from_database_after_local_eviction(self, mock_initialize_payment):
+        mock_initialize_payment.return_value = self.initialize_response
+        self.post()
+        idempotency_store.local.clear()
+
+        replay = self.post()
+
+        mock_initialize_payment.assert_called_once()
+        self.assertEqual(replay.data, self.initialize_response)
+        self.assertEqual(IdempotencyRecord.objects.get().key, "key-1")
+
+    def test_reusing_key_with_different_body_returns_422(self, mock_initialize_payment):
+        mock_initialize_payment.return_value = self.initialize_response
+        self.post()
+
+        response = self.post({**self.payment_data, "amount": 2000})
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        mock_initialize_payment.assert_called_once()
+
+    def test_failed_attempt_is_not_stored(self, mock_initialize_payment):
+        mock_initialize_payment.side_effect = [PaymentErrorException("Timed out"), self.initialize_response]
+
+        first = self.post()
+        retry = self.post()
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_initialize_payment.call_count, 2)
+
+    def test_requests_without_key_are_not_deduplicated(self, mock_initialize_payment):
+        mock_initialize_payment.return_value = self.initialize_response
+
+        self.client.post(self.payment_url, self.payment_data)
+        self.client.post(self.payment_url, self.payment_data)
+
+        self.assertEqual(mock_initialize_payment.call_count, 2)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+
+class TestIdempotencyStore(TestCase):
+    def setUp(self):
+        cache.clear()
+        idempotency_store.local.clear()
+        self.record = ("fingerprint", 200, {"status": True})
+
+    def test_callers_that_waited_for_the_response_are_told_it_was_replayed(self):
+        fn = MagicMock(return_value=(200, {"status": True}))
+        # Another caller, in this process or another worker, ran the request and shared its result.
+        with patch.object(idempotency_store.flight, "do", return_value=(self.record, False)):
+            status_code, _, replayed = idempotency_store.run("key-1", "fingerprint", fn)
+
+        fn.assert_not_called()
+        self.assertEqual(status_code, 200)
+        self.assertTrue(replayed)
+
+    def test_caller_that_ran_the_request_is_not_told_it_was_replayed(self):
+        _, _, replayed = idempotency_store.run("key-1", "fingerprint", lambda: (200, {"status": True}))
+
+        self.assertFalse(replayed)
+
+    def test_local_copy_expires_with_the_stored_record(self):
+        baker.make(IdempotencyRecord, key="key-1", fingerprint="fingerprint", status_code=200, response={})
+        IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(seconds=86400 - 10))
+
+        with patch.object(idempotency_store.local, "set") as local_set:
+            idempotency_store.lookup("key-1")
+
+        self.assertLessEqual(local_set.call_args.args[2], 10)
+
+    def test_expired_key_can_be_reused(self):
+        baker.make(IdempotencyRecord, key="key-1", fingerprint="old", status_code=200, response={})
+        IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        idempotency_store.run("key-1", "fingerprint", lambda: (200, {"status": True}))
+        idempotency_store.local.clear()
+
+        self.assertEqual(idempotency_store.lookup("key-1"), self.record)
+
+    def test_purge_deletes_expired_records_only(self):
+        baker.make(IdempotencyRecord, key="expired", status_code=200, response={})
+        IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(days=2))
+        baker.make(IdempotencyRecord, key="live", status_code=200, response={})
+
+        out = io.StringIO()
+        call_command("purge_idempotency_records", "--batch-size=1", stdout=out)
+
+        self.assertEqual(list(IdempotencyRecord.objects.values_list("key", flat=True)), ["live"])
+        self.assertIn("Deleted 1 expired", out.getvalue())
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from gateways.paystack.models import PaystackTransaction
+
+
+class TestTransactionListing(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("finance", is_staff=True))
+        self.list_url = reverse("paystack-payment-list")
+        self.export_url = reverse("paystack-payment-export")
+
+        now = timezone.now()
+        self.transactions = []
+        for i in range(7):
+            transaction_obj = baker.make(
+                PaystackTransaction,
+                status="success" if i % 2 else "failed",
+                customer_email="finance@email.com" if i < 3 else "other@email.com",
+                amount_minor=10000 * (i + 1),
+            )
+            # created_at is auto_now_add; spread rows out in time, with two sharing a timestamp.
+            PaystackTransaction.objects.filter(pk=transaction_obj.pk).update(
+                created_at=now - timedelta(minutes=min(i, 5))
+            )
+            self.transactions.append(transaction_obj)
+
+    def references(self, rows):
+        return [row["reference"] for row in rows]
+
+    def test_pages_cover_every_transaction_once_newest_first(self):
+        references, cursor = [], None
+        while True:
+            params = {"page_size": 2, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get(self.list_url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            references += self.references(response.data["results"])
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+
+        expected = PaystackTransaction.objects.order_by("-created_at", "-id").values_list("reference", flat=True)
+        self.assertEqual(references, list(expected))
+
+    def test_filters(self):
+        response = self.client.get(
+            self.list_url, {"status": "success", "email": "other@email.com", "amount_min": 400, "amount_max": 600}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(self.references(response.data["results"])),
+            {self.transactions[3].reference, self.transactions[5].reference},
+        )
+        self.assertEqual({row["amount"] for row in response.data["results"]}, {"400.00", "600.00"})
+
+    def test_created_range_filter(self):
+        created_after = (timezone.now() - timedelta(minutes=1, seconds=30)).isoformat()
+
+        response = self.client.get(self.list_url, {"created_after": created_after})
+
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_invalid_parameters_return_400(self):
+        for params in (
+            {"status": "unknown"},
+            {"page_size": 0},
+            {"cursor": "not-a-cursor"},
+            {"currency": "XOF", "amount_min": "1.50"},
+        ):
+            response = self.client.get(self.list_url, params)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_csv_export(self):
+        response = self.client.get(self.export_url, {"status": "failed"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({row["status"] for row in rows}, {"failed"})
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.export_url, {"output": "ndjson", "email": "finance@email.com"})
+
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]["customer_email"], "finance@email.com")
+        self.assertEqual((lines[0]["amount_minor"], lines[0]["currency"]), (30000, "NGN"))
+
+    def test_unknown_export_format_returns_400(self):
+        response = self.client.get(self.export_url, {"output": "xlsx"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_listing_and_export_need_an_api_key_or_a_staff_account(self):
+        anonymous = APIClient()
+        non_staff = APIClient()
+        non_staff.force_authenticate(get_user_model().objects.create_user("customer"))
+
+        for client in (anonymous, non_staff):
+            for url in (self.list_url, self.export_url):
+                self.assertEqual(client.get(url).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,114 @@
+import logging
+from unittest.mock import MagicMock
+
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.test import APIClient, APITestCase
+
+from core.logging_formatter import CustomJsonFormatter
+from core.metrics import Registry, request_timings
+from gateways.common.money import Money
+from gateways.paystack.metrics import upstream_errors, upstream_latency
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.utils import PaystackPaymentGateway
+
+
+class TestRegistry(SimpleTestCase):
+    def test_histogram_is_rendered_with_cumulative_buckets(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ["endpoint"], buckets=(0.1, 1.0))
+        histogram.observe(0.05, endpoint="verify")
+        histogram.observe(0.5, endpoint="verify")
+
+        output = registry.render()
+
+        self.assertIn("# TYPE latency_seconds histogram", output)
+        self.assertIn('latency_seconds_bucket{endpoint="verify",le="0.1"} 1', output)
+        self.assertIn('latency_seconds_bucket{endpoint="verify",le="1.0"} 2', output)
+        self.assertIn('latency_seconds_bucket{endpoint="verify",le="+Inf"} 2', output)
+        self.assertIn('latency_seconds_count{endpoint="verify"} 2', output)
+
+    def test_counter_labels_are_escaped(self):
+        registry = Registry()
+        registry.counter("errors_total", "Errors.", ["type"]).inc(type='say "hi"')
+
+        self.assertIn('errors_total{type="say \\"hi\\""} 1', registry.render())
+
+
+@override_settings(PAYSTACK_RETRY_ATTEMPTS=0)
+class TestGatewayMetrics(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = MagicMock()
+        self.gateway = PaystackPaymentGateway(session=self.session)
+
+    def test_successful_call_records_latency_by_endpoint_and_status(self):
+        before = upstream_latency.count(endpoint="verify", status=200)
+        self.session.get.return_value.status_code = 200
+
+        self.gateway.verify_payment("ref")
+
+        self.assertEqual(upstream_latency.count(endpoint="verify", status=200), before + 1)
+
+    def test_failed_call_records_error_type(self):
+        before = upstream_errors.value(endpoint="initialize", type="connection")
+        self.session.post.side_effect = requests.ConnectionError("Connection refused")
+
+        with self.assertRaises(Exception):
+            self.gateway.initialize_payment(Money(100000, "NGN"), "test@example.com")
+
+        self.assertEqual(upstream_errors.value(endpoint="initialize", type="connection"), before + 1)
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN="scrape-token")
+class TestRequestMetrics(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.transaction = baker.make(PaystackTransaction)
+
+    def test_request_timings_are_exposed_in_header_and_scrape_endpoint(self):
+        response = self.client.get(
+            reverse("paystack-payment-detail", kwargs={"reference": self.transaction.reference})
+        )
+        metrics = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token")
+
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("serialize;dur=", response["Server-Timing"])
+        self.assertEqual(metrics.status_code, 200)
+        self.assertIn(
+            'http_request_duration_seconds_count{view="paystack-payment-detail",method="GET"', metrics.content.decode()
+        )
+        self.assertIn("http_request_db_queries_bucket", metrics.content.decode())
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_scrape_endpoint_can_be_disabled(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+
+    def test_scrape_endpoint_rejects_anonymous_callers_and_wrong_tokens(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        self.assertEqual(self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong-token").status_code, 401)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_scrape_endpoint_is_served_to_staff_users(self):
+        self.client.force_login(baker.make(User, is_staff=True))
+
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+
+class TestTimingLogFields(SimpleTestCase):
+    def test_formatter_adds_request_timings_in_milliseconds(self):
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+        token = request_timings.set({"db_seconds": 0.0125, "db_queries": 3})
+        try:
+            log_record = {}
+            CustomJsonFormatter().add_fields(log_record, record, {})
+        finally:
+            request_timings.reset(token)
+
+        self.assertEqual(log_record["db_ms"], 12.5)
+        self.assertEqual(log_record["db_queries"], 3)
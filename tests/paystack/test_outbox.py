@@ -0,0 +1,161 @@
+import hashlib
+import hmac
+import io
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from model_bakery import baker
+
+from gateways.common.models import Tenant
+from gateways.paystack.enums import OutboxEventStatus, PaystackPaymentStatus
+from gateways.paystack.models import OutboxEvent, PaystackTransaction
+from gateways.paystack.outbox import HttpOutboxSink, InMemoryOutboxSink, OutboxRelay
+from gateways.paystack.services import record_verification
+
+
+def verification(status):
+    return {
+        "status": status,
+        "amount_minor": 25000,
+        "email": "customer@email.com",
+        "name": "Test User",
+        "currency": "NGN",
+    }
+
+
+@override_settings(PAYSTACK_OUTBOX_ENABLED=True, PAYSTACK_OUTBOX_MAX_ATTEMPTS=2, PAYSTACK_OUTBOX_BACKOFF=0)
+class TestOutbox(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.sink = InMemoryOutboxSink()
+
+    def make_event(self, reference, status, created_at=None):
+        event = baker.make(OutboxEvent, event=f"transaction.{status}", reference=reference, payload={"status": status})
+        if created_at:
+            OutboxEvent.objects.filter(pk=event.pk).update(created_at=created_at)
+        return event
+
+    def test_status_change_writes_event_in_same_transaction(self):
+        baker.make(PaystackTransaction, reference="ref_1", status=PaystackPaymentStatus.PENDING, amount_minor=25000)
+
+        record_verification("ref_1", verification("success"))
+        record_verification("ref_1", verification("failed"))
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event, "transaction.success")
+        self.assertEqual(
+            event.payload,
+            {
+                "reference": "ref_1",
+                "status": "success",
+                "amount": "250.00",
+                "amount_minor": 25000,
+                "currency": "NGN",
+                "tenant": None,
+            },
+        )
+
+    def test_event_names_the_tenant_that_owns_the_transaction(self):
+        tenant = baker.make(Tenant)
+        baker.make(
+            PaystackTransaction,
+            reference="ref_1",
+            status=PaystackPaymentStatus.PENDING,
+            amount_minor=25000,
+            tenant=tenant,
+        )
+
+        record_verification("ref_1", verification("success"))
+
+        self.assertEqual(OutboxEvent.objects.get().payload["tenant"], str(tenant.id))
+
+    def test_failed_write_leaves_no_event(self):
+        baker.make(PaystackTransaction, reference="ref_1", status=PaystackPaymentStatus.PENDING, amount_minor=25000)
+
+        with patch("gateways.paystack.services.apply_rollup_deltas", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                record_verification("ref_1", verification("success"))
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    @override_settings(PAYSTACK_OUTBOX_ENABLED=False)
+    def test_disabled_outbox_writes_nothing(self):
+        baker.make(PaystackTransaction, reference="ref_1", status=PaystackPaymentStatus.PENDING, amount_minor=25000)
+        record_verification("ref_1", verification("success"))
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_events_are_published_in_order_per_reference(self):
+        now = timezone.now()
+        first = self.make_event("ref_1", "abandoned", now - timedelta(seconds=2))
+        second = self.make_event("ref_1", "success", now - timedelta(seconds=1))
+        other = self.make_event("ref_2", "failed", now)
+        relay = OutboxRelay(self.sink, concurrency=4)
+
+        self.assertEqual(relay.run_once(), 2)
+        self.assertCountEqual([event.pk for event in self.sink.sent], [first.pk, other.pk])
+        self.assertEqual(relay.run_once(), 1)
+        self.assertEqual(self.sink.sent[-1].pk, second.pk)
+        self.assertEqual(relay.run_once(), 0)
+        self.assertEqual(OutboxEvent.objects.filter(status=OutboxEventStatus.DELIVERED).count(), 3)
+
+    def test_failed_delivery_is_retried_and_holds_back_later_events(self):
+        now = timezone.now()
+        first = self.make_event("ref_1", "abandoned", now - timedelta(seconds=1))
+        self.make_event("ref_1", "success", now)
+        self.sink.failing.add("ref_1")
+        relay = OutboxRelay(self.sink)
+
+        self.assertEqual(relay.run_once(), 1)
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), (OutboxEventStatus.PENDING, 1))
+        self.assertIn("failed", first.last_error)
+
+        self.assertEqual(relay.run_once(), 1)
+        first.refresh_from_db()
+        self.assertEqual(first.status, OutboxEventStatus.FAILED)
+        self.assertEqual(relay.failed, 1)
+
+        self.sink.failing.clear()
+        self.assertEqual(relay.run_once(), 1)
+        self.assertEqual(self.sink.sent[0].event, "transaction.success")
+
+    def test_stale_claims_are_redelivered(self):
+        event = self.make_event("ref_1", "success")
+        OutboxEvent.objects.filter(pk=event.pk).update(
+            status=OutboxEventStatus.PROCESSING, updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        OutboxRelay(self.sink).run_once()
+
+        self.assertEqual([sent.pk for sent in self.sink.sent], [event.pk])
+
+    def test_http_sink_signs_body(self):
+        session = MagicMock()
+        session.post.return_value.status_code = 200
+        event = self.make_event("ref_1", "success")
+
+        HttpOutboxSink(url="https://merchant.example/hooks", secret="secret", session=session).send(event)
+
+        kwargs = session.post.call_args.kwargs
+        self.assertEqual(json.loads(kwargs["data"])["id"], str(event.pk))
+        expected = hmac.new(b"secret", kwargs["data"], hashlib.sha512).hexdigest()
+        self.assertEqual(kwargs["headers"]["x-outbox-signature"], expected)
+
+
+@override_settings(PAYSTACK_OUTBOX_ENABLED=True, PAYSTACK_OUTBOX_MAX_ATTEMPTS=2, PAYSTACK_OUTBOX_BACKOFF=0)
+class TestRelayOutboxCommand(TransactionTestCase):
+    @override_settings(PAYSTACK_OUTBOX_SINK="gateways.paystack.outbox.InMemoryOutboxSink")
+    def test_command_publishes_due_events(self):
+        baker.make(OutboxEvent, event="transaction.success", reference="ref_1", payload={"status": "success"})
+        sink = InMemoryOutboxSink()
+        out = io.StringIO()
+        with patch("gateways.paystack.outbox._sink", sink):
+            call_command("relay_outbox_events", "--once", stdout=out)
+
+        self.assertIn("Delivered 1 outbox events", out.getvalue())
+        self.assertEqual([event.reference for event in sink.sent], ["ref_1"])
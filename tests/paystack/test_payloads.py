@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from gateways.paystack.payloads import VerificationData
+
+
+class TestVerificationData(TestCase):
+    def test_fields_are_read_from_the_response(self):
+        data = VerificationData.from_response(
+            {
+                "data": {
+                    "status": "success",
+                    "customer": {"email": "customer@email.com"},
+                    "metadata": {"name": "Test User"},
+                    "amount": 25000,
+                    "currency": "GHS",
+                    "gateway_response": "Approved",
+                }
+            }
+        )
+
+        self.assertEqual(
+            data, VerificationData("success", "customer@email.com", "Test User", 25000, "GHS", "Approved")
+        )
+
+    def test_empty_metadata_and_customer_are_tolerated(self):
+        for empty in ("", None):
+            with self.subTest(empty=empty):
+                data = VerificationData.from_response(
+                    {"data": {"status": "success", "amount": 25000, "metadata": empty, "customer": empty}}
+                )
+
+                self.assertEqual((data.email, data.name, data.currency), (None, None, "NGN"))
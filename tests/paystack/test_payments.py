@@ -1,17 +1,30 @@
+import json
+import threading
+import time
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from model_bakery import baker
 from rest_framework import status
-from rest_framework.test import APIClient, APITestCase
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
 
+from core.log_context import get_log_context
+from gateways.common.models import Tenant
+from gateways.common.money import Money
+from gateways.common.tenants import get_current_tenant, issue_api_key
 from gateways.paystack.exceptions import PaymentErrorException
 from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.services import record_verification
 
 
 class PaystackBaseTestSetUp(APITestCase):
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
 
         self.transaction = baker.make(PaystackTransaction)
@@ -49,13 +62,31 @@ class TestMakePaystackPayment(PaystackBaseTestSetUp):
         response = self.client.post(self.payment_url, self.payment_data)
 
         mock_initialize_payment.assert_called_once_with(
-            amount=self.payment_data["amount"],
+            money=Money(100000, "NGN"),
             email=self.payment_data["email"],
             metadata={"name": self.payment_data["name"]},
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("authorization_url", response.data["data"])
         self.assertEqual(response.data["status"], True)
+        transaction_obj = PaystackTransaction.objects.get(reference="ref_12345")
+        self.assertEqual(transaction_obj.status, "pending")
+        self.assertEqual(transaction_obj.access_code, "access_12345")
+        self.assertEqual(transaction_obj.customer_email, self.payment_data["email"])
+        self.assertEqual(transaction_obj.money, Money(100000, "NGN"))
+
+    @patch("gateways.paystack.views.PaystackPaymentGateway.initialize_payment")
+    def test_make_payment_in_another_currency(self, mock_initialize_payment):
+        mock_initialize_payment.return_value = {"status": True, "data": {"reference": "ref_ghs", "access_code": "c"}}
+
+        response = self.client.post(self.payment_url, {**self.payment_data, "currency": "GHS"})
+        invalid = self.client.post(self.payment_url, {**self.payment_data, "currency": "cedi"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_initialize_payment.call_args.kwargs["money"], Money(100000, "GHS"))
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_ghs").money, Money(100000, "GHS"))
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("currency", invalid.data)
 
     @patch("gateways.paystack.views.PaystackPaymentGateway.initialize_payment")
     def test_make_payment_failure(self, mock_initialize_payment):
@@ -89,6 +120,108 @@ class TestMakePaystackPayment(PaystackBaseTestSetUp):
         self.assertIn("This field may not be blank.", str(response.data["name"]))
 
 
+class TestBatchPaystackPayment(APITransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.batch_url = reverse("paystack-payment-batch")
+
+    def stream(self, response):
+        return sorted(
+            (json.loads(line) for line in b"".join(response.streaming_content).splitlines()),
+            key=lambda line: line["index"],
+        )
+
+    @patch("gateways.paystack.views.PaystackPaymentGateway.initialize_payment")
+    def test_batch_streams_a_result_per_item(self, mock_initialize_payment):
+        def initialize(money, email, metadata):
+            if email == "fail@email.com":
+                raise PaymentErrorException("Declined")
+            return {"status": True, "data": {"reference": email, "access_code": "code"}}
+
+        mock_initialize_payment.side_effect = initialize
+        payments = [
+            {"name": "One", "email": "one@email.com", "amount": 100},
+            {"name": "Two", "email": "invalid-email", "amount": 100},
+            {"name": "Three", "email": "fail@email.com", "amount": 100},
+            {"name": "Four", "email": "four@email.com", "amount": 100},
+        ]
+
+        response = self.client.post(self.batch_url, payments, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        results = self.stream(response)
+        self.assertEqual([result["status"] for result in results], [200, 400, 400, 200])
+        self.assertEqual(results[0]["data"]["data"]["reference"], "one@email.com")
+        self.assertIn("email", results[1]["error"])
+        self.assertEqual(results[2]["error"], "Declined")
+        self.assertEqual(mock_initialize_payment.call_count, 3)
+        self.assertEqual(
+            set(PaystackTransaction.objects.values_list("reference", flat=True)), {"one@email.com", "four@email.com"}
+        )
+
+    @patch("gateways.paystack.views.PaystackPaymentGateway.initialize_payment")
+    def test_batch_payments_run_in_the_requests_context(self, mock_initialize_payment):
+        tenant = Tenant.objects.create(name="acme", paystack_secret_key="sk_acme")
+        seen = []
+
+        def initialize(money, email, metadata):
+            context = get_log_context()
+            seen.append((get_current_tenant().name, context["request_id"], context["batch_index"]))
+            self.assertTrue(threading.current_thread().name.startswith("paystack-batch"))
+            return {"status": True, "data": {"reference": email, "access_code": "code"}}
+
+        mock_initialize_payment.side_effect = initialize
+        payments = [{"name": "One", "email": "one@email.com", "amount": 100}]
+
+        response = self.client.post(
+            self.batch_url, payments, format="json", HTTP_X_API_KEY=issue_api_key(tenant), HTTP_X_REQUEST_ID="req-1"
+        )
+
+        self.assertEqual([result["status"] for result in self.stream(response)], [200])
+        self.assertEqual(seen, [("acme", "req-1", 0)])
+        self.assertEqual(PaystackTransaction.objects.get(reference="one@email.com").tenant_id, tenant.id)
+
+    @override_settings(PAYSTACK_BATCH_CONCURRENCY=1)
+    @patch("gateways.paystack.views.PaystackPaymentGateway.initialize_payment")
+    def test_closing_the_stream_cancels_queued_payments_and_stores_running_ones(self, mock_initialize_payment):
+        called, running = [], []
+
+        def initialize(money, email, metadata):
+            called.append(email)
+            running.append(email)
+            if email != "one@email.com":
+                time.sleep(0.2)
+            running.remove(email)
+            return {"status": True, "data": {"reference": email, "access_code": "code"}}
+
+        mock_initialize_payment.side_effect = initialize
+        payments = [{"name": "One", "email": f"{name}@email.com", "amount": 100} for name in ("one", "two", "three")]
+
+        response = self.client.post(self.batch_url, payments, format="json")
+        next(iter(response.streaming_content))
+        response.close()
+
+        self.assertEqual(running, [])
+        self.assertNotIn("three@email.com", called)
+        self.assertEqual(set(PaystackTransaction.objects.values_list("reference", flat=True)), set(called))
+
+    def test_batch_must_be_a_non_empty_list(self):
+        for payload in ([], {"name": "One", "email": "one@email.com", "amount": 100}):
+            response = self.client.post(self.batch_url, payload, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PAYSTACK_BATCH_MAX_SIZE=2)
+    def test_batch_size_is_limited(self):
+        payments = [{"name": "One", "email": "one@email.com", "amount": 100}] * 3
+
+        response = self.client.post(self.batch_url, payments, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class TestRetrievePaystackTransaction(PaystackBaseTestSetUp):
     def setUp(self):
         super().setUp()
@@ -118,7 +251,7 @@ class TestVerifyPaystackPayment(PaystackBaseTestSetUp):
                 "status": "success",
                 "customer": {"email": "test@email.com"},
                 "metadata": {"name": "Test User"},
-                "amount": self.transaction.amount * 100,
+                "amount": self.transaction.amount_minor,
                 "gateway_response": "Payment successful",
             }
         }
@@ -137,7 +270,7 @@ class TestVerifyPaystackPayment(PaystackBaseTestSetUp):
                 "status": "failed",
                 "customer": {"email": "test1@email.com"},
                 "metadata": {"name": "Test User 1"},
-                "amount": self.transaction.amount * 100,
+                "amount": self.transaction.amount_minor,
                 "gateway_response": "Payment failed",
             }
         }
@@ -159,3 +292,34 @@ class TestVerifyPaystackPayment(PaystackBaseTestSetUp):
         self.assertIn("error", response.data)
         self.assertEqual(response.data["error"], "Verification failed")
         self.assertEqual(PaystackTransaction.objects.count(), self.current_count)
+
+    def transaction_statements(self, reference, status):
+        data = {"status": status, "email": "", "name": "", "amount_minor": 100}
+        with CaptureQueriesContext(connection) as queries:
+            record_verification(reference, data)
+        return [query["sql"].split()[0] for query in queries if "paystack_paystacktransaction" in query["sql"]]
+
+    def test_verify_changes_the_status_with_one_statement(self):
+        for old_status, new_status in [("pending", "failed"), ("failed", "success"), ("abandoned", "success")]:
+            with self.subTest(old_status=old_status, new_status=new_status):
+                transaction_obj = baker.make(PaystackTransaction, status=old_status, amount_minor=100)
+
+                self.assertEqual(self.transaction_statements(transaction_obj.reference, new_status), ["UPDATE"])
+
+                transaction_obj.refresh_from_db()
+                self.assertEqual(transaction_obj.status, new_status)
+
+    def test_verify_inserts_unknown_successful_payments_after_one_update(self):
+        self.assertEqual(self.transaction_statements("unknown", "success"), ["UPDATE", "INSERT"])
+        self.assertEqual(PaystackTransaction.objects.get(reference="unknown").status, "success")
+
+        self.assertEqual(self.transaction_statements("unknown-failed", "failed"), ["UPDATE"])
+        self.assertFalse(PaystackTransaction.objects.filter(reference="unknown-failed").exists())
+
+    def test_verify_never_downgrades_a_successful_transaction(self):
+        paid = baker.make(PaystackTransaction, status="success")
+
+        record_verification(paid.reference, {"status": "failed", "email": "", "name": "", "amount_minor": 100})
+
+        paid.refresh_from_db()
+        self.assertEqual(paid.status, "success")
@@ -0,0 +1,130 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from model_bakery import baker
+
+from gateways.common.money import Money
+from gateways.paystack.enums import PaystackPaymentStatus
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.polling import PollScheduler
+from gateways.paystack.services import record_initialization, record_verification
+from tests.paystack.test_reconciliation import FakeGateway
+
+
+@override_settings(PAYSTACK_POLL_SCHEDULE=[30, 120, 600, 3600], PAYSTACK_POLL_LEASE=300)
+class TestPollScheduler(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.due = timezone.now() - timedelta(seconds=1)
+
+    def make_pending(self, reference, next_poll_at=None, poll_attempts=0):
+        return baker.make(
+            PaystackTransaction,
+            reference=reference,
+            status=PaystackPaymentStatus.PENDING,
+            amount_minor=100,
+            next_poll_at=next_poll_at or self.due,
+            poll_attempts=poll_attempts,
+        )
+
+    def refresh(self, reference):
+        return PaystackTransaction.objects.get(reference=reference)
+
+    def test_initialization_schedules_first_poll(self):
+        before = timezone.now()
+        record_initialization(
+            {"data": {"reference": "ref_new", "access_code": "code"}},
+            {"amount": 100, "money": Money(10000, "NGN"), "name": "Test User", "email": "customer@email.com"},
+        )
+
+        transaction_obj = self.refresh("ref_new")
+        self.assertEqual(transaction_obj.poll_attempts, 0)
+        self.assertGreaterEqual(transaction_obj.next_poll_at, before + timedelta(seconds=30))
+        self.assertLessEqual(transaction_obj.next_poll_at, timezone.now() + timedelta(seconds=30))
+
+    def test_due_transactions_are_verified_and_rescheduled_until_settled(self):
+        self.make_pending("ref_paid")
+        self.make_pending("ref_open")
+        self.make_pending("ref_later", next_poll_at=timezone.now() + timedelta(minutes=5))
+        gateway = FakeGateway({"ref_paid": "success", "ref_open": "abandoned", "ref_later": "success"})
+
+        polled = PollScheduler(gateway).tick()
+
+        self.assertEqual(polled, 2)
+        self.assertCountEqual(gateway.calls, ["ref_paid", "ref_open"])
+        paid, still_open = self.refresh("ref_paid"), self.refresh("ref_open")
+        self.assertEqual(paid.status, PaystackPaymentStatus.SUCCESS)
+        self.assertIsNone(paid.next_poll_at)
+        self.assertEqual(still_open.status, PaystackPaymentStatus.ABANDONED)
+        self.assertEqual(still_open.poll_attempts, 1)
+        self.assertAlmostEqual((still_open.next_poll_at - timezone.now()).total_seconds(), 120, delta=5)
+
+    def test_polling_stops_when_schedule_is_exhausted(self):
+        self.make_pending("ref_stuck", poll_attempts=3)
+        scheduler = PollScheduler(FakeGateway({}))
+
+        scheduler.tick()
+
+        transaction_obj = self.refresh("ref_stuck")
+        self.assertIsNone(transaction_obj.next_poll_at)
+        self.assertEqual(transaction_obj.poll_attempts, 4)
+        self.assertEqual(scheduler.report.errors, 1)
+        self.assertEqual(scheduler.report.expired, 1)
+
+    def test_transaction_settled_during_the_lease_is_not_rescheduled(self):
+        self.make_pending("ref_1")
+        scheduler = PollScheduler(FakeGateway({"ref_1": "abandoned"}))
+        claim = scheduler.claim
+
+        def claim_then_settle():
+            rows = claim()
+            record_verification("ref_1", {"status": "success", "amount_minor": 100, "email": "", "name": ""})
+            return rows
+
+        with patch.object(scheduler, "claim", side_effect=claim_then_settle):
+            scheduler.tick()
+
+        transaction_obj = self.refresh("ref_1")
+        self.assertEqual(transaction_obj.status, PaystackPaymentStatus.SUCCESS)
+        self.assertIsNone(transaction_obj.next_poll_at)
+
+    def test_claimed_transactions_are_leased(self):
+        self.make_pending("ref_1")
+        scheduler = PollScheduler(FakeGateway({}), batch_size=10)
+
+        self.assertEqual([reference for _, reference, _, _ in scheduler.claim()], ["ref_1"])
+        self.assertEqual(scheduler.claim(), [])
+        self.assertGreater(self.refresh("ref_1").next_poll_at, timezone.now() + timedelta(seconds=290))
+
+    def test_settling_elsewhere_stops_polling(self):
+        self.make_pending("ref_1")
+        record_verification("ref_1", {"status": "failed", "amount_minor": 100, "email": "", "name": ""})
+
+        self.assertIsNone(self.refresh("ref_1").next_poll_at)
+
+
+@override_settings(PAYSTACK_POLL_SCHEDULE=[30, 120, 600, 3600], PAYSTACK_POLL_LEASE=300)
+class TestPollCommand(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_command_polls_due_transactions_once(self):
+        baker.make(
+            PaystackTransaction,
+            reference="ref_1",
+            status=PaystackPaymentStatus.PENDING,
+            amount_minor=100,
+            next_poll_at=timezone.now() - timedelta(seconds=1),
+        )
+        out = io.StringIO()
+        with patch("gateways.paystack.management.commands.poll_paystack_transactions.PaystackPaymentGateway") as cls:
+            cls.return_value = FakeGateway({"ref_1": "success"})
+            call_command("poll_paystack_transactions", "--once", stdout=out)
+
+        self.assertIn("polled=1 settled=1", out.getvalue())
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_1").status, PaystackPaymentStatus.SUCCESS)
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import unittest
+import uuid
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from gateways.paystack.exceptions import PaymentRateLimitedException
+from gateways.paystack.ratelimit import (
+    FAIL,
+    QUEUE,
+    WAIT,
+    LocalTokenBucketStore,
+    RateLimiter,
+    RedisTokenBucketStore,
+    TokenBucketStore,
+)
+from gateways.paystack.utils import PaystackPaymentGateway
+
+
+@override_settings(
+    PAYSTACK_RATE_LIMITS={"verify": (20, 2), "initialize": (0, 0)},
+    PAYSTACK_RATE_LIMIT_MAX_WAIT=1.0,
+)
+class TestRateLimiter(SimpleTestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(store=LocalTokenBucketStore())
+
+    def test_burst_is_allowed_then_fail_mode_rejects(self):
+        self.limiter.acquire("verify", FAIL)
+        self.limiter.acquire("verify", FAIL)
+
+        with self.assertRaises(PaymentRateLimitedException) as context:
+            self.limiter.acquire("verify", FAIL)
+
+        self.assertEqual(context.exception.status_code, 429)
+        self.assertGreater(context.exception.retry_after, 0)
+        self.assertEqual(self.limiter.stats["verify"]["rejected"], 1)
+
+    def test_wait_mode_blocks_until_a_token_is_free(self):
+        for _ in range(3):
+            self.limiter.acquire("verify", WAIT)
+
+        self.assertEqual(self.limiter.stats["verify"]["throttled"], 1)
+        self.assertGreater(self.limiter.stats["verify"]["throttled_seconds"], 0)
+
+    def test_queue_mode_reserves_consecutive_slots(self):
+        store = self.limiter.store
+        for _ in range(2):
+            store.take("bucket", 20, 2, 0)
+
+        first = store.take("bucket", 20, 2, 1.0)
+        second = store.take("bucket", 20, 2, 1.0)
+
+        self.assertAlmostEqual(second - first, 0.05, places=2)
+
+    @override_settings(PAYSTACK_RATE_LIMIT_MAX_WAIT=0.01)
+    def test_queue_mode_rejects_when_slot_is_beyond_max_wait(self):
+        self.limiter.acquire("verify", QUEUE)
+        self.limiter.acquire("verify", QUEUE)
+
+        with self.assertRaises(PaymentRateLimitedException):
+            self.limiter.acquire("verify", QUEUE)
+
+    def test_budgets_are_independent_and_zero_rate_is_unlimited(self):
+        for _ in range(2):
+            self.limiter.acquire("verify", FAIL)
+
+        for _ in range(100):
+            self.limiter.acquire("initialize", FAIL)
+
+    def test_async_acquire_waits(self):
+        async def main():
+            for _ in range(3):
+                await self.limiter.aacquire("verify", WAIT)
+
+        asyncio.run(main())
+
+        self.assertEqual(self.limiter.stats["verify"]["throttled"], 1)
+
+    def test_async_acquire_never_calls_the_blocking_store(self):
+        class AsyncOnlyStore(TokenBucketStore):
+            def __init__(self):
+                self.buckets = LocalTokenBucketStore()
+
+            async def atake(self, *args):
+                return self.buckets.take(*args)
+
+        limiter = RateLimiter(store=AsyncOnlyStore())
+
+        async def main():
+            for _ in range(3):
+                await limiter.aacquire("verify", WAIT)
+
+        asyncio.run(main())
+
+        self.assertEqual(limiter.stats["verify"]["throttled"], 1)
+
+    def test_gateway_fails_fast_without_calling_paystack(self):
+        session = MagicMock()
+        gateway = PaystackPaymentGateway(session=session, rate_limit_mode=FAIL)
+        gateway.rate_limiter = self.limiter
+        for _ in range(2):
+            self.limiter.acquire("verify", FAIL)
+
+        with self.assertRaises(PaymentRateLimitedException):
+            gateway.verify_payment("ref")
+
+        session.get.assert_not_called()
+
+
+class TestRateLimitedResponses(APITestCase):
+    @patch("gateways.paystack.views.PaystackPaymentGateway.verify_payment")
+    def test_verify_returns_429_when_rate_limited(self, mock_verify_payment):
+        mock_verify_payment.side_effect = PaymentRateLimitedException("Rate limited", retry_after=0.2)
+
+        response = APIClient().get(reverse("paystack-verification-verify-payment", kwargs={"reference": "rl_ref"}))
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "1")
+
+
+@unittest.skipUnless(os.environ.get("TEST_REDIS_URL"), "set TEST_REDIS_URL to run the Redis token bucket script")
+class TestRedisTokenBucketStore(SimpleTestCase):
+    def setUp(self):
+        self.store = RedisTokenBucketStore(url=os.environ.get("TEST_REDIS_URL"))
+        self.key = f"test:{uuid.uuid4().hex}"
+
+    def test_burst_then_wait_then_reservation(self):
+        self.assertEqual(self.store.take(self.key, 20, 2, 0), 0)
+        self.assertEqual(self.store.take(self.key, 20, 2, 0), 0)
+
+        wait = self.store.take(self.key, 20, 2, 0)
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 0.05)
+
+        first = self.store.take(self.key, 20, 2, 1.0)
+        second = self.store.take(self.key, 20, 2, 1.0)
+        self.assertAlmostEqual(second - first, 0.05, places=2)
+
+    def test_async_take_shares_the_bucket(self):
+        async def main():
+            return [await self.store.atake(self.key, 20, 1, 0) for _ in range(2)]
+
+        self.assertEqual(self.store.take(self.key, 20, 1, 0), 0)
+        self.assertTrue(all(wait > 0 for wait in asyncio.run(main())))
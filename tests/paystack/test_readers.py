@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import serializers
+from rest_framework.test import APIClient, APITestCase
+
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.readers import CompiledReadSerializer, transaction_reader
+from gateways.paystack.serializers import PaystackTransactionSerializer
+
+
+class TestCompiledReadSerializer(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("finance", is_staff=True))
+        now = timezone.now()
+        for i, (amount_minor, currency) in enumerate([(100, "NGN"), (50, "NGN"), (1234567899, "USD"), (40010, "XOF")]):
+            transaction_obj = baker.make(
+                PaystackTransaction, amount_minor=amount_minor, currency=currency, customer_name=f"Adéọlá {i}"
+            )
+            PaystackTransaction.objects.filter(pk=transaction_obj.pk).update(
+                created_at=now - timedelta(minutes=i, microseconds=i)
+            )
+
+    def test_output_matches_model_serializer(self):
+        queryset = PaystackTransaction.objects.order_by("-created_at")
+        expected = PaystackTransactionSerializer(queryset, many=True).data
+        self.assertEqual(transaction_reader.many(transaction_reader.values(queryset)), expected)
+
+        with timezone.override("Africa/Lagos"):
+            expected = PaystackTransactionSerializer(queryset, many=True).data
+            self.assertEqual(transaction_reader.many(transaction_reader.values(queryset)), expected)
+
+    def test_endpoints_render_identical_bytes(self):
+        reference = PaystackTransaction.objects.first().reference
+        requests = [
+            (reverse("paystack-payment-list"), {"page_size": 3}),
+            (reverse("paystack-payment-detail", kwargs={"reference": reference}), {}),
+        ]
+        for url, params in requests:
+            cache.clear()
+            default = self.client.get(url, params)
+            cache.clear()
+            with override_settings(PAYSTACK_COMPILED_SERIALIZER_ENDPOINTS=["list", "retrieve"]):
+                compiled = self.client.get(url, params)
+            self.assertEqual(compiled.status_code, 200)
+            self.assertEqual(compiled.content, default.content)
+
+    def test_compiled_list_pages_with_cursor(self):
+        list_url = reverse("paystack-payment-list")
+        with override_settings(PAYSTACK_COMPILED_SERIALIZER_ENDPOINTS=["list"]):
+            first = self.client.get(list_url, {"page_size": 3})
+            second = self.client.get(list_url, {"page_size": 3, "cursor": first.data["next_cursor"]})
+
+        self.assertEqual(len(first.data["results"]), 3)
+        self.assertEqual(len(second.data["results"]), 1)
+        self.assertIsNone(second.data["next_cursor"])
+
+    def test_rejects_fields_not_backed_by_a_column(self):
+        class NestedSerializer(PaystackTransactionSerializer):
+            summary = serializers.SerializerMethodField()
+
+            def get_summary(self, obj):
+                return obj.reference
+
+        with self.assertRaises(ImproperlyConfigured):
+            CompiledReadSerializer(NestedSerializer).plan
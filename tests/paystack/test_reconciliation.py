@@ -0,0 +1,158 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from gateways.common.models import Tenant
+from gateways.common.tenants import get_current_tenant, tenant_resolver
+from gateways.paystack.enums import PaystackPaymentStatus
+from gateways.paystack.exceptions import PaymentErrorException
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.reconciliation import Reconciler
+
+
+class FakeGateway:
+    def __init__(self, statuses, throttle_once=()):
+        self.statuses = statuses
+        self.throttle_once = set(throttle_once)
+        self.calls = []
+        self.tenants = {}
+
+    def verify_payment(self, reference):
+        self.calls.append(reference)
+        self.tenants[reference] = get_current_tenant()
+        if reference in self.throttle_once:
+            self.throttle_once.discard(reference)
+            raise PaymentErrorException("Too many requests", status_code=429, retry_after=0)
+        status = self.statuses.get(reference)
+        if status is None:
+            raise PaymentErrorException("Transaction reference not found", status_code=404)
+        return {
+            "data": {
+                "status": status,
+                "amount": 250000,
+                "customer": {"email": "customer@email.com"},
+                "metadata": {"name": "Test User"},
+                "gateway_response": status,
+            }
+        }
+
+
+class TestReconciler(TransactionTestCase):
+    def setUp(self):
+        self.checkpoint = Path(tempfile.mkdtemp()) / "checkpoint"
+        for reference in ["ref_1", "ref_2", "ref_3", "ref_4"]:
+            baker.make(
+                PaystackTransaction, reference=reference, status=PaystackPaymentStatus.PENDING, amount_minor=250000
+            )
+        baker.make(
+            PaystackTransaction, reference="ref_done", status=PaystackPaymentStatus.SUCCESS, amount_minor=250000
+        )
+
+    def write_references(self, *references):
+        path = Path(tempfile.mkdtemp()) / "references.txt"
+        path.write_text("\n".join(references) + "\n")
+        return path
+
+    def test_pending_transactions_are_updated_in_bulk(self):
+        gateway = FakeGateway({"ref_1": "success", "ref_2": "failed", "ref_3": "ongoing"}, throttle_once=["ref_1"])
+        reconciler = Reconciler(gateway, concurrency=2, chunk_size=2, checkpoint_path=self.checkpoint)
+
+        report = reconciler.run(reconciler.pending_references())
+
+        self.assertEqual(report.processed, 4)
+        self.assertEqual(report.updated, 2)
+        self.assertEqual(report.errors, 1)
+        self.assertEqual(report.throttled, 1)
+        self.assertNotIn("ref_done", gateway.calls)
+        statuses = dict(PaystackTransaction.objects.values_list("reference", "status"))
+        self.assertEqual(statuses["ref_1"], "success")
+        self.assertEqual(statuses["ref_2"], "failed")
+        self.assertEqual(statuses["ref_3"], "pending")
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_1").amount_minor, 250000)
+
+    def test_run_resumes_from_checkpoint(self):
+        first = Reconciler(FakeGateway({}), chunk_size=2, checkpoint_path=self.checkpoint)
+        first.run(first.pending_references(limit=2))
+
+        gateway = FakeGateway({})
+        second = Reconciler(gateway, chunk_size=2, checkpoint_path=self.checkpoint)
+        second.run(second.pending_references())
+
+        self.assertEqual(len(gateway.calls), 2)
+        self.assertEqual(set(first.gateway.calls) & set(gateway.calls), set())
+
+    def test_references_file_creates_missing_transactions(self):
+        references = Path(tempfile.mkdtemp()) / "references.txt"
+        references.write_text("ref_1\nref_missing\n\n")
+        reconciler = Reconciler(FakeGateway({"ref_1": "success", "ref_missing": "success"}))
+
+        report = reconciler.run(reconciler.file_references(references))
+
+        self.assertEqual((report.updated, report.created), (1, 1))
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_missing").customer_email, "customer@email.com")
+
+    def test_command_reports_progress(self):
+        stdout = io.StringIO()
+        with patch(
+            "gateways.paystack.management.commands.reconcile_paystack_transactions.PaystackPaymentGateway",
+            return_value=FakeGateway({"ref_1": "success"}),
+        ):
+            call_command("reconcile_paystack_transactions", "--chunk-size=10", stdout=stdout)
+
+        self.assertIn("Reconciliation finished: processed=4 updated=1", stdout.getvalue())
+
+    def test_tenant_transactions_are_verified_with_the_tenants_key(self):
+        tenant_resolver.clear()
+        tenant = Tenant.objects.create(name="acme", paystack_secret_key="sk_acme")
+        PaystackTransaction.objects.filter(reference="ref_1").update(tenant=tenant)
+        gateway = FakeGateway({"ref_1": "success", "ref_2": "success"})
+        reconciler = Reconciler(gateway, chunk_size=10)
+
+        reconciler.run(reconciler.pending_references())
+
+        self.assertEqual(gateway.tenants["ref_1"].id, str(tenant.id))
+        self.assertIsNone(gateway.tenants["ref_2"])
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_1").status, "success")
+
+    def test_results_follow_the_verification_status_rules(self):
+        PaystackTransaction.objects.filter(reference="ref_1").update(status=PaystackPaymentStatus.FAILED)
+        PaystackTransaction.objects.filter(reference="ref_2").update(
+            status=PaystackPaymentStatus.ABANDONED, next_poll_at=timezone.now()
+        )
+        reconciler = Reconciler(FakeGateway({"ref_1": "success", "ref_2": "success", "ref_done": "failed"}))
+
+        reconciler.run(reconciler.file_references(self.write_references("ref_1", "ref_2", "ref_done")))
+
+        rows = {row.reference: row for row in PaystackTransaction.objects.all()}
+        self.assertEqual(rows["ref_1"].status, "success")
+        self.assertEqual(rows["ref_2"].status, "success")
+        self.assertIsNone(rows["ref_2"].next_poll_at)
+        self.assertEqual(rows["ref_done"].status, "success")
+
+    def test_abandoned_transactions_are_swept(self):
+        PaystackTransaction.objects.filter(reference="ref_1").update(status=PaystackPaymentStatus.ABANDONED)
+        gateway = FakeGateway({})
+        reconciler = Reconciler(gateway)
+
+        reconciler.run(reconciler.pending_references())
+
+        self.assertIn("ref_1", gateway.calls)
+
+    def test_checkpoints_are_kept_per_mode(self):
+        first = Reconciler(FakeGateway({}), chunk_size=2, checkpoint_path=self.checkpoint)
+        first.run(first.pending_references(limit=2))
+
+        gateway = FakeGateway({})
+        second = Reconciler(gateway, chunk_size=2, checkpoint_path=self.checkpoint)
+        second.run(second.file_references(self.write_references("ref_1", "ref_2")))
+        third = Reconciler(FakeGateway({}), chunk_size=2, checkpoint_path=self.checkpoint)
+        third.run(third.pending_references())
+
+        self.assertEqual(gateway.calls, ["ref_1", "ref_2"])
+        self.assertEqual(len(third.gateway.calls), 2)
@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from gateways.common.money import Money
+from gateways.paystack.exceptions import PaymentErrorException, PaymentServiceUnavailableException
+from gateways.paystack.utils import PaystackPaymentGateway, get_bulkhead
+
+
+def http_response(status_code, payload=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {}
+    response.json.return_value = payload or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status_code} Error", response=response)
+    return response
+
+
+@override_settings(
+    PAYSTACK_CIRCUIT_FAILURE_THRESHOLD=3,
+    PAYSTACK_CIRCUIT_RECOVERY_TIMEOUT=30,
+    PAYSTACK_RETRY_ATTEMPTS=2,
+    PAYSTACK_RETRY_BACKOFF=0,
+)
+class TestCircuitBreaker(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = MagicMock()
+        self.gateway = PaystackPaymentGateway(session=self.session)
+
+    def test_verify_is_retried_on_transient_errors(self):
+        self.session.get.side_effect = [http_response(502), http_response(200, {"status": True})]
+
+        self.assertEqual(self.gateway.verify_payment("ref"), {"status": True})
+        self.assertEqual(self.session.get.call_count, 2)
+
+    def test_initialize_is_never_retried(self):
+        self.session.post.return_value = http_response(502)
+
+        with self.assertRaises(PaymentErrorException):
+            self.gateway.initialize_payment(Money(100000, "NGN"), "test@example.com")
+
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_client_errors_do_not_trip_the_circuit(self):
+        self.session.post.return_value = http_response(400)
+
+        for _ in range(5):
+            with self.assertRaises(PaymentErrorException) as context:
+                self.gateway.initialize_payment(Money(100000, "NGN"), "test@example.com")
+            self.assertNotIsInstance(context.exception, PaymentServiceUnavailableException)
+
+    def test_circuit_opens_after_threshold_and_fails_fast(self):
+        self.session.post.side_effect = requests.ConnectionError("Connection refused")
+        for _ in range(3):
+            with self.assertRaises(PaymentErrorException):
+                self.gateway.initialize_payment(Money(100000, "NGN"), "test@example.com")
+
+        with self.assertRaises(PaymentServiceUnavailableException) as context:
+            self.gateway.initialize_payment(Money(100000, "NGN"), "test@example.com")
+
+        self.assertEqual(self.session.post.call_count, 3)
+        self.assertGreater(context.exception.retry_after, 0)
+        self.assertEqual(context.exception.status_code, 503)
+
+    @override_settings(PAYSTACK_CIRCUIT_RECOVERY_TIMEOUT=0)
+    def test_half_open_probe_closes_circuit_on_success(self):
+        self.gateway.circuit_breaker.trip()
+        self.session.get.return_value = http_response(200, {"status": True})
+
+        self.assertTrue(self.gateway.circuit_breaker.allow())
+        self.assertFalse(self.gateway.circuit_breaker.allow())
+        self.gateway.circuit_breaker.record_success()
+
+        self.assertEqual(self.gateway.verify_payment("ref"), {"status": True})
+        self.assertTrue(self.gateway.circuit_breaker.allow())
+
+    @override_settings(PAYSTACK_CIRCUIT_RECOVERY_TIMEOUT=0)
+    def test_half_open_probe_ending_in_client_error_hands_over_the_probe(self):
+        self.gateway.circuit_breaker.trip()
+        self.session.post.return_value = http_response(400)
+
+        with self.assertRaises(PaymentErrorException):
+            self.gateway.initialize_payment(Money(100000, "NGN"), "test@example.com")
+
+        self.assertTrue(self.gateway.circuit_breaker.allow())
+
+    @override_settings(PAYSTACK_MAX_IN_FLIGHT=1)
+    def test_calls_over_in_flight_limit_are_shed(self):
+        bulkhead = get_bulkhead()
+        bulkhead.acquire()
+        try:
+            with self.assertRaises(PaymentServiceUnavailableException):
+                self.gateway.verify_payment("ref")
+        finally:
+            bulkhead.release()
+
+        self.session.get.assert_not_called()
+
+
+class TestCircuitOpenResponses(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    @patch("gateways.paystack.views.PaystackPaymentGateway.initialize_payment")
+    def test_create_returns_503_with_retry_after(self, mock_initialize_payment):
+        mock_initialize_payment.side_effect = PaymentServiceUnavailableException(
+            "Paystack unavailable", retry_after=12.5
+        )
+
+        response = self.client.post(
+            reverse("paystack-payment-list"), {"name": "Test User", "email": "test@email.com", "amount": 1000}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "13")
+
+    @patch("gateways.paystack.views.PaystackPaymentGateway.verify_payment")
+    def test_verify_returns_503(self, mock_verify_payment):
+        mock_verify_payment.side_effect = PaymentServiceUnavailableException("Paystack unavailable")
+
+        response = self.client.get(reverse("paystack-verification-verify-payment", kwargs={"reference": "ref"}))
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,121 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from gateways.common.money import Money
+from gateways.paystack.models import PaystackTransaction, PaystackWebhookEvent, TransactionRollup
+from gateways.paystack.services import apply_webhook_events, record_initialization, record_verification
+
+
+def rollups():
+    return {
+        (rollup.status, rollup.currency): (rollup.count, rollup.amount_minor)
+        for rollup in TransactionRollup.objects.exclude(count=0)
+    }
+
+
+class TestTransactionRollups(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("finance", is_staff=True))
+        self.url = reverse("paystack-rollups-list")
+
+    def initialize(self, reference, amount):
+        record_initialization(
+            {"data": {"reference": reference, "access_code": "code"}},
+            {"amount": amount, "money": Money.from_major(amount), "email": "customer@email.com", "name": "Customer"},
+        )
+
+    def verification(self, status, amount_minor, currency="NGN"):
+        return {
+            "status": status,
+            "email": "customer@email.com",
+            "name": "Customer",
+            "amount_minor": amount_minor,
+            "currency": currency,
+        }
+
+    def test_write_paths_keep_rollups_in_step(self):
+        self.initialize("ref_1", 100)
+        self.initialize("ref_2", 250)
+        self.initialize("ref_2", 250)
+        self.assertEqual(rollups(), {("pending", "NGN"): (2, 35000)})
+
+        record_verification("ref_1", self.verification("success", 10000))
+        record_verification("ref_1", self.verification("failed", 10000))
+        record_verification("ref_unknown", self.verification("success", 4000, currency="GHS"))
+        self.assertEqual(
+            rollups(),
+            {
+                ("pending", "NGN"): (1, 25000),
+                ("success", "NGN"): (1, 10000),
+                ("success", "GHS"): (1, 4000),
+            },
+        )
+
+        event = baker.make(
+            PaystackWebhookEvent,
+            event="charge.failed",
+            reference="ref_2",
+            payload={"data": {"reference": "ref_2", "amount": 25000, "currency": "NGN"}},
+        )
+        apply_webhook_events([event])
+        self.assertEqual(
+            rollups(),
+            {
+                ("failed", "NGN"): (1, 25000),
+                ("success", "NGN"): (1, 10000),
+                ("success", "GHS"): (1, 4000),
+            },
+        )
+
+    def test_rebuild_matches_incremental_rollups(self):
+        for i in range(5):
+            self.initialize(f"ref_{i}", 10 * (i + 1))
+        record_verification("ref_0", self.verification("success", 1000))
+        baker.make(PaystackTransaction, status="abandoned", amount_minor=700, currency="USD")
+        expected = rollups()
+        self.assertEqual(len(expected), 2)
+        TransactionRollup.objects.all().delete()
+        baker.make(PaystackTransaction, status="abandoned", amount_minor=500, currency="USD")
+
+        call_command("rebuild_paystack_rollups", chunk_size=2, stdout=io.StringIO())
+
+        expected[("abandoned", "USD")] = (2, 1200)
+        self.assertEqual(rollups(), expected)
+
+    def test_endpoint_returns_rows_and_totals(self):
+        self.initialize("ref_1", 100)
+        self.initialize("ref_2", 50)
+        record_verification("ref_2", self.verification("success", 5000))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(response.data["results"][0]["day"], str(timezone.now().date()))
+        totals = {total["status"]: total for total in response.data["totals"]}
+        self.assertEqual((totals["pending"]["amount"], totals["pending"]["amount_minor"]), ("100.00", 10000))
+        self.assertEqual(totals["success"]["count"], 1)
+
+    def test_endpoint_requires_a_staff_user(self):
+        anonymous = APIClient().get(self.url)
+        self.client.force_authenticate(get_user_model().objects.create_user("customer"))
+        non_staff = self.client.get(self.url)
+
+        self.assertIn(anonymous.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.assertEqual(non_staff.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_range_returns_400(self):
+        for params in ({"day_from": "2025-02-01", "day_to": "2025-01-01"}, {"day_from": "2020-01-01"}):
+            response = self.client.get(self.url, params)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase
+
+from gateways.paystack.exceptions import PaymentErrorException
+from gateways.paystack.models import PaystackTransaction
+from gateways.paystack.services import verify_transaction
+from gateways.paystack.singleflight import AsyncSingleFlight, SingleFlight, _keys, shared_call
+
+
+class SlowGateway:
+    def __init__(self):
+        self.calls = 0
+
+    def verify_payment(self, reference):
+        self.calls += 1
+        time.sleep(0.1)
+        return {
+            "data": {
+                "status": "success",
+                "customer": {"email": "test@email.com"},
+                "metadata": {"name": "Test User"},
+                "amount": 100000,
+                "gateway_response": "Approved",
+            }
+        }
+
+
+class TestSingleFlight(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def run_concurrently(self, fn, count=8):
+        barrier = threading.Barrier(count)
+
+        def call():
+            barrier.wait()
+            return fn()
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            return [future.result() for future in [executor.submit(call) for _ in range(count)]]
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.1)
+            return object()
+
+        results = self.run_concurrently(lambda: flight.do("ref", fn))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_error_is_raised_for_every_waiter(self):
+        flight = SingleFlight()
+
+        def fn():
+            time.sleep(0.1)
+            raise PaymentErrorException("Verification failed")
+
+        def call():
+            try:
+                flight.do("ref", fn)
+            except PaymentErrorException as e:
+                return str(e)
+
+        self.assertEqual(set(self.run_concurrently(call)), {"Verification failed"})
+
+    def test_async_concurrent_calls_share_one_execution(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*[flight.do("ref", fn) for _ in range(10)])
+
+        self.assertEqual(asyncio.run(main()), ["result"] * 10)
+        self.assertEqual(len(calls), 1)
+
+    def test_shared_call_waits_for_result_from_another_worker(self):
+        result_key, lock_key = _keys("ref")
+        cache.add(lock_key, 1)
+        threading.Timer(0.1, lambda: cache.set(result_key, "from-other-worker")).start()
+
+        self.assertEqual(shared_call("ref", lambda: self.fail("should not run")), "from-other-worker")
+
+    def test_shared_call_reuses_recent_result(self):
+        shared_call("ref", lambda: "first")
+
+        self.assertEqual(shared_call("ref", lambda: "second"), "first")
+
+
+class TestCoalescedVerification(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_verifications_make_one_upstream_call_and_one_write(self):
+        gateway = SlowGateway()
+        barrier = threading.Barrier(5)
+
+        def call():
+            barrier.wait()
+            return verify_transaction(gateway, "ref_1")
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = [future.result() for future in [executor.submit(call) for _ in range(5)]]
+
+        self.assertEqual(gateway.calls, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(PaystackTransaction.objects.filter(reference="ref_1").count(), 1)
@@ -1,22 +1,26 @@
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+from django.test import override_settings
+
+from gateways.common.money import Money
+from gateways.paystack import utils
 from gateways.paystack.exceptions import PaymentErrorException
-from gateways.paystack.utils import PaystackPaymentGateway
+from gateways.paystack.utils import PaystackPaymentGateway, get_session, reset_session
 
 
 class PaystackGatewayTestSetUp(TestCase):
     def setUp(self):
         self.gateway = PaystackPaymentGateway()
-        self.amount = 1000
+        self.money = Money(100000, "NGN")
         self.email = "test@example.com"
         self.metadata = {"name": "Test User"}
         self.reference = "test_reference_12345"
 
 
 class TestInitializePayment(PaystackGatewayTestSetUp):
-    @patch("gateways.paystack.utils.requests.post")
-    def test_initialize_payment_success(self, mock_post):
+    @patch("gateways.paystack.utils.get_session")
+    def test_initialize_payment_success(self, mock_session):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
@@ -27,33 +31,36 @@ class TestInitializePayment(PaystackGatewayTestSetUp):
                 "access_code": "access_code_abc",
             },
         }
-        mock_post.return_value = mock_response
+        mock_session.return_value.post.return_value = mock_response
 
-        res = self.gateway.initialize_payment(self.amount, self.email, self.metadata)
+        res = self.gateway.initialize_payment(self.money, self.email, self.metadata)
 
         self.assertTrue(res["status"])
         self.assertIn("authorization_url", res["data"])
         self.assertEqual(res["data"]["reference"], self.reference)
+        payload = mock_session.return_value.post.call_args.kwargs["json"]
+        self.assertEqual(payload["amount"], 100000)
+        self.assertEqual(payload["currency"], "NGN")
 
-    @patch("gateways.paystack.utils.requests.post")
-    def test_initialize_payment_failure_raises_custom_exception(self, mock_post):
+    @patch("gateways.paystack.utils.get_session")
+    def test_initialize_payment_failure_raises_custom_exception(self, mock_session):
         mock_response = MagicMock()
         mock_response.raise_for_status.side_effect = Exception("Payment failed")
-        mock_post.return_value = mock_response
+        mock_session.return_value.post.return_value = mock_response
 
         with self.assertRaises(PaymentErrorException) as context:
-            self.gateway.initialize_payment(self.amount, self.email, self.metadata)
+            self.gateway.initialize_payment(self.money, self.email, self.metadata)
 
         self.assertIn("Payment failed", str(context.exception))
 
 
 class TestVerifyPayment(PaystackGatewayTestSetUp):
-    @patch("gateways.paystack.utils.requests.get")
-    def test_verify_payment_success(self, mock_get):
+    @patch("gateways.paystack.utils.get_session")
+    def test_verify_payment_success(self, mock_session):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"status": True, "data": {"reference": self.reference, "status": "success"}}
-        mock_get.return_value = mock_response
+        mock_session.return_value.get.return_value = mock_response
 
         res = self.gateway.verify_payment(self.reference)
 
@@ -61,13 +68,46 @@ class TestVerifyPayment(PaystackGatewayTestSetUp):
         self.assertEqual(res["data"]["status"], "success")
         self.assertEqual(res["data"]["reference"], self.reference)
 
-    @patch("gateways.paystack.utils.requests.get")
-    def test_verify_payment_failure_raises_custom_exception(self, mock_get):
+    @patch("gateways.paystack.utils.get_session")
+    def test_verify_payment_failure_raises_custom_exception(self, mock_session):
         mock_response = MagicMock()
         mock_response.raise_for_status.side_effect = Exception("Verification failed")
-        mock_get.return_value = mock_response
+        mock_session.return_value.get.return_value = mock_response
 
         with self.assertRaises(PaymentErrorException) as context:
             self.gateway.verify_payment(self.reference)
 
         self.assertIn("Verification failed", str(context.exception))
+
+
+class TestPooledSession(PaystackGatewayTestSetUp):
+    def tearDown(self):
+        reset_session()
+
+    def test_session_is_shared_across_gateway_instances(self):
+        self.assertIs(PaystackPaymentGateway().session, PaystackPaymentGateway().session)
+        self.assertIs(self.gateway.session, get_session())
+
+    def test_reset_session_builds_a_new_pool(self):
+        session = get_session()
+        reset_session()
+
+        self.assertIsNot(get_session(), session)
+
+    @override_settings(PAYSTACK_HTTP_POOL_MAXSIZE=7)
+    def test_session_pool_size_comes_from_settings(self):
+        reset_session()
+        adapter = get_session().get_adapter(utils.settings.PAYSTACK_BASE_URL)
+
+        self.assertEqual(adapter._pool_maxsize, 7)
+
+    @override_settings(PAYSTACK_CONNECT_TIMEOUT=1.5, PAYSTACK_READ_TIMEOUT=4.0)
+    @patch("gateways.paystack.utils.get_session")
+    def test_requests_are_sent_with_connect_and_read_timeouts(self, mock_session):
+        self.gateway.verify_payment(self.reference)
+
+        mock_session.return_value.get.assert_called_once_with(
+            f"https://api.paystack.co/transaction/verify/{self.reference}",
+            headers=self.gateway.headers(),
+            timeout=(1.5, 4.0),
+        )
@@ -0,0 +1,148 @@
+import hashlib
+import hmac
+import io
+import json
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from gateways.common.money import Money
+from gateways.paystack.enums import PaystackPaymentStatus, WebhookEventStatus
+from gateways.paystack.models import PaystackTransaction, PaystackWebhookEvent
+from gateways.paystack.queues import DatabaseWebhookQueue, InMemoryWebhookQueue
+from gateways.paystack.services import insert_new_transactions, process_webhook_batch
+
+
+def webhook_payload(reference, event="charge.success", amount=500000):
+    return {
+        "event": event,
+        "data": {
+            "reference": reference,
+            "amount": amount,
+            "customer": {"email": "customer@email.com"},
+            "metadata": {"name": "Test User"},
+        },
+    }
+
+
+class TestPaystackWebhookEndpoint(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("paystack-webhook-list")
+
+    def post(self, payload, signature=None):
+        body = json.dumps(payload).encode()
+        if signature is None:
+            signature = hmac.new(settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512).hexdigest()
+        return self.client.generic(
+            "POST", self.url, body, content_type="application/json", HTTP_X_PAYSTACK_SIGNATURE=signature
+        )
+
+    def test_valid_signature_queues_event(self):
+        response = self.post(webhook_payload("ref_1"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event = PaystackWebhookEvent.objects.get()
+        self.assertEqual(event.reference, "ref_1")
+        self.assertEqual(event.status, WebhookEventStatus.PENDING)
+        self.assertFalse(PaystackTransaction.objects.exists())
+
+    def test_invalid_signature_returns_401(self):
+        response = self.post(webhook_payload("ref_1"), signature="invalid")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(PaystackWebhookEvent.objects.exists())
+
+    def test_unhandled_event_is_acknowledged_and_ignored(self):
+        response = self.post({"event": "transfer.success", "data": {}})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(PaystackWebhookEvent.objects.exists())
+
+    @override_settings(PAYSTACK_WEBHOOK_QUEUE="gateways.paystack.queues.InMemoryWebhookQueue")
+    def test_event_is_queued_on_configured_queue(self):
+        queue = InMemoryWebhookQueue()
+        with patch("gateways.paystack.views.get_webhook_queue", return_value=queue):
+            self.post(webhook_payload("ref_1"))
+
+        self.assertEqual([event.reference for event in queue.pending], ["ref_1"])
+
+
+class TestWebhookProcessing(TestCase):
+    def test_batch_creates_and_updates_transactions(self):
+        baker.make(PaystackTransaction, reference="ref_pending", status=PaystackPaymentStatus.PENDING)
+        queue = InMemoryWebhookQueue()
+        queue.enqueue("charge.success", "ref_pending", webhook_payload("ref_pending"))
+        queue.enqueue("charge.failed", "ref_new", webhook_payload("ref_new", event="charge.failed"))
+
+        self.assertEqual(process_webhook_batch(queue, 10), 2)
+
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_pending").status, "success")
+        new = PaystackTransaction.objects.get(reference="ref_new")
+        self.assertEqual(new.status, "failed")
+        self.assertEqual(new.money, Money(500000, "NGN"))
+        self.assertEqual(len(queue.processed), 2)
+
+    def test_success_is_not_downgraded_by_failed_event(self):
+        baker.make(PaystackTransaction, reference="ref_1", status=PaystackPaymentStatus.SUCCESS)
+        queue = InMemoryWebhookQueue()
+        queue.enqueue("charge.failed", "ref_1", webhook_payload("ref_1", event="charge.failed"))
+
+        process_webhook_batch(queue, 10)
+
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_1").status, "success")
+
+    def test_success_is_not_downgraded_by_failed_event_later_in_the_batch(self):
+        queue = InMemoryWebhookQueue()
+        queue.enqueue("charge.success", "ref_new", webhook_payload("ref_new"))
+        queue.enqueue("charge.failed", "ref_new", webhook_payload("ref_new", event="charge.failed"))
+
+        process_webhook_batch(queue, 10)
+
+        self.assertEqual(PaystackTransaction.objects.get(reference="ref_new").status, "success")
+        self.assertEqual(len(queue.processed), 2)
+
+    def test_reference_inserted_by_a_concurrent_batch_is_updated(self):
+        queue = InMemoryWebhookQueue()
+        queue.enqueue("charge.success", "ref_new", webhook_payload("ref_new"))
+
+        def insert_after_concurrent_batch(transactions):
+            baker.make(PaystackTransaction, reference="ref_new", status=PaystackPaymentStatus.FAILED, amount_minor=100)
+            return insert_new_transactions(transactions)
+
+        with patch("gateways.paystack.services.insert_new_transactions", side_effect=insert_after_concurrent_batch):
+            self.assertEqual(process_webhook_batch(queue, 10), 1)
+
+        transaction_obj = PaystackTransaction.objects.get(reference="ref_new")
+        self.assertEqual(transaction_obj.status, "success")
+        self.assertEqual(transaction_obj.money, Money(500000, "NGN"))
+        self.assertEqual(len(queue.processed), 1)
+
+    @override_settings(PAYSTACK_WEBHOOK_MAX_ATTEMPTS=1)
+    def test_bad_event_does_not_block_the_batch(self):
+        queue = InMemoryWebhookQueue()
+        queue.enqueue("charge.success", "ref_bad", {"data": {"amount": "not-a-number"}})
+        queue.enqueue("charge.success", "ref_good", webhook_payload("ref_good"))
+
+        process_webhook_batch(queue, 10)
+
+        self.assertTrue(PaystackTransaction.objects.filter(reference="ref_good").exists())
+        self.assertEqual([event.reference for event in queue.failed], ["ref_bad"])
+
+
+class TestProcessWebhooksCommand(TransactionTestCase):
+    def test_database_queue_is_drained_by_command(self):
+        queue = DatabaseWebhookQueue()
+        for i in range(3):
+            queue.enqueue("charge.success", f"ref_{i}", webhook_payload(f"ref_{i}"))
+
+        call_command("process_paystack_webhooks", "--once", "--workers=1", "--batch-size=2", stdout=io.StringIO())
+
+        self.assertEqual(PaystackTransaction.objects.filter(status="success").count(), 3)
+        self.assertFalse(PaystackWebhookEvent.objects.exclude(status=WebhookEventStatus.PROCESSED).exists())